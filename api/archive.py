@@ -0,0 +1,60 @@
+"""
+Moving bookings that ended in the past out of api_booking.
+
+Past stays are never overlap-checked against new ones beginning today or
+later, so they only weigh down the booking table and its indexes. They
+are moved to api_archivedbooking, keeping their ids, and stay available
+to overlap checks of stays in the past and to GET /booking/?history=true.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from . import changes, counters, versions
+from .bulk import CREATE_BATCH_SIZE, DELETE_BATCH_SIZE, batches
+from .locks import rooms_lock
+from .models import ArchivedBooking, Booking
+
+ARCHIVE_BATCH_SIZE = 10_000
+
+
+def archive_bookings(before, batch_size=ARCHIVE_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """
+    Move the bookings ending before the date to the archive and return how many were moved.
+
+    Every batch is moved in a transaction of its own holding the locks of
+    its rooms, so bookings are never missing from both tables at once and
+    writers are only held up for the duration of a batch.
+    """
+    if before > timezone.localdate():
+        raise ValueError('Only bookings that ended in the past can be archived')
+
+    past = Booking.objects.using(using).filter(end_date__lt=before).order_by('pk')
+    moved = 0
+
+    while True:
+        room_ids = set(past[:batch_size].values_list('room_id', flat=True))
+        if not room_ids:
+            return moved
+
+        with rooms_lock(room_ids, using=using):
+            bookings = list(
+                past.filter(room__in=room_ids)[:batch_size].values_list('pk', 'room_id', 'begin_date', 'end_date')
+            )
+
+            ArchivedBooking.objects.using(using).bulk_create((
+                ArchivedBooking(id=pk, room_id=room_id, begin_date=begin_date, end_date=end_date)
+                for pk, room_id, begin_date, end_date in bookings
+            ), batch_size=CREATE_BATCH_SIZE)
+
+            ids = [pk for pk, *_ in bookings]
+            for batch in batches(ids, DELETE_BATCH_SIZE):
+                Booking.objects.filter(pk__in=batch)._raw_delete(using)
+            changes.record(changes.BOOKING, changes.ARCHIVED, ids, using=using)
+
+            counters.refresh(room_ids, using=using)
+            versions.bump(
+                (versions.BOOKINGS, *(versions.bookings_of(room_id) for _, room_id, _, _ in bookings)),
+                using=using
+            )
+
+        moved += len(bookings)
@@ -0,0 +1,251 @@
+import bisect
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from . import changes, counters, versions
+from .locks import rooms_lock
+from .models import ArchivedBooking, Booking, Room
+from .occupancy import occupancy
+
+
+# Bounds the size of a single DELETE statement
+DELETE_BATCH_SIZE = 500
+
+CREATE_BATCH_SIZE = 500
+
+
+def batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def prefetch_rooms(items):
+    """Fetch the rooms referenced by raw booking items with a single query."""
+    room_ids = set()
+    for item in items:
+        try:
+            room_ids.add(int(item['room_id']))
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    return Room.objects.in_bulk(room_ids)
+
+
+def group_by_room(items):
+    groups = defaultdict(list)
+    for i, item in enumerate(items):
+        groups[item['room'].pk].append(i)
+
+    return groups
+
+
+def batch_overlaps(items):
+    """
+    Return indices of the items overlapping another item of the same batch.
+
+    Items of every room are sorted by begin_date and swept once, keeping the
+    item that reaches the farthest so far.
+    """
+    overlapping = set()
+    for indices in group_by_room(items).values():
+        indices.sort(key=lambda i: items[i]['begin_date'])
+
+        farthest = None
+        for i in indices:
+            if farthest is not None and items[i]['begin_date'] <= items[farthest]['end_date']:
+                overlapping.update((i, farthest))
+            if farthest is None or items[i]['end_date'] > items[farthest]['end_date']:
+                farthest = i
+
+    return overlapping
+
+
+def existing_overlaps(items, bookings=Booking.objects):
+    """
+    Return indices of the items overlapping bookings already in the database.
+
+    Takes one query per room, fetching the bookings that overlap the span of
+    all the items of the room.
+    """
+    overlapping = set()
+    for indices in group_by_room(items).values():
+        room = items[indices[0]]['room']
+        begin_date = min(items[i]['begin_date'] for i in indices)
+        end_date = max(items[i]['end_date'] for i in indices)
+
+        # Existing bookings of a room never overlap each other, so sorted by
+        # begin_date their end dates are sorted too
+        existing = list(
+            bookings.overlapping(room, begin_date, end_date)
+            .order_by('begin_date').values_list('begin_date', 'end_date')
+        )
+        begin_dates = [begin for begin, _ in existing]
+
+        for i in indices:
+            # Of the bookings beginning before the item ends, the last one
+            # ends the latest, so it overlaps the item if any of them does
+            position = bisect.bisect_right(begin_dates, items[i]['end_date'])
+            if position and existing[position - 1][1] >= items[i]['begin_date']:
+                overlapping.add(i)
+
+    return overlapping
+
+
+def create_bookings(items, using=DEFAULT_DB_ALIAS):
+    """
+    Insert validated booking items in one transaction unless any of them overlaps.
+
+    Returns the created bookings and the set of overlapping item indices;
+    nothing is created if the set is not empty.
+    """
+    overlapping = batch_overlaps(items)
+
+    with rooms_lock({item['room'].pk for item in items}, using=using):
+        overlapping |= stored_overlaps(items)
+        if overlapping:
+            return [], overlapping
+
+        return insert_bookings(items, using=using), overlapping
+
+
+def create_each_booking(items, using=DEFAULT_DB_ALIAS):
+    """
+    Insert the validated booking items that overlap neither stored bookings nor an earlier item, in one transaction.
+
+    Returns the created booking of every item, or None for the items left
+    out, as if the items had been created one by one in their order.
+    """
+    with rooms_lock({item['room'].pk for item in items}, using=using):
+        overlapping = stored_overlaps(items)
+
+        accepted = defaultdict(list)
+        for i, item in enumerate(items):
+            if i in overlapping:
+                continue
+            if any(
+                begin_date <= item['end_date'] and item['begin_date'] <= end_date
+                for begin_date, end_date in accepted[item['room'].pk]
+            ):
+                overlapping.add(i)
+            else:
+                accepted[item['room'].pk].append((item['begin_date'], item['end_date']))
+
+        bookings = iter(insert_bookings([item for i, item in enumerate(items) if i not in overlapping], using=using))
+
+    return [None if i in overlapping else next(bookings) for i in range(len(items))]
+
+
+def stored_overlaps(items):
+    """Return indices of the items overlapping bookings in the database, archived ones included."""
+    overlapping = existing_overlaps(items)
+
+    past = [i for i, item in enumerate(items) if ArchivedBooking.may_overlap(item['begin_date'])]
+    if past:
+        archived = existing_overlaps([items[i] for i in past], ArchivedBooking.objects)
+        overlapping |= {past[i] for i in archived}
+
+    return overlapping
+
+
+def insert_bookings(items, using=DEFAULT_DB_ALIAS):
+    """Insert booking items known not to overlap anything. Callers hold the locks of the rooms."""
+    bookings = Booking.objects.using(using).bulk_create(Booking(**item) for item in items)
+    # bulk_create sends no signals
+    for booking in bookings:
+        occupancy.add(booking.room_id, booking.begin_date, booking.end_date)
+    if bookings:
+        counters.refresh({booking.room_id for booking in bookings}, using=using)
+        versions.bump(
+            (versions.BOOKINGS, *(versions.bookings_of(booking.room_id) for booking in bookings)),
+            using=using
+        )
+
+    if bookings and not connections[using].features.can_return_rows_from_bulk_insert:
+        # Bookings of a room never share a begin_date, so it identifies them
+        ids = {
+            (room_id, begin_date): pk
+            for pk, room_id, begin_date in Booking.objects.using(using).filter(
+                room__in={item['room'].pk for item in items},
+                begin_date__in={item['begin_date'] for item in items}
+            ).values_list('pk', 'room_id', 'begin_date')
+        }
+        for booking in bookings:
+            booking.pk = ids[(booking.room_id, booking.begin_date)]
+
+    changes.record_objects(changes.CREATED, bookings, using=using)
+
+    return bookings
+
+
+def create_rooms(items, using=DEFAULT_DB_ALIAS):
+    """Insert validated room items in one transaction."""
+    rooms = [Room(**item) for item in items]
+
+    with transaction.atomic(using=using):
+        if connections[using].features.can_return_rows_from_bulk_insert:
+            Room.objects.using(using).bulk_create(rooms, batch_size=CREATE_BATCH_SIZE)
+            versions.bump((versions.ROOMS,), using=using)
+            changes.record_objects(changes.CREATED, rooms, using=using)
+        else:
+            # Rooms have no natural key to look the new ids up by, so backends
+            # that can't return them from a bulk insert get one insert per room
+            for room in rooms:
+                room.save(using=using)
+
+    return rooms
+
+
+def delete_rooms(ids, using=DEFAULT_DB_ALIAS):
+    """
+    Delete rooms together with their bookings and return ids of the deleted rooms.
+
+    Bookings are deleted with one statement per batch of rooms instead of
+    being collected and deleted one by one.
+    """
+    with rooms_lock(ids, using=using):
+        ids = list(Room.objects.using(using).filter(pk__in=ids).values_list('pk', flat=True))
+
+        for batch in batches(ids, DELETE_BATCH_SIZE):
+            bookings = Booking.objects.using(using).filter(room__in=batch)
+            # The change log lists the bookings going with the rooms, but
+            # not archived ones, which GET /booking/ doesn't show anyway
+            changes.record(
+                changes.BOOKING, changes.DELETED, bookings.order_by('pk').values_list('pk', flat=True), using=using
+            )
+            bookings._raw_delete(using)
+            ArchivedBooking.objects.filter(room__in=batch)._raw_delete(using)
+            Room.objects.filter(pk__in=batch)._raw_delete(using)
+            changes.record(changes.ROOM, changes.DELETED, batch, using=using)
+
+        occupancy.invalidate(ids)
+        if ids:
+            versions.bump((versions.ROOMS, versions.BOOKINGS, *map(versions.bookings_of, ids)), using=using)
+
+    return ids
+
+
+def delete_bookings(ids, using=DEFAULT_DB_ALIAS):
+    """Delete bookings and return ids of the deleted ones."""
+    room_ids = set(Booking.objects.using(using).filter(pk__in=ids).values_list('room_id', flat=True))
+
+    with rooms_lock(room_ids, using=using):
+        bookings = list(
+            Booking.objects.using(using).filter(pk__in=ids).values_list('pk', 'room_id', 'begin_date', 'end_date')
+        )
+        ids = [pk for pk, *_ in bookings]
+
+        for batch in batches(ids, DELETE_BATCH_SIZE):
+            Booking.objects.filter(pk__in=batch)._raw_delete(using)
+        changes.record(changes.BOOKING, changes.DELETED, ids, using=using)
+
+        for _, room_id, begin_date, end_date in bookings:
+            occupancy.remove(room_id, begin_date, end_date)
+        if bookings:
+            counters.refresh({room_id for _, room_id, _, _ in bookings}, using=using)
+            versions.bump(
+                (versions.BOOKINGS, *(versions.bookings_of(room_id) for _, room_id, _, _ in bookings)),
+                using=using
+            )
+
+    return ids
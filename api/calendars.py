@@ -0,0 +1,121 @@
+"""
+Compact per-day occupancy of many rooms for GET /room/calendar/.
+
+The bookings of all the requested rooms come from a single query grouped
+by room: the database turns every booking into a pair of day offsets
+within the window and concatenates the pairs of a room into one string.
+Every pair is then parsed and laid onto the bitmap of its room with one
+shift and one OR, so there is a Python loop over the bookings but none
+over the days they cover. A room is encoded either as a string with a '1' for every booked
+day or as the list of its booked ranges, adjacent bookings merged.
+"""
+import datetime
+import re
+
+from django.db import models
+from django.db.models import Aggregate, Func, Value
+from django.db.models.functions import Concat, Greatest, Least
+
+from .compact import EPOCH_ORDINAL
+from .models import ArchivedBooking, Booking, Room
+
+BITS = 'bits'
+
+RANGES = 'ranges'
+
+ENCODINGS = (BITS, RANGES)
+
+
+class DaysBetween(Func):
+    """Number of days from the second date to the first one."""
+    arity = 2
+
+    output_field = models.IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        template = 'CAST(julianday(%(expressions)s) AS INTEGER)'
+        return self.as_sql(compiler, connection, template=template, arg_joiner=') - julianday(', **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(%(expressions)s)', arg_joiner=' - ', **extra_context)
+
+
+class GroupConcat(Aggregate):
+    """Comma-separated values of the group, in no particular order."""
+    function = 'GROUP_CONCAT'
+
+    output_field = models.TextField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, function='STRING_AGG', template="%(function)s((%(expressions)s)::text, ',')",
+            **extra_context
+        )
+
+
+def booked_days(bookings, room_ids, begin_date, end_date):
+    """Return bitmaps of the booked days of the rooms, day 0 being the lowest bit."""
+    last = (end_date - begin_date).days
+    window_begin = Value(begin_date, output_field=models.DateField())
+
+    rows = (
+        bookings.overlapping_rooms(room_ids, begin_date, end_date)
+        .order_by().values('room_id')
+        .annotate(days=GroupConcat(Concat(
+            Greatest(DaysBetween('begin_date', window_begin), Value(0)),
+            Value(':'),
+            Least(DaysBetween('end_date', window_begin), Value(last)),
+            output_field=models.TextField()
+        )))
+        .values_list('room_id', 'days')
+    )
+
+    bitmaps = {}
+    for room_id, days in rows:
+        bits = 0
+        for pair in days.split(','):
+            first, _, last_day = pair.partition(':')
+            first = int(first)
+            bits |= ((1 << int(last_day) - first + 1) - 1) << first
+        bitmaps[room_id] = bits
+
+    return bitmaps
+
+
+def calendar(room_ids, begin_date, end_date, encoding=BITS, compact=False):
+    """
+    Build the calendar of the rooms, skipping the ones that do not exist.
+
+    With `compact` on, dates are days since 1970-01-01 like in compact
+    representations of serializers.
+    """
+    represent = (lambda date: date.toordinal() - EPOCH_ORDINAL) if compact else (lambda date: date.isoformat())
+    rooms = sorted(Room.objects.filter(pk__in=room_ids).values_list('pk', flat=True))
+
+    bitmaps = booked_days(Booking.objects, rooms, begin_date, end_date) if rooms else {}
+    if rooms and ArchivedBooking.may_overlap(begin_date):
+        for room_id, bits in booked_days(ArchivedBooking.objects, rooms, begin_date, end_date).items():
+            bitmaps[room_id] = bitmaps.get(room_id, 0) | bits
+
+    days = (end_date - begin_date).days + 1
+    encoded = {}
+    for room_id in rooms:
+        # The binary string has day 0 last, so it is reversed
+        bits = format(bitmaps.get(room_id, 0), f'0{days}b')[::-1]
+        if encoding == BITS:
+            encoded[str(room_id)] = bits
+        else:
+            encoded[str(room_id)] = [
+                [
+                    represent(begin_date + datetime.timedelta(days=match.start())),
+                    represent(begin_date + datetime.timedelta(days=match.end() - 1))
+                ]
+                for match in re.finditer('1+', bits)
+            ]
+
+    return {
+        'from': represent(begin_date),
+        'to': represent(end_date),
+        'encoding': encoding,
+        'rooms': encoded,
+    }
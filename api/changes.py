@@ -0,0 +1,183 @@
+"""
+Append-only log of room and booking changes, read with GET /changes/.
+
+Every creation, edit and deletion of a room or a booking, the bookings
+deleted together with their room and the bookings moved to the archive
+included, appends an entry to api_change in the transaction making the
+change, so the log and the data never disagree. A consumer keeps the seq
+of the last entry it applied and asks for the entries after it, instead
+of fetching the whole lists again to diff them.
+
+Entries are written without a seq and numbered right after their
+transaction commits, in a short transaction of its own holding the
+counter row of the log, so writers of different rooms don't line up on
+the counter while they work. Numbering takes the committed entries in the
+order of their ids and seqs are handed out one after another, so a reader
+sees the seqs in order, without gaps, and never skips an entry by reading
+past it before it is numbered. A writer finding the counter held by
+another one leaves its entries to the next writer or reader instead of
+waiting, and a reader numbers whatever is left before reading, entries
+of a process dying between its commit and the numbering included.
+
+The summary of the bookings of a room, see api/counters.py, is not part
+of the room in the log; it follows from the bookings.
+"""
+import functools
+import logging
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F
+
+from . import versions
+from .models import Change, ListVersion, Room
+from .serializers import BookingSerializer, RoomSerializer
+
+logger = logging.getLogger(__name__)
+
+ROOM = 'room'
+
+BOOKING = 'booking'
+
+CREATED = 'created'
+
+UPDATED = 'updated'
+
+DELETED = 'deleted'
+
+# Moved out of GET /booking/ to GET /booking/?history=true
+ARCHIVED = 'archived'
+
+SEQUENCE_KEY = 'change'
+
+RECORD_BATCH_SIZE = 500
+
+# How often a waiting reader looks for entries written by other processes
+POLL_INTERVAL = 0.5
+
+SERIALIZERS = {
+    ROOM: RoomSerializer,
+    BOOKING: BookingSerializer,
+}
+
+_committed = threading.Condition()
+
+_generation = 0
+
+
+def sequence(using=DEFAULT_DB_ALIAS, wait=True):
+    """
+    Number the committed entries which have no seq yet, in the order of their ids, and return how many there were.
+
+    Without `wait` nothing is numbered while another transaction holds the
+    counter, the entries left are numbered by the next writer or reader.
+    """
+    pending = Change.objects.using(using).filter(seq__isnull=True)
+    if not pending.exists():
+        return 0
+
+    with transaction.atomic(using=using):
+        last = lock_counter(using, wait)
+        if last is None:
+            return 0
+
+        # Entries numbered by the previous holder of the counter are left out
+        entries = [
+            Change(pk=pk, seq=seq)
+            for seq, pk in enumerate(pending.order_by('pk').values_list('pk', flat=True), last + 1)
+        ]
+        Change.objects.using(using).bulk_update(entries, ('seq',), batch_size=RECORD_BATCH_SIZE)
+        ListVersion.objects.using(using).filter(key=SEQUENCE_KEY).update(version=last + len(entries))
+
+    return len(entries)
+
+
+def lock_counter(using, wait):
+    """Lock the counter of the log and return its value, None if `wait` is off and another transaction holds it."""
+    counter = ListVersion.objects.using(using).filter(key=SEQUENCE_KEY)
+
+    if not connections[using].features.has_select_for_update:
+        # The update takes the write lock of the database before the row is read
+        if not counter.update(version=F('version')):
+            ListVersion.objects.using(using).bulk_create((ListVersion(key=SEQUENCE_KEY),), ignore_conflicts=True)
+            counter.update(version=F('version'))
+
+        return counter.values_list('version', flat=True).get()
+
+    locked = counter.select_for_update(skip_locked=not wait).values_list('version', flat=True)
+    last = locked.first()
+    if last is None:
+        ListVersion.objects.using(using).bulk_create((ListVersion(key=SEQUENCE_KEY),), ignore_conflicts=True)
+        last = locked.first()
+
+    return last
+
+
+def sequence_committed(using=DEFAULT_DB_ALIAS):
+    try:
+        if sequence(using=using, wait=False):
+            notify()
+    except Exception:
+        # The entries are committed already and the next reader numbers them
+        logger.exception('Numbering change log entries failed')
+
+
+def record(model, action, ids, data=None, using=DEFAULT_DB_ALIAS):
+    """Append entries for the objects with the ids, in the current transaction if there is one."""
+    ids = list(ids)
+    if not ids:
+        return
+
+    if data is None:
+        data = [None] * len(ids)
+
+    with transaction.atomic(using=using, savepoint=False):
+        Change.objects.using(using).bulk_create((
+            Change(model=model, action=action, object_id=pk, data=item) for pk, item in zip(ids, data)
+        ), batch_size=RECORD_BATCH_SIZE)
+
+    versions.after_commit(functools.partial(sequence_committed, using), using=using)
+
+
+def record_objects(action, objects, using=DEFAULT_DB_ALIAS):
+    """Append entries for rooms or bookings, all of one model, together with their data."""
+    objects = list(objects)
+    if not objects:
+        return
+
+    model = ROOM if isinstance(objects[0], Room) else BOOKING
+    data = SERIALIZERS[model](objects, many=True, context={'compact_types': False}).data
+
+    record(model, action, [obj.pk for obj in objects], data, using=using)
+
+
+def notify():
+    global _generation
+
+    with _committed:
+        _generation += 1
+        _committed.notify_all()
+
+
+def read(entries, since, limit, wait=0):
+    """
+    Return up to `limit` + 1 of the entries of the queryset following `since`, in the order of their seqs.
+
+    With nothing to return, waits up to `wait` seconds for entries to be
+    committed. Commits of this process wake the reader at once, those of
+    other processes are noticed within POLL_INTERVAL.
+    """
+    entries = entries.filter(seq__gt=since).order_by('seq')[:limit + 1]
+    deadline = time.monotonic() + wait
+
+    while True:
+        generation = _generation
+        sequence()
+        rows = list(entries.all())
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            return rows
+
+        with _committed:
+            _committed.wait_for(lambda: _generation != generation, min(remaining, POLL_INTERVAL))
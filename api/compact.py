@@ -0,0 +1,51 @@
+"""
+Compact representations of field values for binary formats such as MessagePack.
+
+Dates become days since 1970-01-01 and decimals integers scaled by their
+decimal places, so clients neither parse date nor decimal strings.
+"""
+import datetime
+from decimal import Decimal
+
+from rest_framework import serializers
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def compact_converter(field):
+    """Return a function converting a value of the field to its compact representation, or None if it has none."""
+    if isinstance(field, serializers.DecimalField) and field.decimal_places is not None:
+        places = field.decimal_places
+        exponent = Decimal(1).scaleb(-places)
+
+        def convert_decimal(value):
+            value = value if isinstance(value, Decimal) else Decimal(value)
+            return int(value.quantize(exponent, rounding=field.rounding).scaleb(places))
+
+        return convert_decimal
+
+    if isinstance(field, serializers.DateField):
+        def convert_date(value):
+            value = datetime.date.fromisoformat(value) if isinstance(value, str) else value
+            return value.toordinal() - EPOCH_ORDINAL
+
+        return convert_date
+
+    return None
+
+
+def compact_value(field, value):
+    """Turn a compact input value of the field back to the one the field validates, or return it as is."""
+    if not isinstance(value, int) or isinstance(value, bool):
+        return value
+
+    if isinstance(field, serializers.DecimalField) and field.decimal_places is not None:
+        return Decimal(value).scaleb(-field.decimal_places)
+
+    if isinstance(field, serializers.DateField):
+        try:
+            return datetime.date.fromordinal(value + EPOCH_ORDINAL)
+        except (OverflowError, ValueError):
+            pass
+
+    return value
@@ -0,0 +1,109 @@
+"""
+Booking summaries kept on room rows, so room lists can show them without a
+query per room.
+
+The summaries cover the current and upcoming bookings of the room, the
+ones ending today or later:
+
+- upcoming_bookings: how many of them the room has;
+- next_begin_date: the earliest begin_date among them;
+- last_end_date: the latest end_date among them.
+
+Bookings ending yesterday drop out of the summaries when archive_bookings
+moves them out of the booking table, so it has to run daily, right after
+midnight, as the archive service of docker-compose.yml does. Until it
+runs, they are still counted.
+
+They are maintained in the transaction changing the bookings, by the signal
+receivers in api.signals, the bulk paths in api.bulk and api.archive. Rooms
+deleted together with their bookings take their summaries with them.
+reconcile() recomputes them in bulk and reports the rooms that drifted.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .locks import rooms_lock
+from .models import Booking, Room
+
+REFRESH_BATCH_SIZE = 500
+
+RECONCILE_BATCH_SIZE = 1000
+
+FIELDS = ('upcoming_bookings', 'next_begin_date', 'last_end_date')
+
+
+def booking_added(room_id, begin_date, end_date, using=DEFAULT_DB_ALIAS):
+    """Account for a booking just inserted, without looking at the other bookings of the room."""
+    # Models created with dates given as strings keep the strings
+    end_date = Booking._meta.get_field('end_date').to_python(end_date)
+    if end_date < timezone.localdate():
+        return
+
+    Room.objects.using(using).filter(pk=room_id).update(
+        upcoming_bookings=F('upcoming_bookings') + 1,
+        next_begin_date=Least(Coalesce('next_begin_date', Value(begin_date)), Value(begin_date)),
+        last_end_date=Greatest(Coalesce('last_end_date', Value(end_date)), Value(end_date))
+    )
+
+
+def actual():
+    """Return expressions computing the summaries of the outer room from its bookings."""
+    bookings = Booking.objects.filter(room=OuterRef('pk'), end_date__gte=timezone.localdate())
+    count = bookings.order_by().values('room').annotate(count=Count('pk')).values('count')
+
+    return {
+        'upcoming_bookings': Coalesce(Subquery(count), 0, output_field=IntegerField()),
+        'next_begin_date': Subquery(bookings.order_by('begin_date').values('begin_date')[:1]),
+        # Bookings of a room never overlap each other, so the one beginning
+        # the latest also ends the latest
+        'last_end_date': Subquery(bookings.order_by('-begin_date').values('end_date')[:1]),
+    }
+
+
+def refresh(room_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Recompute the summaries of the rooms from their bookings.
+
+    Takes one statement per batch of rooms. Callers hold the locks of the
+    rooms, so no booking of them is being inserted meanwhile.
+    """
+    room_ids = list(room_ids)
+    for i in range(0, len(room_ids), REFRESH_BATCH_SIZE):
+        Room.objects.using(using).filter(pk__in=room_ids[i:i + REFRESH_BATCH_SIZE]).update(**actual())
+
+
+def reconcile(batch_size=RECONCILE_BATCH_SIZE, dry_run=False, using=DEFAULT_DB_ALIAS):
+    """
+    Compare the summaries of every room with its bookings and fix the ones that drifted.
+
+    Rooms are checked in batches, each holding the locks of its rooms.
+    Returns the number of rooms checked and the ids of the drifted ones.
+    """
+    checked = 0
+    drifted = []
+    last_pk = 0
+
+    while True:
+        room_ids = list(
+            Room.objects.using(using).filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not room_ids:
+            return checked, drifted
+
+        with rooms_lock(room_ids, using=using):
+            rows = Room.objects.using(using).filter(pk__in=room_ids).annotate(
+                **{f'actual_{name}': expression for name, expression in actual().items()}
+            ).values('pk', *FIELDS, *(f'actual_{name}' for name in FIELDS))
+
+            batch_drifted = [
+                row['pk'] for row in rows if any(row[name] != row[f'actual_{name}'] for name in FIELDS)
+            ]
+            if batch_drifted and not dry_run:
+                refresh(batch_drifted, using=using)
+
+        checked += len(room_ids)
+        drifted += batch_drifted
+        last_pk = room_ids[-1]
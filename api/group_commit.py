@@ -0,0 +1,84 @@
+"""
+Group commit of bookings created by concurrent requests.
+
+With BOOKING_GROUP_COMMIT on, POST /booking/ hands its validated booking
+to a batch instead of inserting it in a transaction of its own. The
+first request to arrive leads the batch: it waits BOOKING_GROUP_COMMIT_WINDOW
+seconds, or until BOOKING_GROUP_COMMIT_MAX_SIZE requests have joined,
+then checks the bookings of all of them against the database and against
+each other and inserts them in one transaction with
+api.bulk.create_each_booking. The others wait for it and answer with
+their own outcome: a booking overlapping a stored one or one that
+arrived earlier in the batch fails with OVERLAPPING_DATES, as if the
+requests had been served one after another in the order they arrived.
+
+Only requests served by threads of the same process share batches, e.g.
+the view threads of config/settings_docker_asgi.py; a worker serving one
+request at a time only adds the window to every request.
+"""
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .bulk import create_each_booking
+
+
+class GroupCommitFailed(Exception):
+    """Raised to every request of a batch whose transaction failed, the original error being its cause."""
+
+
+class Batch:
+    def __init__(self):
+        self.items = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.bookings = None
+        self.error = None
+
+
+class GroupCommit:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.batch = None
+
+    def create(self, item, using=DEFAULT_DB_ALIAS):
+        """Create the booking of a validated item together with concurrent ones; None if it overlaps."""
+        with self.lock:
+            batch = self.batch
+            leader = batch is None
+            if leader:
+                batch = self.batch = Batch()
+
+            index = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= settings.BOOKING_GROUP_COMMIT_MAX_SIZE:
+                self.batch = None
+                batch.full.set()
+
+        if leader:
+            self.commit(batch, using)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise GroupCommitFailed from batch.error
+
+        return batch.bookings[index]
+
+    def commit(self, batch, using):
+        batch.full.wait(settings.BOOKING_GROUP_COMMIT_WINDOW)
+        with self.lock:
+            # Later requests start a batch of their own
+            if self.batch is batch:
+                self.batch = None
+
+        try:
+            batch.bookings = create_each_booking(batch.items, using=using)
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+
+
+group_commit = GroupCommit()
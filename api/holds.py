@@ -0,0 +1,285 @@
+"""
+Short-lived holds on booking dates, confirmed into bookings in batches.
+
+POST /hold/ takes a hold on a room for a date range without touching the
+database: a hold overlapping another live hold of the room is rejected
+on the spot, and so is one overlapping a booking the occupancy cache,
+when it is on, knows about. Holds left are confirmed by a background
+thread, which writes the bookings of up to HOLD_BATCH_SIZE of them with
+api.bulk.create_bookings in one transaction. Holds overlapping bookings
+made meanwhile or referencing rooms that don't exist are rejected then,
+and so are holds the confirmer fails on, see confirm().
+GET /hold/<id>/ reports how a hold ended.
+
+A hold not confirmed within HOLD_TTL seconds expires, and a finished
+hold is forgotten HOLD_RESULT_TTL seconds later. Both deadlines go into
+a heap, so reaping takes the holds that are due and looks at no other.
+
+Holds live in the worker process that took them, so with several
+workers a conflict between holds of different workers is only caught
+by the confirmer, and a client must ask the same worker about its hold.
+"""
+import bisect
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, InterfaceError, OperationalError, close_old_connections
+from django.utils import timezone
+
+from .bulk import create_bookings
+from .models import Room
+from .occupancy import occupancy
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+
+CONFIRMED = 'confirmed'
+
+REJECTED = 'rejected'
+
+EXPIRED = 'expired'
+
+OVERLAPPING_DATES = {'non_field_errors': ['OVERLAPPING_DATES']}
+
+CONFIRMATION_FAILED = {'non_field_errors': ['CONFIRMATION_FAILED']}
+
+
+class HoldConflict(Exception):
+    pass
+
+
+class Hold:
+    def __init__(self, room_id, begin_date, end_date, ttl):
+        self.id = uuid.uuid4().hex
+        self.room_id = room_id
+        self.begin_date = begin_date
+        self.end_date = end_date
+        self.status = PENDING
+        self.expires_at = timezone.now() + datetime.timedelta(seconds=ttl)
+        self.deadline = time.monotonic() + ttl
+        # Set once a confirmer has taken the hold, which no longer expires then
+        self.taken = False
+        self.booking_id = None
+        self.errors = None
+
+
+class HoldQueue:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.arrived = threading.Condition(self.lock)
+        self.holds = {}
+        # Live holds of every room sorted by begin_date. They never overlap
+        # each other, so their end dates are sorted too.
+        self.rooms = defaultdict(list)
+        self.pending = deque()
+        self.deadlines = []
+        self.sequence = itertools.count()
+        self.confirmer = None
+
+    def hold(self, room_id, begin_date, end_date):
+        """Take a hold on the dates of the room or raise HoldConflict."""
+        if occupancy.is_free(room_id, begin_date, end_date) is False:
+            raise HoldConflict
+
+        self.start_confirmer()
+
+        with self.lock:
+            self.reap()
+
+            holds = self.rooms[room_id]
+            # Of the holds beginning before the range ends, the last one ends
+            # the latest, so it overlaps the range if any of them does
+            position = bisect.bisect_right([hold.begin_date for hold in holds], end_date)
+            if position and holds[position - 1].end_date >= begin_date:
+                raise HoldConflict
+
+            hold = Hold(room_id, begin_date, end_date, settings.HOLD_TTL)
+            holds.insert(position, hold)
+            self.holds[hold.id] = hold
+            self.pending.append(hold)
+            self.schedule(hold)
+            self.arrived.notify()
+
+        return hold
+
+    def get(self, hold_id):
+        with self.lock:
+            self.reap()
+            return self.holds.get(hold_id)
+
+    def take(self, limit):
+        """Return up to `limit` pending holds in the order they were taken, for a confirmer."""
+        with self.lock:
+            self.reap()
+
+            holds = []
+            while self.pending and len(holds) < limit:
+                hold = self.pending.popleft()
+                if hold.status == PENDING:
+                    hold.taken = True
+                    holds.append(hold)
+
+            return holds
+
+    def put_back(self, holds):
+        """Queue holds a confirmer failed to confirm again, in front of the rest."""
+        with self.lock:
+            for hold in reversed(holds):
+                hold.taken = False
+                self.pending.appendleft(hold)
+                # Its deadline may have passed meanwhile
+                self.schedule(hold)
+            self.arrived.notify()
+
+    def finish(self, hold, status, booking_id=None, errors=None):
+        with self.lock:
+            self.release(hold)
+            hold.status = status
+            hold.booking_id = booking_id
+            hold.errors = errors
+            hold.deadline = time.monotonic() + settings.HOLD_RESULT_TTL
+            self.schedule(hold)
+
+    def wait(self, timeout):
+        """Wait until there are pending holds, then `timeout` more seconds for others to join them."""
+        with self.lock:
+            self.arrived.wait_for(lambda: self.pending)
+        time.sleep(timeout)
+
+    def schedule(self, hold):
+        heapq.heappush(self.deadlines, (hold.deadline, next(self.sequence), hold))
+
+    def release(self, hold):
+        holds = self.rooms[hold.room_id]
+        holds.remove(hold)
+        if not holds:
+            del self.rooms[hold.room_id]
+
+    def reap(self):
+        """Expire pending holds and forget finished ones whose deadline has passed. Callers hold the lock."""
+        now = time.monotonic()
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, _, hold = heapq.heappop(self.deadlines)
+            if hold.deadline > now:
+                # Rescheduled since
+                continue
+
+            if hold.status == PENDING:
+                if hold.taken:
+                    continue
+                self.release(hold)
+                hold.status = EXPIRED
+                hold.deadline = now + settings.HOLD_RESULT_TTL
+                self.schedule(hold)
+            else:
+                del self.holds[hold.id]
+
+    def start_confirmer(self):
+        if not settings.HOLD_CONFIRMER or self.confirmer is not None:
+            return
+
+        with self.lock:
+            if self.confirmer is None:
+                self.confirmer = threading.Thread(target=self.run_confirmer, name='api-hold-confirmer', daemon=True)
+                self.confirmer.start()
+
+    def run_confirmer(self):
+        while True:
+            self.wait(settings.HOLD_CONFIRM_INTERVAL)
+            try:
+                while confirm(self):
+                    pass
+            except Exception:
+                logger.exception('Confirming booking holds failed')
+                time.sleep(settings.HOLD_CONFIRM_INTERVAL)
+            finally:
+                close_old_connections()
+
+    def clear(self):
+        with self.lock:
+            self.holds.clear()
+            self.rooms.clear()
+            self.pending.clear()
+            self.deadlines.clear()
+
+
+holds = HoldQueue()
+
+
+def confirm(queue=holds, using=DEFAULT_DB_ALIAS):
+    """
+    Write the bookings of a batch of pending holds and return the number of holds finished.
+
+    A batch failing for another reason than the database being unavailable
+    is tried again one hold at a time, and a hold failing on its own is
+    rejected, so it doesn't keep the holds queued after it from confirming.
+    """
+    batch = queue.take(settings.HOLD_BATCH_SIZE)
+    if not batch:
+        return 0
+
+    try:
+        confirm_batch(queue, batch, using=using)
+    except (OperationalError, InterfaceError):
+        queue.put_back([hold for hold in batch if hold.status == PENDING])
+        raise
+    except Exception:
+        logger.exception('Confirming a batch of %d booking holds failed', len(batch))
+        pending = [hold for hold in batch if hold.status == PENDING]
+        if len(batch) == 1:
+            for hold in pending:
+                queue.finish(hold, REJECTED, errors=CONFIRMATION_FAILED)
+        else:
+            confirm_each(queue, pending, using=using)
+
+    return len(batch)
+
+
+def confirm_each(queue, batch, using=DEFAULT_DB_ALIAS):
+    for i, hold in enumerate(batch):
+        try:
+            confirm_batch(queue, [hold], using=using)
+        except (OperationalError, InterfaceError):
+            queue.put_back([hold for hold in batch[i:] if hold.status == PENDING])
+            raise
+        except Exception:
+            logger.exception('Confirming booking hold %s failed', hold.id)
+            queue.finish(hold, REJECTED, errors=CONFIRMATION_FAILED)
+
+
+def confirm_batch(queue, batch, using=DEFAULT_DB_ALIAS):
+    rooms = Room.objects.using(using).in_bulk({hold.room_id for hold in batch})
+
+    waiting = []
+    for hold in batch:
+        if hold.room_id in rooms:
+            waiting.append(hold)
+        else:
+            queue.finish(hold, REJECTED, errors={
+                'room_id': [f'Invalid pk "{hold.room_id}" - object does not exist.']
+            })
+
+    # Nothing is created while any of the items overlaps, so the
+    # overlapping ones are rejected and the rest tried again
+    while waiting:
+        items = [
+            {'room': rooms[hold.room_id], 'begin_date': hold.begin_date, 'end_date': hold.end_date}
+            for hold in waiting
+        ]
+        bookings, overlapping = create_bookings(items, using=using)
+        if not overlapping:
+            for hold, booking in zip(waiting, bookings):
+                queue.finish(hold, CONFIRMED, booking_id=booking.pk)
+            break
+
+        for i in overlapping:
+            queue.finish(waiting[i], REJECTED, errors=OVERLAPPING_DATES)
+        waiting = [hold for i, hold in enumerate(waiting) if i not in overlapping]
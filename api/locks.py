@@ -0,0 +1,45 @@
+import contextlib
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Room
+from .occupancy import occupancy
+
+# SQLite has neither row locks nor concurrent writers, so on such backends
+# booking writes are serialized inside the process instead.
+_local_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def rooms_lock(room_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Open a transaction holding an exclusive lock on the bookings of the rooms.
+
+    The lock is held until the transaction ends, so bookings inserted inside
+    the block are visible to whoever takes the lock next. On PostgreSQL the
+    room rows are locked, so locks of different rooms never block each other.
+
+    Occupancy bitmaps are updated while the lock is held and dropped when
+    the block fails.
+    """
+    if connections[using].features.has_select_for_update:
+        local_lock = contextlib.nullcontext()
+    else:
+        local_lock = _local_lock
+
+    # The guard sits inside the transaction, so bitmaps changed by a failing
+    # block are dropped before the row locks are released
+    with local_lock, transaction.atomic(using=using), occupancy.rollback_guard():
+        # Rows are locked in the order of their keys to rule out deadlocks.
+        # Locking them also keeps the rooms from being deleted midway.
+        list(
+            Room.objects.using(using).select_for_update()
+            .filter(pk__in=room_ids).order_by('pk').values_list('pk')
+        )
+
+        yield
+
+
+def room_lock(room_id, using=DEFAULT_DB_ALIAS):
+    return rooms_lock((room_id,), using=using)
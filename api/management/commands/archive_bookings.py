@@ -0,0 +1,27 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.archive import ARCHIVE_BATCH_SIZE, archive_bookings
+
+
+class Command(BaseCommand):
+    help = 'Move bookings that ended before a date, today by default, out of the booking table to the archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before', type=datetime.date.fromisoformat,
+            help='Archive bookings ending before this date, YYYY-MM-DD. It may not be later than today.'
+        )
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        before = options['before'] or timezone.localdate()
+
+        try:
+            moved = archive_bookings(before, batch_size=options['batch_size'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        self.stdout.write(f'Archived {moved} bookings ending before {before.isoformat()}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.counters import RECONCILE_BATCH_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recompute the booking summaries of every room and report the rooms whose summaries drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RECONCILE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Report the drift without fixing it.')
+
+    def handle(self, *args, **options):
+        checked, drifted = reconcile(batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        if drifted and options['verbosity'] > 1:
+            self.stdout.write('Drifted rooms: ' + ', '.join(map(str, drifted)))
+        self.stdout.write(
+            f"Checked {checked} rooms, {len(drifted)} drifted" + ('' if options['dry_run'] or not drifted else ', fixed')
+        )
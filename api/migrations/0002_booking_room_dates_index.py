@@ -0,0 +1,36 @@
+# Generated by Django 3.2.11 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        'ALTER TABLE api_booking ADD CONSTRAINT api_booking_no_overlap '
+        "EXCLUDE USING gist (room_id WITH =, daterange(begin_date, end_date, '[]') WITH &&)"
+    )
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('ALTER TABLE api_booking DROP CONSTRAINT IF EXISTS api_booking_no_overlap')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'begin_date', 'end_date'], name='api_booking_room_dates_idx'),
+        ),
+        migrations.RunPython(add_exclusion_constraint, remove_exclusion_constraint),
+    ]
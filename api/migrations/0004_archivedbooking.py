@@ -0,0 +1,27 @@
+# Generated by Django 3.2.11 on 2026-10-18 10:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_listversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('begin_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.room')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['room', 'begin_date', 'end_date'], name='api_archived_room_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.11 on 2026-10-18 10:27
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def compute_counters(apps, schema_editor):
+    Booking = apps.get_model('api', 'Booking')
+    Room = apps.get_model('api', 'Room')
+
+    bookings = Booking.objects.filter(room=OuterRef('pk'), end_date__gte=timezone.localdate())
+    count = bookings.order_by().values('room').annotate(count=Count('pk')).values('count')
+
+    Room.objects.using(schema_editor.connection.alias).update(
+        upcoming_bookings=Coalesce(Subquery(count), 0, output_field=IntegerField()),
+        next_begin_date=Subquery(bookings.order_by('begin_date').values('begin_date')[:1]),
+        last_end_date=Subquery(bookings.order_by('-begin_date').values('end_date')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_archivedbooking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='last_end_date',
+            field=models.DateField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='next_begin_date',
+            field=models.DateField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='upcoming_bookings',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(compute_counters, migrations.RunPython.noop),
+    ]
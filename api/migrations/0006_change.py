@@ -0,0 +1,28 @@
+# Generated by Django 3.2.11 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_room_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('seq', models.BigIntegerField(null=True, unique=True)),
+                ('model', models.CharField(max_length=16)),
+                ('action', models.CharField(max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('data', models.JSONField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(condition=models.Q(('seq__isnull', True)), fields=['id'], name='api_change_unsequenced_idx'),
+        ),
+    ]
@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import functools
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from rest_framework import mixins
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from . import replicas, versions
+from .responses import response_cache
+
+_executor = None
+
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.ASYNC_VIEW_THREADS, thread_name_prefix='api-view')
+
+    return _executor
+
+
+def run_view(view, request, *args, **kwargs):
+    # Pool threads keep database connections of their own, so they are
+    # recycled here the way request_started and request_finished do it for
+    # a request served by a sync worker
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+
+        if isinstance(response, StreamingHttpResponse):
+            # Django 3.2 iterates streaming content on the event loop, where
+            # the queryset behind it can't be read, so it is rendered here
+            response = HttpResponse(
+                b''.join(response.streaming_content),
+                status=response.status_code,
+                headers=dict(response.items())
+            )
+        elif callable(getattr(response, 'render', None)):
+            response.render()
+
+        return response
+    finally:
+        close_old_connections()
+
+
+class AsyncViewSetMixin:
+    """
+    Serve the viewset as coroutines when the ASYNC_VIEWS setting is on.
+
+    Django 3.2 has no async ORM and runs sync views of an ASGI application
+    one at a time in a single thread. Each request is handed to a pool of
+    ASYNC_VIEW_THREADS threads instead, so a slow database round trip ties
+    up one of them rather than the whole worker, while the event loop keeps
+    accepting connections.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+
+        @functools.wraps(view)
+        async def async_view(request, *args, **kwargs):
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                get_executor(), functools.partial(context.run, run_view, view, request, *args, **kwargs)
+            )
+
+        return async_view
+
+
+class ReplicaReadMixin:
+    """
+    Read lists from a replica unless the client wrote something lately.
+
+    A successful write pins the client to the primary for REPLICA_PIN_SECONDS
+    with a cookie, so it reads its own writes while the replicas catch up.
+    """
+    replica_pin_cookie = 'replica_pin'
+
+    def list(self, request, *args, **kwargs):
+        with self.reading_replica(request):
+            return super().list(request, *args, **kwargs)
+
+    def reading_replica(self, request):
+        """Route the reads of the block to a replica unless the client is pinned to the primary."""
+        alias = None if self.is_pinned(request) else replicas.choose()
+
+        return replicas.reading_from(alias)
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES[self.replica_pin_cookie]) > time.time()
+        except (KeyError, ValueError):
+            return False
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400 and settings.REPLICA_DATABASES:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                self.replica_pin_cookie, str(time.time() + seconds), max_age=seconds, httponly=True, samesite='Lax'
+            )
+
+        return response
+
+
+class ConditionalListModelMixin:
+    """
+    Tag lists with strong ETags and answer conditional requests with 304 Not Modified.
+
+    The ETag is derived from the version counters of the listed data,
+    returned by `get_list_version_keys()`, along with everything else the
+    output depends on: the URL, query string included, and the negotiated
+    media type. A matching If-None-Match is answered from the counters alone,
+    the list is neither queried nor serialized.
+
+    Rendered lists are cached under their ETags as well, so other clients
+    asking for the same unchanged list get the cached bytes.
+    """
+    # Representations rendered for a particular user, e.g. the browsable API, are not shared
+    response_cache_formats = ('json', 'msgpack')
+
+    def get_list_version_keys(self):
+        raise NotImplementedError('`get_list_version_keys()` must be implemented.')
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_list(request, functools.partial(super().list, request, *args, **kwargs))
+
+    def conditional_list(self, request, get_response):
+        """Tag the response returned by `get_response()`, calling it only if neither a 304 nor the cache answer."""
+        etag = self.get_list_etag(request)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.get_cached_list(request, etag)
+        if response is None:
+            response = get_response()
+            if isinstance(response, Response) and request.accepted_renderer.format in self.response_cache_formats:
+                response.add_post_render_callback(
+                    lambda rendered: response_cache.set(etag, rendered['Content-Type'], rendered.content)
+                )
+
+        response['ETag'] = etag
+        # Clients may keep the list but have to revalidate it before use
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ('Accept',))
+
+        return response
+
+    def get_cached_list(self, request, etag):
+        if request.accepted_renderer.format not in self.response_cache_formats:
+            return None
+
+        entry = response_cache.get(etag)
+        if entry is None:
+            return None
+
+        content_type, content = entry
+        return HttpResponse(content, content_type=content_type)
+
+    def get_list_etag(self, request):
+        keys = self.get_list_version_keys()
+        state = (
+            request.build_absolute_uri(),
+            request.accepted_media_type,
+            tuple(zip(keys, versions.get(keys))),
+        )
+
+        return quote_etag(hashlib.blake2b(repr(state).encode(), digest_size=16).hexdigest())
+
+
+class StreamingListModelMixin(mixins.ListModelMixin):
+    """
+    List a queryset, streaming the whole of it as JSON when `stream=true` is passed.
+
+    Rows are read from the database and rendered in chunks, so a worker only
+    keeps one chunk in memory no matter how long the list is. The output is
+    the same as the one of the unpaginated list.
+
+    With `values_serialization` on, rows are fetched with QuerySet.values()
+    and represented by the serializer's fast path instead of building a
+    model instance and a serializer representation for each of them.
+    """
+    stream_query_param = 'stream'
+
+    stream_chunk_size = 1000
+
+    values_serialization = True
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.values_serialization:
+            queryset = self.get_serializer_class().values_queryset(queryset)
+
+        if request.query_params.get(self.stream_query_param, '').lower() == 'true':
+            # Rows are read after the view returns, so the database is picked now
+            queryset = queryset.using(queryset.db)
+            return StreamingHttpResponse(self.stream(queryset), content_type=JSONRenderer.media_type)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.represent(page))
+
+        return Response(self.represent(queryset))
+
+    def represent(self, rows, compact=None):
+        if compact is None:
+            compact = getattr(self.request.accepted_renderer, 'compact_types', False)
+
+        if self.values_serialization:
+            return self.get_serializer_class().represent_values(rows, compact)
+
+        context = {**self.get_serializer_context(), 'compact_types': compact}
+        return self.get_serializer(rows, many=True, context=context).data
+
+    def stream(self, queryset):
+        renderer = self.get_stream_renderer()
+        separator = b',' if renderer.compact else b', '
+
+        yield b'['
+
+        chunk = []
+        first = True
+        for row in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(row)
+            if len(chunk) == self.stream_chunk_size:
+                yield self.render_chunk(renderer, chunk, separator, first)
+                chunk = []
+                first = False
+
+        if chunk:
+            yield self.render_chunk(renderer, chunk, separator, first)
+
+        yield b']'
+
+    def get_stream_renderer(self):
+        """Return the JSON renderer of the view, e.g. a faster drop-in replacement of JSONRenderer."""
+        for renderer_class in self.renderer_classes:
+            if issubclass(renderer_class, JSONRenderer):
+                return renderer_class()
+
+        return JSONRenderer()
+
+    def render_chunk(self, renderer, chunk, separator, first):
+        # Rendering the chunk as a list and dropping its brackets keeps the
+        # formatting identical to rendering the whole list at once
+        rendered = renderer.render(self.represent(chunk, compact=False))[1:-1]
+
+        return rendered if first else separator + rendered
@@ -1,4 +1,58 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+class BookingQuerySet(models.QuerySet):
+    def overlapping(self, room, begin_date, end_date):
+        # Bookings of a room never overlap each other, so the only booking
+        # beginning before begin_date that can reach into the range is the
+        # closest preceding one. That turns the check into a single short
+        # range seek on the (room, begin_date, end_date) index, no matter how
+        # long the booking history of the room is.
+        # A room referenced from an outer query is one level further away
+        # from the nested subquery
+        preceding_room = OuterRef(room) if isinstance(room, OuterRef) else room
+        preceding = self.filter(room=preceding_room, begin_date__lt=begin_date).order_by('-begin_date')
+        lower_bound = Coalesce(
+            Subquery(preceding.values('begin_date')[:1]),
+            Value(begin_date),
+            output_field=models.DateField()
+        )
+
+        return self.filter(
+            room=room,
+            begin_date__gte=lower_bound,
+            begin_date__lte=end_date,
+            end_date__gte=begin_date
+        )
+
+    def overlapping_rooms(self, room_ids, begin_date, end_date):
+        """Bookings of any of the rooms overlapping the range, each room bounded the way `overlapping` does."""
+        preceding = self.filter(room=OuterRef('room'), begin_date__lt=begin_date).order_by('-begin_date')
+        lower_bound = Coalesce(
+            Subquery(preceding.values('begin_date')[:1]),
+            Value(begin_date),
+            output_field=models.DateField()
+        )
+
+        return self.filter(
+            room__in=room_ids,
+            begin_date__gte=lower_bound,
+            begin_date__lte=end_date,
+            end_date__gte=begin_date
+        )
+
+
+class RoomQuerySet(models.QuerySet):
+    def available(self, begin_date, end_date):
+        queryset = self.filter(~Exists(Booking.objects.overlapping(OuterRef('pk'), begin_date, end_date)))
+        if ArchivedBooking.may_overlap(begin_date):
+            queryset = queryset.filter(~Exists(ArchivedBooking.objects.overlapping(OuterRef('pk'), begin_date, end_date)))
+
+        return queryset
 
 
 class Room(models.Model):
@@ -8,6 +62,16 @@ class Room(models.Model):
 
     created_at = models.DateField(auto_now_add=True, db_index=True)
 
+    # Summary of the bookings of the room, maintained by api/counters.py.
+    # The count changes with every booking, so it is left without an index.
+    upcoming_bookings = models.PositiveIntegerField(default=0, editable=False)
+
+    next_begin_date = models.DateField(null=True, editable=False, db_index=True)
+
+    last_end_date = models.DateField(null=True, editable=False, db_index=True)
+
+    objects = RoomQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.description}'
 
@@ -19,5 +83,95 @@ class Booking(models.Model):
 
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
 
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('room', 'begin_date', 'end_date'), name='api_booking_room_dates_idx'),
+        )
+
     def __str__(self):
         return f"Booking of '{self.room}' ({self.begin_date}-{self.end_date})"
+
+    def clean(self):
+        # Keeps bookings made outside of the API (e.g. in the admin) from
+        # breaking the invariant BookingQuerySet.overlapping relies on
+        if self.begin_date is None or self.end_date is None or self.room_id is None:
+            return
+
+        if self.begin_date > self.end_date:
+            raise ValidationError('begin_date must be less than or equal to end_date')
+
+        others = Booking.objects.exclude(pk=self.pk)
+        if others.overlapping(self.room_id, self.begin_date, self.end_date).exists():
+            raise ValidationError('OVERLAPPING_DATES')
+        if ArchivedBooking.may_overlap(self.begin_date) and \
+                ArchivedBooking.objects.overlapping(self.room_id, self.begin_date, self.end_date).exists():
+            raise ValidationError('OVERLAPPING_DATES')
+
+
+class ArchivedBooking(models.Model):
+    """
+    A booking that ended in the past, moved out of api_booking by the archive_bookings command.
+
+    Keeps the id the booking had, so the booking table and its indexes only
+    hold current and upcoming stays.
+    """
+    id = models.BigIntegerField(primary_key=True)
+
+    begin_date = models.DateField()
+
+    end_date = models.DateField()
+
+    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('room', 'begin_date', 'end_date'), name='api_archived_room_dates_idx'),
+        )
+
+    def __str__(self):
+        return f"Archived booking of '{self.room}' ({self.begin_date}-{self.end_date})"
+
+    @staticmethod
+    def may_overlap(begin_date):
+        # Only bookings that ended before today are archived, so ranges
+        # beginning today or later never need to look at the archive
+        return begin_date < timezone.localdate()
+
+
+class ListVersion(models.Model):
+    """A counter bumped on every change of the data behind a list, see api/versions.py."""
+    key = models.CharField(max_length=32, primary_key=True)
+
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.key}: {self.version}'
+
+
+class Change(models.Model):
+    """An entry of the append-only log of room and booking changes, see api/changes.py."""
+    id = models.BigAutoField(primary_key=True)
+
+    # Numbered after the transaction writing the entry commits, None until then
+    seq = models.BigIntegerField(null=True, unique=True)
+
+    model = models.CharField(max_length=16)
+
+    action = models.CharField(max_length=16)
+
+    object_id = models.BigIntegerField()
+
+    # The object as the API shows it, None for deletions
+    data = models.JSONField(null=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('id',), condition=models.Q(seq__isnull=True), name='api_change_unsequenced_idx'),
+        )
+
+    def __str__(self):
+        return f'#{self.seq}: {self.model} {self.object_id} {self.action}'
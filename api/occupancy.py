@@ -0,0 +1,168 @@
+"""
+Per-room occupancy bitmaps answering overlap checks without a database query.
+
+A bitmap holds one bit per day of a rolling horizon starting a bit before
+today. Bitmaps are kept in the cache named by the OCCUPANCY_CACHE setting:
+a local memory cache keeps them in process, while Redis or Memcached share
+them between workers, which is required when running several of them.
+They are loaded from the database on a miss and maintained incrementally
+by the signal receivers in api.signals and the bulk paths in api.bulk.
+"""
+import contextlib
+import datetime
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+HORIZON_PAST_DAYS = 31
+
+HORIZON_DAYS = 3 * 366
+
+# Bounds how long a bitmap left stale by a change made outside the API can live
+TIMEOUT = 24 * 60 * 60
+
+
+class OccupancyCache:
+    def __init__(self):
+        self.local = threading.local()
+        self.reset_stats()
+
+    @property
+    def store(self):
+        alias = getattr(settings, 'OCCUPANCY_CACHE', None)
+        return caches[alias] if alias else None
+
+    def horizon(self):
+        start = timezone.localdate() - datetime.timedelta(days=HORIZON_PAST_DAYS)
+        return start, start + datetime.timedelta(days=HORIZON_DAYS - 1)
+
+    def key(self, room_id, start):
+        return f'occupancy:{room_id}:{start.isoformat()}'
+
+    def is_free(self, room_id, begin_date, end_date):
+        """
+        Tell whether the room has no booking overlapping the range.
+
+        Returns None when the cache is off or the range leaves the horizon,
+        leaving the answer to the database.
+        """
+        store = self.store
+        start, end = self.horizon()
+        if store is None or begin_date < start or end_date > end:
+            return None
+
+        started = time.perf_counter()
+
+        key = self.key(room_id, start)
+        bitmap = store.get(key)
+        if bitmap is None:
+            self.misses += 1
+            bitmap = self.load(room_id, start, end)
+            store.set(key, bitmap, TIMEOUT)
+        else:
+            self.hits += 1
+
+        free = not int.from_bytes(bitmap, 'little') & self.mask(start, begin_date, end_date)
+
+        self.checks += 1
+        self.check_time += time.perf_counter() - started
+
+        return free
+
+    def load(self, room_id, start, end):
+        from .models import Booking
+
+        started = time.perf_counter()
+
+        bits = 0
+        for begin_date, end_date in Booking.objects.overlapping(room_id, start, end).values_list('begin_date', 'end_date'):
+            bits |= self.mask(start, max(begin_date, start), min(end_date, end))
+
+        self.loads += 1
+        self.load_time += time.perf_counter() - started
+
+        return bits.to_bytes((HORIZON_DAYS + 7) // 8, 'little')
+
+    def mask(self, start, begin_date, end_date):
+        offset = (begin_date - start).days
+        length = (end_date - begin_date).days + 1
+
+        return ((1 << length) - 1) << offset
+
+    def update(self, room_id, begin_date, end_date, occupied):
+        """Set or clear the days of a booking in the bitmap of the room if it is cached."""
+        store = self.store
+        if store is None:
+            return
+
+        start, end = self.horizon()
+        if end_date < start or begin_date > end:
+            return
+
+        key = self.key(room_id, start)
+        bitmap = store.get(key)
+        if bitmap is None:
+            return
+
+        bits = int.from_bytes(bitmap, 'little')
+        mask = self.mask(start, max(begin_date, start), min(end_date, end))
+        bits = bits | mask if occupied else bits & ~mask
+
+        store.set(key, bits.to_bytes(len(bitmap), 'little'), TIMEOUT)
+
+        touched = getattr(self.local, 'touched', None)
+        if touched is not None:
+            touched.add(room_id)
+
+    def add(self, room_id, begin_date, end_date):
+        self.update(room_id, begin_date, end_date, occupied=True)
+
+    def remove(self, room_id, begin_date, end_date):
+        self.update(room_id, begin_date, end_date, occupied=False)
+
+    def invalidate(self, room_ids):
+        store = self.store
+        if store is None:
+            return
+
+        start, _ = self.horizon()
+        store.delete_many([self.key(room_id, start) for room_id in room_ids])
+
+    @contextlib.contextmanager
+    def rollback_guard(self):
+        """Drop the bitmaps changed inside the block if it raises, as its transaction is rolled back."""
+        outer = getattr(self.local, 'touched', None)
+        self.local.touched = set()
+        try:
+            yield
+        except BaseException:
+            self.invalidate(self.local.touched)
+            raise
+        finally:
+            if outer is not None:
+                outer |= self.local.touched
+            self.local.touched = outer
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.checks = 0
+        self.check_time = 0.0
+        self.loads = 0
+        self.load_time = 0.0
+
+    def stats(self):
+        """Counters of this process since the last reset, times in milliseconds."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / self.checks if self.checks else None,
+            'check_ms': self.check_time / self.checks * 1000 if self.checks else None,
+            'load_ms': self.load_time / self.loads * 1000 if self.loads else None,
+        }
+
+
+occupancy = OccupancyCache()
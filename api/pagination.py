@@ -0,0 +1,225 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F
+from django.db.models.query_utils import Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the ordering chosen with OrderingFilter.
+
+    The primary key is appended to the ordering as a tiebreaker and the
+    cursor stores the ordering values of the last row of a page, so the next
+    page is a range seek starting right after it. Deep pages cost as much
+    as the first one.
+
+    NULLs of nullable ordering fields sort as if they were greater than any
+    value, on every backend.
+
+    Passing `paginate=false` opts out and returns the whole list as before.
+    """
+    page_size = 100
+
+    max_page_size = 1000
+
+    cursor_query_param = 'cursor'
+
+    page_size_query_param = 'page_size'
+
+    paginate_query_param = 'paginate'
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.paginate_query_param, '').lower() == 'false':
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = list(queryset.query.order_by)
+        # The tiebreaker follows the direction of the last ordering field, so
+        # the database can keep walking a single index in one direction
+        descending = bool(ordering) and ordering[-1].startswith('-')
+        pk = queryset.model._meta.pk.attname
+        self.ordering = [*ordering, f'-{pk}' if descending else pk]
+        names = list(map(self.field_name, self.ordering))
+        self.nullable = {name for name in names if self.is_nullable(queryset, name)}
+        selected = queryset.query.values_select
+        if selected and not set(names) <= set(selected):
+            # Rows of QuerySet.values() need the ordering values for the cursor
+            queryset = queryset.values(*selected, *(name for name in names if name not in selected))
+        queryset = queryset.order_by(*map(self.order_by, self.ordering))
+
+        cursor = self.decode_cursor(request)
+        try:
+            if cursor is not None:
+                queryset = queryset.filter(self.after(cursor))
+
+            page = list(queryset[:self.page_size + 1])
+        except (ValidationError, ValueError, TypeError, OverflowError):
+            # Cursor values not matching the types of the ordering fields,
+            # or integers out of the range the database can take
+            raise NotFound(self.invalid_cursor_message)
+
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.last_row = page[-1] if page else None
+
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {
+                    'type': 'string',
+                },
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {
+                    'type': 'integer',
+                },
+            },
+            {
+                'name': self.paginate_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Pass false to get the whole list without pagination.',
+                'schema': {
+                    'type': 'boolean',
+                },
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        # Rows are either model instances or dicts when paginating QuerySet.values()
+        last = self.last_row
+        if isinstance(last, dict):
+            values = [last[self.field_name(field)] for field in self.ordering]
+        else:
+            values = [getattr(last, self.field_name(field)) for field in self.ordering]
+        position = [None if value is None else force_str(value) for value in values]
+
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(position)
+        )
+
+    @staticmethod
+    def field_name(field):
+        return field.lstrip('-')
+
+    @staticmethod
+    def is_nullable(queryset, name):
+        try:
+            return queryset.model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+
+    def order_by(self, field):
+        name = self.field_name(field)
+        if name not in self.nullable:
+            return field
+
+        if field.startswith('-'):
+            return F(name).desc(nulls_first=True)
+        return F(name).asc(nulls_last=True)
+
+    def follows(self, field, value):
+        """Build the filter selecting values of the field that follow `value` in its direction."""
+        name = self.field_name(field)
+        descending = field.startswith('-')
+
+        if value is None:
+            # NULLs come last ascending and first descending
+            return Q(**{f'{name}__isnull': False}) if descending else Q(pk__in=[])
+
+        follows = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+        if name in self.nullable and not descending:
+            follows |= Q(**{f'{name}__isnull': True})
+
+        return follows
+
+    def after(self, position):
+        """Build the filter selecting rows that follow `position` in the current ordering."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = self.field_name(field)
+            condition |= equal & self.follows(field, value)
+            equal &= Q(**{f'{name}__isnull': True} if value is None else {name: value})
+
+        first = self.ordering[0]
+        if self.field_name(first) in self.nullable:
+            return condition
+
+        # The leading bound is redundant, but it lets the database start a
+        # range scan on the index of the first ordering field
+        bound = Q(**{f"{self.field_name(first)}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+
+        return bound & condition
+
+    def encode_cursor(self, position):
+        data = json.dumps([self.ordering, position], separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            ordering, position = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # A cursor is only valid for the ordering it was issued with
+        if ordering != self.ordering or not isinstance(position, list) or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
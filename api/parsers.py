@@ -0,0 +1,44 @@
+import codecs
+
+import msgpack
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonParser(JSONParser):
+    """Parse JSON with orjson when it is installed and the body is UTF-8, like JSONParser otherwise."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        # orjson rejects NaN and Infinity, like JSONParser does in strict mode only
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parse MessagePack request bodies.
+
+    Dates are expected as days since 1970-01-01 and decimals as integers
+    scaled by their decimal places, the way MessagePackRenderer renders them.
+    """
+    media_type = 'application/msgpack'
+
+    compact_types = True
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as e:
+            raise ParseError(f'MessagePack parse error - {e}')
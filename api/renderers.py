@@ -0,0 +1,61 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    Render JSON with orjson when it is installed, byte for byte like JSONRenderer.
+
+    Output orjson would render differently is left to JSONRenderer:
+    indented, ASCII-only or non-compact output and integers wider than 64
+    bits. Anything orjson can't render natively, e.g. decimals, dates and
+    lazy strings, goes through the encoder of JSONRenderer. Floats are
+    the only exception: orjson writes exponents without a plus sign and
+    NaN as null.
+    """
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped the way JSONRenderer does, keeping the output a strict JavaScript subset
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Render data as MessagePack.
+
+    Serializers represent dates as days since 1970-01-01 and decimals as
+    integers scaled by their decimal places in this format, see
+    api.compact.compact_converter.
+    """
+    media_type = 'application/msgpack'
+
+    format = 'msgpack'
+
+    charset = None
+
+    render_style = 'binary'
+
+    compact_types = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=str)
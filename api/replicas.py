@@ -0,0 +1,43 @@
+"""
+Routing of list reads to the read replicas named by REPLICA_DATABASES.
+
+Only the reads made inside `reading_from()` go to a replica, see
+ReplicaReadMixin; overlap checks and every other read of a request stay on
+the primary, and writes always go there.
+"""
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_read_database = contextvars.ContextVar('read_database', default=None)
+
+
+def choose():
+    """Pick a replica to read from, None when there are none."""
+    replicas = settings.REPLICA_DATABASES
+    return random.choice(replicas) if replicas else None
+
+
+@contextlib.contextmanager
+def reading_from(alias):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        # Instances read from a replica are saved to the primary too
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
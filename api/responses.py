@@ -0,0 +1,112 @@
+"""
+Rendered list responses cached under their ETags.
+
+An ETag covers the URL, the media type and the version counters of the
+listed data (see api.versions), so a change of the data moves the list to
+a new key and the stale entry is simply never asked for again. Entries are
+kept in a bounded in-process LRU, RESPONSE_CACHE_MAX_BYTES in size, and
+in the cache named by the RESPONSE_CACHE setting when there is one, which
+lets workers share them.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Entries of the shared cache are never stale, this only makes room for new ones
+TIMEOUT = 60 * 60
+
+
+class ResponseCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.reset_stats()
+
+    @property
+    def max_bytes(self):
+        return getattr(settings, 'RESPONSE_CACHE_MAX_BYTES', 0)
+
+    @property
+    def store(self):
+        alias = getattr(settings, 'RESPONSE_CACHE', None)
+        return caches[alias] if alias else None
+
+    def key(self, etag):
+        return f'response:{etag}'
+
+    def get(self, etag):
+        """Return the (content type, content) pair cached under the ETag, or None."""
+        with self.lock:
+            entry = self.entries.get(etag)
+            if entry is not None:
+                self.entries.move_to_end(etag)
+                self.hits += 1
+                return entry
+
+        store = self.store
+        entry = store.get(self.key(etag)) if store is not None else None
+
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.shared_hits += 1
+            self.put(etag, entry)
+
+        return entry
+
+    def set(self, etag, content_type, content):
+        entry = (content_type, content)
+
+        with self.lock:
+            self.put(etag, entry)
+
+        store = self.store
+        if store is not None:
+            store.set(self.key(etag), entry, TIMEOUT)
+
+    def put(self, etag, entry):
+        # Callers hold the lock
+        size = len(entry[1])
+        if size > self.max_bytes or etag in self.entries:
+            return
+
+        self.entries[etag] = entry
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, (_, content) = self.entries.popitem(last=False)
+            self.size -= len(content)
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Counters of this process since the last reset and the size of the local LRU."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'entries': len(self.entries),
+            'bytes': self.size,
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,438 @@
+"""
+OpenAPI annotations of the API views.
+
+They are applied to the views when this module is imported, which only
+SchemaGenerator, the DEFAULT_GENERATOR_CLASS of drf_spectacular, does. The
+views themselves don't import drf_spectacular, so workers serving the API
+never load it; the schema is generated by `manage.py spectacular` when the
+image is built, see config/schema.py.
+"""
+from drf_spectacular import types
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+from drf_spectacular.utils import (
+    OpenApiExample, OpenApiParameter, extend_schema, extend_schema_view, inline_serializer
+)
+from rest_framework import serializers
+
+from .serializers import (
+    BookingSerializer, BulkDeleteSerializer, ChangeFeedSerializer, ChangeSerializer, HoldSerializer,
+    RoomAvailabilitySerializer, RoomCalendarSerializer, RoomSerializer
+)
+from .views import BookingView, ChangeView, HoldView, RoomView
+
+SUMMARY_PARAMETER = OpenApiParameter(
+    name='summary',
+    description='Pass true to add the summary of the bookings of every room: the number of '
+                'upcoming bookings, the earliest begin_date and the latest end_date among them.',
+    type=types.OpenApiTypes.BOOL
+)
+
+
+extend_schema_view(
+    list=extend_schema(
+        summary='Get a list of rooms',
+        tags=['room'],
+        auth=[{}],
+        parameters=[
+            SUMMARY_PARAMETER,
+            OpenApiParameter(
+                name='stream',
+                description='Pass true to stream the whole list without pagination.',
+                type=types.OpenApiTypes.BOOL
+            )
+        ],
+        examples=[
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'next': None,
+                    'results': [
+                        {
+                            'id': 1,
+                            'description': 'Double room',
+                            'price': '100',
+                            'created_at': '2021-01-01'
+                        }
+                    ]
+                },
+                response_only=True,
+            )
+        ]
+    ),
+    create=extend_schema(
+        summary='Add a new room',
+        tags=['room'],
+        auth=[{}],
+        examples=[
+            OpenApiExample(
+                name='A valid input example',
+                value={
+                    'description': 'Double room',
+                    'price': '100'
+                },
+                request_only=True
+            ),
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'id': 1,
+                    'description': 'Double room',
+                    'price': '100',
+                    'created_at': '2021-01-01'
+                },
+                response_only=True,
+            )
+        ]
+    ),
+    destroy=extend_schema(
+        summary='Delete a room and all related bookings',
+        tags=['room'],
+        auth=[{}]
+    ),
+    available=extend_schema(
+        summary='Get a list of rooms available for the whole date range',
+        tags=['room'],
+        auth=[{}],
+        parameters=[
+            RoomAvailabilitySerializer,
+            SUMMARY_PARAMETER,
+            OpenApiParameter(
+                name='stream',
+                description='Pass true to stream the whole list without pagination.',
+                type=types.OpenApiTypes.BOOL
+            )
+        ],
+        responses={200: RoomSerializer(many=True)}
+    ),
+    calendar=extend_schema(
+        summary='Get the day-by-day occupancy of several rooms',
+        description='With the `bits` encoding every room gets a string with a character for every day of the '
+                    'range, 1 if the room is booked on it and 0 if it is free. With the `ranges` encoding '
+                    'every room gets the list of its booked ranges within the range. '
+                    'Rooms that do not exist are skipped.',
+        tags=['room'],
+        auth=[{}],
+        parameters=[RoomCalendarSerializer],
+        responses={200: types.OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'from': '2021-01-01',
+                    'to': '2021-01-07',
+                    'encoding': 'bits',
+                    'rooms': {
+                        '1': '0011100',
+                        '2': '0000000'
+                    }
+                },
+                response_only=True,
+            ),
+            OpenApiExample(
+                name='A valid output example of the ranges encoding',
+                value={
+                    'from': '2021-01-01',
+                    'to': '2021-01-07',
+                    'encoding': 'ranges',
+                    'rooms': {
+                        '1': [['2021-01-03', '2021-01-05']],
+                        '2': []
+                    }
+                },
+                response_only=True,
+            )
+        ]
+    ),
+    bulk=extend_schema(
+        summary='Add several rooms at once',
+        description='Either all of the rooms are added or none of them. '
+                    'Errors are reported for each room in the order of the input.',
+        tags=['room'],
+        auth=[{}],
+        request=RoomSerializer(many=True),
+        responses={201: RoomSerializer(many=True)},
+        examples=[
+            OpenApiExample(
+                name='A valid input example',
+                value=[
+                    {
+                        'description': 'Double room',
+                        'price': '100'
+                    },
+                    {
+                        'description': 'Single room',
+                        'price': '70'
+                    }
+                ],
+                request_only=True
+            )
+        ]
+    )
+)(RoomView)
+
+extend_schema(
+    summary='Delete several rooms and all related bookings',
+    description='Rooms that do not exist are skipped. The response lists the deleted rooms.',
+    tags=['room'],
+    auth=[{}],
+    request=BulkDeleteSerializer,
+    responses={200: BulkDeleteSerializer},
+    examples=[
+        OpenApiExample(
+            name='A valid input example',
+            value={
+                'ids': [1, 2, 3]
+            }
+        )
+    ]
+)(RoomView.bulk_destroy)
+
+
+extend_schema_view(
+    list=extend_schema(
+        summary='Get a booking list of the specified room',
+        tags=['booking'],
+        auth=[{}],
+        parameters=[
+            OpenApiParameter(
+                name='room',
+                description='A unique integer value identifying the room.',
+                type=types.OpenApiTypes.INT
+            ),
+            OpenApiParameter(
+                name='history',
+                description='Pass true to list the archived bookings, the ones that ended in the past.',
+                type=types.OpenApiTypes.BOOL
+            ),
+            OpenApiParameter(
+                name='stream',
+                description='Pass true to stream the whole list without pagination.',
+                type=types.OpenApiTypes.BOOL
+            )
+        ],
+        examples=[
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'next': None,
+                    'results': [
+                        {
+                            'id': 1,
+                            'begin_date': '2021-01-01',
+                            'end_date': '2021-01-07',
+                            'room_id': 1
+                        }
+                    ]
+                },
+                response_only=True,
+            )
+        ]
+    ),
+    create=extend_schema(
+        summary='Add a new booking',
+        tags=['booking'],
+        auth=[{}],
+        examples=[
+            OpenApiExample(
+                name='A valid input example',
+                value={
+                    'begin_date': '2021-01-01',
+                    'end_date': '2021-01-07',
+                    'room_id': 1
+                },
+                request_only=True
+            ),
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'id': 1,
+                    'begin_date': '2021-01-01',
+                    'end_date': '2021-01-07',
+                    'room_id': 1
+                },
+                response_only=True,
+            )
+        ]
+    ),
+    destroy=extend_schema(
+        summary='Delete a booking',
+        tags=['booking'],
+        auth=[{}]
+    ),
+    bulk=extend_schema(
+        summary='Add several bookings at once',
+        description='Either all of the bookings are added or none of them. '
+                    'Errors are reported for each booking in the order of the input.',
+        tags=['booking'],
+        auth=[{}],
+        request=BookingSerializer(many=True),
+        responses={201: BookingSerializer(many=True)},
+        examples=[
+            OpenApiExample(
+                name='A valid input example',
+                value=[
+                    {
+                        'begin_date': '2021-01-01',
+                        'end_date': '2021-01-07',
+                        'room_id': 1
+                    },
+                    {
+                        'begin_date': '2021-01-08',
+                        'end_date': '2021-01-14',
+                        'room_id': 1
+                    }
+                ],
+                request_only=True
+            ),
+            OpenApiExample(
+                name='An output example of overlapping bookings',
+                value=[
+                    {},
+                    {
+                        'non_field_errors': ['OVERLAPPING_DATES']
+                    }
+                ],
+                response_only=True,
+                status_codes=['400']
+            )
+        ]
+    )
+)(BookingView)
+
+extend_schema(
+    summary='Delete several bookings',
+    description='Bookings that do not exist are skipped. The response lists the deleted bookings.',
+    tags=['booking'],
+    auth=[{}],
+    request=BulkDeleteSerializer,
+    responses={200: BulkDeleteSerializer},
+    examples=[
+        OpenApiExample(
+            name='A valid input example',
+            value={
+                'ids': [1, 2, 3]
+            }
+        )
+    ]
+)(BookingView.bulk_destroy)
+
+
+extend_schema_view(
+    create=extend_schema(
+        summary='Hold the dates of a room until the booking is made',
+        description='The hold is rejected at once if it overlaps another hold of the room. Otherwise the booking '
+                    'is made in the background: poll the hold to learn whether it was confirmed, rejected or '
+                    'expired.',
+        tags=['hold'],
+        auth=[{}],
+        responses={202: HoldSerializer},
+        examples=[
+            OpenApiExample(
+                name='A valid input example',
+                value={
+                    'begin_date': '2021-01-01',
+                    'end_date': '2021-01-07',
+                    'room_id': 1
+                },
+                request_only=True
+            ),
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'id': '6f1c1d5e0e3b4a5f9c2d8b7a6e5f4d3c',
+                    'room_id': 1,
+                    'begin_date': '2021-01-01',
+                    'end_date': '2021-01-07',
+                    'status': 'pending',
+                    'expires_at': '2021-01-01T12:00:30Z',
+                    'booking_id': None,
+                    'errors': None
+                },
+                response_only=True,
+                status_codes=['202']
+            )
+        ]
+    ),
+    retrieve=extend_schema(
+        summary='Get the status of a hold',
+        tags=['hold'],
+        auth=[{}],
+        parameters=[
+            OpenApiParameter(
+                name='id',
+                description='The id of the hold.',
+                type=types.OpenApiTypes.STR,
+                location=OpenApiParameter.PATH
+            )
+        ],
+        examples=[
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'id': '6f1c1d5e0e3b4a5f9c2d8b7a6e5f4d3c',
+                    'room_id': 1,
+                    'begin_date': '2021-01-01',
+                    'end_date': '2021-01-07',
+                    'status': 'confirmed',
+                    'expires_at': '2021-01-01T12:00:30Z',
+                    'booking_id': 1,
+                    'errors': None
+                },
+                response_only=True
+            )
+        ]
+    )
+)(HoldView)
+
+
+extend_schema_view(
+    list=extend_schema(
+        summary='Get the changes of rooms and bookings following a seq',
+        description='Changes come in the order they were made. Pass the `last` seq of a response as `since` to '
+                    'get the next batch; `more` tells whether there are more changes already. With `wait`, a '
+                    'request with no changes to return waits that many seconds, up to 20, for one to be made.',
+        tags=['changes'],
+        auth=[{}],
+        parameters=[ChangeFeedSerializer],
+        responses={200: inline_serializer('ChangeFeed', {
+            'last': serializers.IntegerField(),
+            'more': serializers.BooleanField(),
+            'results': ChangeSerializer(many=True),
+        })},
+        examples=[
+            OpenApiExample(
+                name='A valid output example',
+                value={
+                    'last': 2,
+                    'more': False,
+                    'results': [
+                        {
+                            'seq': 1,
+                            'model': 'booking',
+                            'action': 'created',
+                            'object_id': 1,
+                            'data': {
+                                'id': 1,
+                                'begin_date': '2021-01-01',
+                                'end_date': '2021-01-07',
+                                'room_id': 1
+                            }
+                        },
+                        {
+                            'seq': 2,
+                            'model': 'booking',
+                            'action': 'deleted',
+                            'object_id': 1,
+                            'data': None
+                        }
+                    ]
+                },
+                response_only=True
+            )
+        ]
+    )
+)(ChangeView)
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    """The generator of drf_spectacular, loaded together with the annotations above."""
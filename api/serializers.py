@@ -1,9 +1,159 @@
-from rest_framework import serializers
+from collections.abc import Mapping
+from decimal import Decimal
 
-from .models import Booking, Room
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
+from .calendars import BITS, ENCODINGS
+from .compact import compact_converter, compact_value
+from .models import Booking, Change, Room
 
-class RoomSerializer(serializers.ModelSerializer):
+# The largest id the database takes, larger ones overflow instead of matching nothing
+MAX_ID = 2 ** 63 - 1
+
+
+def values_converter(field):
+    """
+    Return a function converting a value fetched with QuerySet.values() the
+    same way `field.to_representation` converts the model attribute, or None
+    if the value can be used as is.
+    """
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if isinstance(field, serializers.DecimalField) and coerce_to_string and not field.localize:
+        if field.decimal_places is None:
+            return lambda value: format(value, 'f')
+
+        exponent = Decimal(1).scaleb(-field.decimal_places)
+        return lambda value: format(value.quantize(exponent, rounding=field.rounding), 'f')
+
+    if isinstance(field, serializers.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is None:
+            return None
+        if output_format.lower() == ISO_8601:
+            return lambda value: value.isoformat()
+        return lambda value: value.strftime(output_format)
+
+    if isinstance(field, (serializers.CharField, serializers.IntegerField)):
+        return None
+
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        # values() already yields the primary key of the related object
+        return None
+
+    return field.to_representation
+
+
+def uses_compact_types(context, parsing=False):
+    """
+    Tell whether the data of the serializer is rendered, or was parsed when
+    `parsing` is on, by a format with `compact_types`, e.g. MessagePack.
+
+    A `compact_types` key of the context takes precedence over the request.
+    """
+    if 'compact_types' in context:
+        return context['compact_types']
+
+    request = context.get('request')
+    if request is None:
+        return False
+
+    if parsing:
+        handler = request.negotiator.select_parser(request, request.parsers)
+    else:
+        handler = getattr(request, 'accepted_renderer', None)
+
+    return getattr(handler, 'compact_types', False)
+
+
+class CompactTypesSerializerMixin:
+    """
+    Represent dates and decimals as integers when the format the data is
+    rendered with or parsed from asks for it, see `compact_converter()`.
+    """
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not uses_compact_types(self.context):
+            return data
+
+        for field in self._readable_fields:
+            convert = compact_converter(field)
+            if convert is not None and data[field.field_name] is not None:
+                data[field.field_name] = convert(field.get_attribute(instance))
+
+        return data
+
+    def to_internal_value(self, data):
+        if isinstance(data, Mapping) and uses_compact_types(self.context, parsing=True):
+            data = {
+                **data,
+                **{
+                    field.field_name: compact_value(field, data[field.field_name])
+                    for field in self._writable_fields if field.field_name in data
+                }
+            }
+
+        return super().to_internal_value(data)
+
+
+class ValuesSerializerMixin:
+    """
+    Represent rows fetched with QuerySet.values() without building model
+    instances and going through the per-field machinery of the serializer.
+
+    The result is the same as the one of `serializer.data`.
+    """
+
+    @classmethod
+    def values_columns(cls, compact=False):
+        return [
+            (field.field_name, field.source, compact and compact_converter(field) or values_converter(field))
+            for field in cls()._readable_fields
+        ]
+
+    @classmethod
+    def values_queryset(cls, queryset):
+        return queryset.values(*(source for _, source, _ in cls.values_columns()))
+
+    @classmethod
+    def represent_values(cls, rows, compact=False):
+        """Represent the rows, with compact types if `compact` is on, see `compact_converter()`."""
+        columns = cls.values_columns(compact)
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, convert in columns:
+                value = row[source]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+
+        return data
+
+
+class RoomPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Look rooms up in the `rooms` dict of the serializer context when it is
+    given, so validating a batch of bookings takes a single query for rooms.
+    """
+
+    def to_internal_value(self, data):
+        rooms = self.context.get('rooms')
+        if rooms is None:
+            return super().to_internal_value(data)
+
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            return rooms[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class RoomSerializer(CompactTypesSerializerMixin, ValuesSerializerMixin, serializers.ModelSerializer):
     description = serializers.CharField(min_length=5, max_length=200)
 
     price = serializers.DecimalField(min_value=1.00, max_digits=9, decimal_places=2)
@@ -14,8 +164,15 @@ class RoomSerializer(serializers.ModelSerializer):
         fields = ('id', 'description', 'price', 'created_at',)
 
 
-class BookingSerializer(serializers.ModelSerializer):
-    room_id = serializers.PrimaryKeyRelatedField(source='room', queryset=Room.objects.all())
+class RoomSummarySerializer(RoomSerializer):
+    """A room together with the summary of its bookings, see api/counters.py."""
+
+    class Meta(RoomSerializer.Meta):
+        fields = (*RoomSerializer.Meta.fields, 'upcoming_bookings', 'next_begin_date', 'last_end_date',)
+
+
+class BookingSerializer(CompactTypesSerializerMixin, ValuesSerializerMixin, serializers.ModelSerializer):
+    room_id = RoomPrimaryKeyRelatedField(source='room', queryset=Room.objects.all())
 
     class Meta:
         model = Booking
@@ -27,3 +184,158 @@ class BookingSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('begin_date must be less than or equal to end_date')
         
         return data
+
+
+class HoldSerializer(CompactTypesSerializerMixin, serializers.Serializer):
+    id = serializers.CharField(read_only=True)
+
+    room_id = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+
+    begin_date = serializers.DateField()
+
+    end_date = serializers.DateField()
+
+    status = serializers.CharField(read_only=True)
+
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    booking_id = serializers.IntegerField(read_only=True)
+
+    errors = serializers.JSONField(read_only=True)
+
+    def validate(self, data):
+        if data['begin_date'] > data['end_date']:
+            raise serializers.ValidationError('begin_date must be less than or equal to end_date')
+
+        return data
+
+
+class ChangeSerializer(CompactTypesSerializerMixin, ValuesSerializerMixin, serializers.ModelSerializer):
+    """
+    An entry of the change log, see api/changes.py.
+
+    `data` is stored the way JSON shows the object, so with compact types
+    its dates and decimals are converted here like those of the object's
+    own serializer.
+    """
+    data_serializers = {
+        'room': RoomSerializer,
+        'booking': BookingSerializer,
+    }
+
+    class Meta:
+        model = Change
+
+        fields = ('seq', 'model', 'action', 'object_id', 'data',)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if uses_compact_types(self.context):
+            data = self.compact_data([data])[0]
+
+        return data
+
+    @classmethod
+    def represent_values(cls, rows, compact=False):
+        data = super().represent_values(rows, compact)
+
+        return cls.compact_data(data) if compact else data
+
+    @classmethod
+    def compact_data(cls, items):
+        converters = {
+            model: [
+                (field.field_name, compact_converter(field))
+                for field in serializer_class()._readable_fields if compact_converter(field) is not None
+            ]
+            for model, serializer_class in cls.data_serializers.items()
+        }
+
+        for item in items:
+            if item['data'] is None:
+                continue
+
+            obj = dict(item['data'])
+            for name, convert in converters[item['model']]:
+                if obj.get(name) is not None:
+                    obj[name] = convert(obj[name])
+            item['data'] = obj
+
+        return items
+
+
+class ChangeFeedSerializer(serializers.Serializer):
+    since = serializers.IntegerField(
+        min_value=0, max_value=MAX_ID, default=0, help_text='The seq of the last change seen.'
+    )
+
+    limit = serializers.IntegerField(min_value=1, max_value=10_000, default=1000)
+
+    # A waiting request holds a sync worker, so the cap stays well below the
+    # 30 s after which gunicorn kills the worker, see docker/runserver.sh
+    wait = serializers.FloatField(
+        min_value=0, max_value=20, default=0,
+        help_text='Seconds to wait for changes when there are none yet, up to 20.'
+    )
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1, max_value=MAX_ID), max_length=10_000)
+
+
+class RoomAvailabilitySerializer(serializers.Serializer):
+    begin_date = serializers.DateField()
+
+    end_date = serializers.DateField()
+
+    price_max = serializers.DecimalField(required=False, max_digits=9, decimal_places=2)
+
+    def validate(self, data):
+        if data['begin_date'] > data['end_date']:
+            raise serializers.ValidationError('begin_date must be less than or equal to end_date')
+
+        return data
+
+
+class RoomCalendarSerializer(serializers.Serializer):
+    max_rooms = 1000
+
+    max_days = 3 * 366
+
+    rooms = serializers.CharField(help_text='Comma-separated ids of the rooms.')
+
+    encoding = serializers.ChoiceField(choices=ENCODINGS, default=BITS)
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        # `from` is a keyword, so these can't be declared as class attributes
+        return {
+            'rooms': fields['rooms'],
+            'from': serializers.DateField(),
+            'to': serializers.DateField(),
+            'encoding': fields['encoding'],
+        }
+
+    def validate_rooms(self, value):
+        try:
+            ids = {int(item) for item in value.split(',')}
+        except ValueError:
+            raise serializers.ValidationError('Expected a comma-separated list of room ids.')
+
+        if not all(1 <= pk <= MAX_ID for pk in ids):
+            raise serializers.ValidationError(f'Ensure room ids are between 1 and {MAX_ID}.')
+
+        if len(ids) > self.max_rooms:
+            raise serializers.ValidationError(f'Ensure there are no more than {self.max_rooms} rooms.')
+
+        return ids
+
+    def validate(self, data):
+        if data['from'] > data['to']:
+            raise serializers.ValidationError('from must be less than or equal to to')
+
+        if (data['to'] - data['from']).days >= self.max_days:
+            raise serializers.ValidationError(f'Ensure the range is no longer than {self.max_days} days.')
+
+        return data
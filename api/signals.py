@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import changes, counters, versions
+from .models import Booking, Room
+from .occupancy import occupancy
+
+
+@receiver(pre_save, sender=Booking)
+def booking_saving(sender, instance, using, **kwargs):
+    # An edited booking may move to another room, whose data changes too
+    if instance.pk is not None:
+        instance._previous_room_id = (
+            Booking.objects.using(using).filter(pk=instance.pk).values_list('room_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, using, **kwargs):
+    room_ids = {instance.room_id}
+    if not created and getattr(instance, '_previous_room_id', None) is not None:
+        room_ids.add(instance._previous_room_id)
+
+    if created:
+        occupancy.add(instance.room_id, instance.begin_date, instance.end_date)
+        counters.booking_added(instance.room_id, instance.begin_date, instance.end_date, using=using)
+    else:
+        # The previous dates are unknown, so start over from the database
+        occupancy.invalidate(room_ids)
+        counters.refresh(room_ids, using=using)
+
+    versions.bump((versions.BOOKINGS, *map(versions.bookings_of, room_ids)), using=using)
+    changes.record_objects(changes.CREATED if created else changes.UPDATED, (instance,), using=using)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, using, **kwargs):
+    occupancy.remove(instance.room_id, instance.begin_date, instance.end_date)
+    # A no-op when the booking goes together with its room
+    counters.refresh((instance.room_id,), using=using)
+
+    versions.bump((versions.BOOKINGS, versions.bookings_of(instance.room_id)), using=using)
+    changes.record(changes.BOOKING, changes.DELETED, (instance.pk,), using=using)
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance, created, using, **kwargs):
+    versions.bump((versions.ROOMS,), using=using)
+    changes.record_objects(changes.CREATED if created else changes.UPDATED, (instance,), using=using)
+
+
+@receiver(post_delete, sender=Room)
+def room_deleted(sender, instance, using, **kwargs):
+    occupancy.invalidate((instance.pk,))
+
+    versions.bump((versions.ROOMS, versions.BOOKINGS, versions.bookings_of(instance.pk)), using=using)
+    # Its bookings were deleted one by one before it
+    changes.record(changes.ROOM, changes.DELETED, (instance.pk,), using=using)
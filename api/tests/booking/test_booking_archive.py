@@ -0,0 +1,143 @@
+import datetime
+from io import StringIO
+
+import pytest
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from api.models import ArchivedBooking, Booking, Room
+
+
+def day(offset):
+    return timezone.localdate() + datetime.timedelta(days=offset)
+
+
+@pytest.fixture
+def room(room_input):
+    return Room.objects.create(**room_input)
+
+
+@pytest.fixture
+def bookings(room):
+    # Two past stays, one going on and one upcoming
+    return [
+        Booking.objects.create(room=room, begin_date=day(begin), end_date=day(end))
+        for begin, end in ((-20, -15), (-10, -1), (-1, 2), (10, 12))
+    ]
+
+
+def archive(*args):
+    out = StringIO()
+    call_command('archive_bookings', *args, stdout=out)
+
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_archive_bookings(bookings):
+    assert archive('--batch-size', '1') == f'Archived 2 bookings ending before {day(0).isoformat()}\n'
+
+    assert list(Booking.objects.order_by('pk').values_list('pk', flat=True)) == [b.pk for b in bookings[2:]]
+    assert list(ArchivedBooking.objects.order_by('pk').values_list('pk', 'begin_date', 'end_date')) == [
+        (b.pk, b.begin_date, b.end_date) for b in bookings[:2]
+    ]
+
+    assert archive() == f'Archived 0 bookings ending before {day(0).isoformat()}\n'
+
+
+@pytest.mark.django_db
+def test_archive_bookings_before(bookings):
+    archive('--before', day(-12).isoformat())
+
+    assert list(ArchivedBooking.objects.values_list('pk', flat=True)) == [bookings[0].pk]
+
+
+@pytest.mark.django_db
+def test_archive_bookings_future(bookings):
+    with pytest.raises(CommandError):
+        archive('--before', day(1).isoformat())
+
+    assert not ArchivedBooking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_get_bookings_history(client, room, bookings):
+    archive()
+
+    response = client.get(reverse('booking-list'), data={'room': room.pk})
+    assert [item['id'] for item in response.json()['results']] == [b.pk for b in bookings[2:]]
+
+    response = client.get(reverse('booking-list'), data={'room': room.pk, 'history': 'true', 'ordering': '-begin_date'})
+    assert response.json()['results'] == [
+        {
+            'id': b.pk,
+            'begin_date': b.begin_date.isoformat(),
+            'end_date': b.end_date.isoformat(),
+            'room_id': room.pk
+        } for b in reversed(bookings[:2])
+    ]
+
+
+@pytest.mark.django_db
+def test_get_bookings_etag_after_archiving(client, room, bookings):
+    etag = client.get(reverse('booking-list'), data={'room': room.pk})['ETag']
+
+    archive()
+
+    response = client.get(reverse('booking-list'), data={'room': room.pk}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_archived_bookings_overlap(client, room, bookings):
+    archive()
+
+    response = client.post(reverse('booking-list'), data={
+        'begin_date': day(-12).isoformat(),
+        'end_date': day(-9).isoformat(),
+        'room_id': room.pk
+    })
+    assert response.status_code == 400
+    assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+
+    response = client.post(reverse('booking-bulk'), data=[
+        {'begin_date': day(-14).isoformat(), 'end_date': day(-11).isoformat(), 'room_id': room.pk},
+        {'begin_date': day(-16).isoformat(), 'end_date': day(-16).isoformat(), 'room_id': room.pk},
+        {'begin_date': day(20).isoformat(), 'end_date': day(21).isoformat(), 'room_id': room.pk},
+    ], format='json')
+    assert response.status_code == 400
+    assert response.json() == [{}, {'non_field_errors': ['OVERLAPPING_DATES']}, {}]
+
+    response = client.post(reverse('booking-list'), data={
+        'begin_date': day(-14).isoformat(),
+        'end_date': day(-11).isoformat(),
+        'room_id': room.pk
+    })
+    assert response.status_code == 201
+
+    with pytest.raises(ValidationError):
+        Booking(room=room, begin_date=day(-3), end_date=day(-3)).clean()
+
+
+@pytest.mark.django_db
+def test_archived_bookings_availability(client, room, bookings):
+    archive()
+
+    response = client.get(reverse('room-available'), data={
+        'begin_date': day(-5).isoformat(),
+        'end_date': day(-3).isoformat()
+    })
+    assert response.json()['results'] == []
+
+
+@pytest.mark.django_db
+def test_archived_bookings_deleted_with_room(client, room, bookings):
+    archive()
+
+    response = client.delete(reverse('room-detail', args=[room.pk]))
+    assert response.status_code == 204
+
+    assert not ArchivedBooking.objects.exists()
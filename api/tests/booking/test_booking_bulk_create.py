@@ -0,0 +1,150 @@
+import datetime
+
+import pytest
+
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+
+
+def stays(room, *dates):
+    return [
+        {'begin_date': begin_date, 'end_date': end_date, 'room_id': room.id}
+        for begin_date, end_date in dates
+    ]
+
+
+@pytest.mark.django_db
+def test_booking_bulk_create_success(client, room_input):
+    rooms = [Room.objects.create(**room_input) for _ in range(2)]
+    input_data = [
+        *stays(rooms[0], ('2021-01-08', '2021-01-14'), ('2021-01-01', '2021-01-07')),
+        *stays(rooms[1], ('2021-01-01', '2021-01-07')),
+    ]
+
+    response = client.post(reverse('booking-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 201
+
+    data = response.json()
+    assert [{key: item[key] for key in ('begin_date', 'end_date', 'room_id')} for item in data] == input_data
+
+    for item in data:
+        booking = Booking.objects.get(pk=item['id'])
+        assert booking.begin_date == datetime.date.fromisoformat(item['begin_date'])
+        assert booking.end_date == datetime.date.fromisoformat(item['end_date'])
+        assert booking.room_id == item['room_id']
+
+
+@pytest.mark.django_db
+def test_booking_bulk_create_empty(client):
+    response = client.post(reverse('booking-bulk'), data=[], format='json')
+
+    assert response.status_code == 201
+    assert response.json() == []
+
+
+@pytest.mark.django_db
+def test_booking_bulk_create_not_a_list(client, room_input, booking_input):
+    room = Room.objects.create(**room_input)
+
+    response = client.post(reverse('booking-bulk'), data={**booking_input, 'room_id': room.id}, format='json')
+
+    assert response.status_code == 400
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_booking_bulk_create_invalid_items(client, room_input):
+    room = Room.objects.create(**room_input)
+    input_data = [
+        *stays(room, ('2021-01-01', '2021-01-07'), ('2021-01-14', '2021-01-08')),
+        {'begin_date': '2021-02-01', 'end_date': '2021-02-07', 'room_id': room.id + 1},
+        {'begin_date': '2021-03-01', 'end_date': '2021-03-07', 'room_id': 'N'},
+    ]
+
+    response = client.post(reverse('booking-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 400
+
+    errors = response.json()
+    assert len(errors) == len(input_data)
+    assert errors[0] == {}
+    assert 'non_field_errors' in errors[1]
+    assert errors[2] == {'room_id': [f'Invalid pk "{room.id + 1}" - object does not exist.']}
+    assert errors[3] == {'room_id': ['Incorrect type. Expected pk value, received str.']}
+
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_booking_bulk_create_overlapping_items(client, room_input):
+    rooms = [Room.objects.create(**room_input) for _ in range(2)]
+    input_data = [
+        *stays(rooms[0], ('2021-01-01', '2021-01-10'), ('2021-01-12', '2021-01-14'), ('2021-01-05', '2021-01-06')),
+        # Same dates, but another room
+        *stays(rooms[1], ('2021-01-05', '2021-01-06')),
+    ]
+
+    response = client.post(reverse('booking-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 400
+    assert response.json() == [
+        {'non_field_errors': ['OVERLAPPING_DATES']},
+        {},
+        {'non_field_errors': ['OVERLAPPING_DATES']},
+        {},
+    ]
+
+    assert not Booking.objects.exists()
+
+
+@pytest.mark.django_db
+def test_booking_bulk_create_overlapping_existing(client, room_input):
+    room = Room.objects.create(**room_input)
+    for begin_date, end_date in [(datetime.date(2021, 1, 1), datetime.date(2021, 1, 10)),
+                                 (datetime.date(2021, 1, 20), datetime.date(2021, 1, 25))]:
+        Booking.objects.create(room=room, begin_date=begin_date, end_date=end_date)
+
+    input_data = stays(
+        room,
+        ('2020-12-25', '2020-12-31'),
+        ('2021-01-10', '2021-01-12'),
+        ('2021-01-13', '2021-01-19'),
+        ('2021-01-24', '2021-01-30'),
+        ('2021-02-01', '2021-02-07'),
+    )
+
+    response = client.post(reverse('booking-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 400
+    assert response.json() == [
+        {},
+        {'non_field_errors': ['OVERLAPPING_DATES']},
+        {},
+        {'non_field_errors': ['OVERLAPPING_DATES']},
+        {},
+    ]
+
+    assert Booking.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_booking_bulk_create_queries(client, room_input, django_assert_max_num_queries):
+    rooms = [Room.objects.create(**room_input) for _ in range(2)]
+    input_data = [
+        {
+            'begin_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i)).isoformat(),
+            'end_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i)).isoformat(),
+            'room_id': room.id
+        } for room in rooms for i in range(100)
+    ]
+
+    # The bookings, their entries in the change log (see api/changes.py)
+    # and the counter of the booking list, the last two numbered and bumped
+    # after the commit
+    with django_assert_max_num_queries(27):
+        response = client.post(reverse('booking-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 201
+    assert Booking.objects.count() == len(input_data)
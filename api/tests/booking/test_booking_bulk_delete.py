@@ -0,0 +1,36 @@
+import datetime
+
+import pytest
+
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+
+
+@pytest.mark.django_db
+def test_booking_bulk_delete_success(client, room_input):
+    room = Room.objects.create(**room_input)
+    bookings = [
+        Booking.objects.create(
+            room=room,
+            begin_date=datetime.date(2021, 1, day),
+            end_date=datetime.date(2021, 1, day)
+        ) for day in range(1, 4)
+    ]
+
+    ids = [bookings[0].id, bookings[1].id, bookings[2].id + 1]
+    response = client.delete(reverse('booking-bulk'), data={'ids': ids}, format='json')
+
+    assert response.status_code == 200
+    assert sorted(response.json()['ids']) == ids[:2]
+
+    assert list(Booking.objects.values_list('id', flat=True)) == [bookings[2].id]
+    assert Room.objects.filter(pk=room.id).exists()
+
+
+@pytest.mark.parametrize('input_data', [{'ids': 'N'}, {'ids': [2 ** 63]}])
+@pytest.mark.django_db
+def test_booking_bulk_delete_invalid_ids(client, input_data):
+    response = client.delete(reverse('booking-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 400
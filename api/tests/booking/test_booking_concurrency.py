@@ -0,0 +1,62 @@
+import datetime
+import threading
+
+import pytest
+
+from django.db import connection
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from api.models import Booking, Room
+
+
+def post_concurrently(requests):
+    barrier = threading.Barrier(len(requests))
+    status_codes = [None] * len(requests)
+
+    def post(i, data):
+        client = APIClient()
+        barrier.wait()
+        try:
+            status_codes[i] = client.post(reverse('booking-list'), data=data).status_code
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=post, args=item) for item in enumerate(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return status_codes
+
+
+@pytest.mark.django_db(transaction=True)
+def test_booking_create_concurrent_overlapping(room_input):
+    room = Room.objects.create(**room_input)
+
+    # Every request overlaps every other one on 2021-01-10
+    status_codes = post_concurrently([{
+        'begin_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i)).isoformat(),
+        'end_date': (datetime.date(2021, 1, 10) + datetime.timedelta(days=i)).isoformat(),
+        'room_id': room.id
+    } for i in range(8)] * 2)
+
+    assert status_codes.count(201) == 1
+    assert status_codes.count(400) == len(status_codes) - 1
+    assert Booking.objects.filter(room=room).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_booking_create_concurrent_several_rooms(room_input):
+    rooms = [Room.objects.create(**room_input) for _ in range(4)]
+
+    status_codes = post_concurrently([{
+        'begin_date': '2021-01-01',
+        'end_date': '2021-01-07',
+        'room_id': room.id
+    } for room in rooms] * 4)
+
+    assert status_codes.count(201) == len(rooms)
+    for room in rooms:
+        assert Booking.objects.filter(room=room).count() == 1
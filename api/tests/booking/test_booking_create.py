@@ -109,3 +109,25 @@ def test_booking_create_overlapping_dates(client, room_input, dates):
     response = client.post(reverse('booking-list'), data=booking_2)
 
     assert response.status_code == 400
+
+
+@pytest.mark.parametrize('dates, status_code', [
+    ({'begin_date': '2021-01-08', 'end_date': '2021-01-09'}, 201),
+    ({'begin_date': '2021-01-07', 'end_date': '2021-01-09'}, 400),
+    ({'begin_date': '2021-01-08', 'end_date': '2021-01-10'}, 400),
+    ({'begin_date': '2021-01-02', 'end_date': '2021-01-03'}, 400),
+])
+@pytest.mark.django_db
+def test_booking_create_between_bookings(client, room_input, dates, status_code):
+    room = Room.objects.create(**room_input)
+
+    for begin_date, end_date in [('2021-01-01', '2021-01-07'), ('2021-01-10', '2021-01-14')]:
+        Booking.objects.create(
+            room=room,
+            begin_date=datetime.date.fromisoformat(begin_date),
+            end_date=datetime.date.fromisoformat(end_date)
+        )
+
+    response = client.post(reverse('booking-list'), data={**dates, 'room_id': room.id})
+
+    assert response.status_code == status_code
@@ -0,0 +1,187 @@
+import datetime
+
+import pytest
+
+from django.db import IntegrityError
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from api import group_commit
+from api.archive import archive_bookings
+from api.bulk import create_each_booking
+from api.models import Booking, Room
+
+from .test_booking_concurrency import post_concurrently
+
+
+@pytest.fixture(params=[False, True], ids=['single', 'group-commit'])
+def mode(request, settings):
+    settings.BOOKING_GROUP_COMMIT = request.param
+    settings.BOOKING_GROUP_COMMIT_WINDOW = 0.05
+
+    return request.param
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Sizes of the batches committed by api.group_commit."""
+    sizes = []
+
+    def record(items, using):
+        sizes.append(len(items))
+        return create_each_booking(items, using=using)
+
+    monkeypatch.setattr(group_commit, 'create_each_booking', record)
+
+    return sizes
+
+
+@pytest.fixture
+def room(room_input):
+    return Room.objects.create(**room_input)
+
+
+def post_booking(client, room_id, begin_date, end_date):
+    return client.post(reverse('booking-list'), data={
+        'begin_date': begin_date,
+        'end_date': end_date,
+        'room_id': room_id
+    })
+
+
+@pytest.mark.django_db
+def test_group_commit_create(client, mode, batches, room):
+    begin_date = timezone.localdate() + datetime.timedelta(days=1)
+    end_date = begin_date + datetime.timedelta(days=6)
+    response = post_booking(client, room.pk, begin_date.isoformat(), end_date.isoformat())
+
+    assert response.status_code == 201
+    booking = Booking.objects.get(pk=response.json()['id'])
+    assert (booking.room_id, booking.begin_date, booking.end_date) == (room.pk, begin_date, end_date)
+    assert batches == ([1] if mode else [])
+
+    room.refresh_from_db()
+    assert room.upcoming_bookings == 1
+
+
+@pytest.mark.django_db
+def test_group_commit_overlapping_stored_booking(client, mode, room):
+    Booking.objects.create(room=room, begin_date=datetime.date(2021, 1, 5), end_date=datetime.date(2021, 1, 6))
+
+    response = post_booking(client, room.pk, '2021-01-01', '2021-01-07')
+
+    assert response.status_code == 400
+    assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_group_commit_overlapping_archived_booking(client, mode, room):
+    today = timezone.localdate()
+    Booking.objects.create(room=room, begin_date=today - datetime.timedelta(days=20),
+                           end_date=today - datetime.timedelta(days=15))
+    archive_bookings(today)
+
+    response = post_booking(client, room.pk, (today - datetime.timedelta(days=16)).isoformat(),
+                            (today - datetime.timedelta(days=14)).isoformat())
+
+    assert response.status_code == 400
+    assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+
+
+@pytest.mark.parametrize('data, errors', [
+    ({'begin_date': '2021-01-07', 'end_date': '2021-01-01'}, {
+        'non_field_errors': ['begin_date must be less than or equal to end_date']
+    }),
+    ({'begin_date': 'wrong', 'end_date': '2021-01-07'}, {
+        'begin_date': ['Date has wrong format. Use one of these formats instead: YYYY-MM-DD.']
+    }),
+    ({'room_id': 100}, {
+        'room_id': ['Invalid pk "100" - object does not exist.']
+    }),
+])
+@pytest.mark.django_db
+def test_group_commit_invalid_booking(client, mode, batches, room, data, errors):
+    response = client.post(reverse('booking-list'), data={
+        'begin_date': '2021-01-01', 'end_date': '2021-01-07', 'room_id': room.pk, **data
+    })
+
+    assert response.status_code == 400
+    assert response.json() == errors
+    # Invalid bookings never join a batch
+    assert batches == []
+
+
+@pytest.mark.django_db
+def test_group_commit_failed_batch_falls_back(client, settings, monkeypatch, room):
+    settings.BOOKING_GROUP_COMMIT = True
+
+    def fail(items, using):
+        raise IntegrityError
+
+    monkeypatch.setattr(group_commit, 'create_each_booking', fail)
+
+    assert post_booking(client, room.pk, '2021-01-01', '2021-01-07').status_code == 201
+    response = post_booking(client, room.pk, '2021-01-03', '2021-01-04')
+    assert response.status_code == 400
+    assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_create_each_booking_in_order(room_input):
+    room, other = Room.objects.create(**room_input), Room.objects.create(**room_input)
+    Booking.objects.create(room=room, begin_date=datetime.date(2021, 1, 20), end_date=datetime.date(2021, 1, 25))
+
+    items = [
+        {'room': room, 'begin_date': datetime.date(2021, 1, day), 'end_date': datetime.date(2021, 1, end)}
+        for day, end in ((1, 5), (3, 7), (6, 8), (24, 26))
+    ]
+    items.append({'room': other, 'begin_date': datetime.date(2021, 1, 3), 'end_date': datetime.date(2021, 1, 7)})
+
+    bookings = create_each_booking(items)
+
+    # The second item overlaps the first one, the fourth a stored booking;
+    # the third overlaps only the second, which isn't created
+    assert [booking is not None for booking in bookings] == [True, False, True, False, True]
+    assert set(Booking.objects.values_list('pk', flat=True)) == {
+        *(booking.pk for booking in bookings if booking is not None),
+        Booking.objects.get(begin_date=datetime.date(2021, 1, 20)).pk,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_group_commit_concurrent_overlapping(mode, batches, room_input):
+    room = Room.objects.create(**room_input)
+
+    # Every request overlaps every other one on 2021-01-10
+    status_codes = post_concurrently([{
+        'begin_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i)).isoformat(),
+        'end_date': (datetime.date(2021, 1, 10) + datetime.timedelta(days=i)).isoformat(),
+        'room_id': room.id
+    } for i in range(8)] * 2)
+
+    assert status_codes.count(201) == 1
+    assert status_codes.count(400) == len(status_codes) - 1
+    assert Booking.objects.filter(room=room).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_group_commit_concurrent_batched(settings, batches, room_input):
+    settings.BOOKING_GROUP_COMMIT = True
+    settings.BOOKING_GROUP_COMMIT_WINDOW = 0.2
+    settings.BOOKING_GROUP_COMMIT_MAX_SIZE = 4
+    room = Room.objects.create(**room_input)
+
+    status_codes = post_concurrently([{
+        'begin_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i)).isoformat(),
+        'end_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i)).isoformat(),
+        'room_id': room.id
+    } for i in range(8)])
+
+    assert status_codes == [201] * 8
+    assert Booking.objects.filter(room=room).count() == 8
+    # Full batches are committed without waiting out the window
+    assert sum(batches) == 8 and len(batches) < 8
+    assert max(batches) <= 4
+
@@ -0,0 +1,258 @@
+import datetime
+import time
+
+import msgpack
+import pytest
+
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+from api import holds
+from api.compact import EPOCH_ORDINAL
+from api.holds import HoldQueue, confirm
+from api.models import Booking, Room
+
+
+@pytest.fixture(autouse=True)
+def queue(settings, monkeypatch):
+    settings.HOLD_CONFIRMER = False
+    queue = HoldQueue()
+    monkeypatch.setattr(holds, 'holds', queue)
+    monkeypatch.setattr('api.views.holds', queue)
+
+    return queue
+
+
+@pytest.fixture
+def room(room_input):
+    return Room.objects.create(**room_input)
+
+
+def post_hold(client, room_id, begin_date, end_date):
+    return client.post(reverse('hold-list'), data={
+        'begin_date': begin_date,
+        'end_date': end_date,
+        'room_id': room_id
+    })
+
+
+def get_hold(client, hold_id):
+    return client.get(reverse('hold-detail', args=(hold_id,)))
+
+
+@pytest.mark.django_db
+def test_hold_confirmed(client, queue, room):
+    response = post_hold(client, room.pk, '2021-01-01', '2021-01-07')
+
+    assert response.status_code == 202
+    hold = response.json()
+    assert hold['status'] == 'pending'
+    assert hold['booking_id'] is None
+    assert not Booking.objects.exists()
+
+    assert confirm(queue) == 1
+
+    hold = get_hold(client, hold['id']).json()
+    booking = Booking.objects.get()
+    assert hold['status'] == 'confirmed'
+    assert hold['booking_id'] == booking.pk
+    assert (booking.room_id, booking.begin_date, booking.end_date) == (
+        room.pk, datetime.date(2021, 1, 1), datetime.date(2021, 1, 7)
+    )
+
+
+@pytest.mark.django_db
+def test_hold_msgpack(client, queue, room):
+    media_type = 'application/msgpack'
+    # Days since 1970-01-01
+    begin_date = datetime.date(2021, 1, 1).toordinal() - EPOCH_ORDINAL
+    end_date = begin_date + 6
+
+    response = client.post(
+        reverse('hold-list'), data=msgpack.packb({'begin_date': begin_date, 'end_date': end_date, 'room_id': room.pk}),
+        content_type=media_type, HTTP_ACCEPT=media_type
+    )
+    assert response.status_code == 202
+    hold = msgpack.unpackb(response.content)
+    assert (hold['begin_date'], hold['end_date']) == (begin_date, end_date)
+
+    confirm(queue)
+
+    hold = msgpack.unpackb(client.get(reverse('hold-detail', args=(hold['id'],)), HTTP_ACCEPT=media_type).content)
+    assert (hold['status'], hold['begin_date'], hold['end_date']) == ('confirmed', begin_date, end_date)
+    assert Booking.objects.filter(begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 7)).exists()
+
+
+@pytest.mark.django_db
+def test_conflicting_hold_rejected_without_queries(client, room):
+    assert post_hold(client, room.pk, '2021-01-01', '2021-01-07').status_code == 202
+
+    for begin_date, end_date in (('2021-01-07', '2021-01-10'), ('2020-12-25', '2021-01-01'), ('2021-01-03', '2021-01-04')):
+        with CaptureQueriesContext(connection) as queries:
+            response = post_hold(client, room.pk, begin_date, end_date)
+
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+        assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_adjacent_holds(client, queue, room):
+    for begin_date, end_date in (('2021-01-08', '2021-01-10'), ('2021-01-01', '2021-01-07'), ('2021-01-11', '2021-01-11')):
+        assert post_hold(client, room.pk, begin_date, end_date).status_code == 202
+
+    assert post_hold(client, room.pk + 1, '2021-01-01', '2021-01-07').status_code == 202
+
+    assert confirm(queue) == 4
+    assert Booking.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_hold_overlapping_booking_rejected(client, queue, room):
+    Booking.objects.create(room=room, begin_date=datetime.date(2021, 1, 5), end_date=datetime.date(2021, 1, 6))
+    rejected = post_hold(client, room.pk, '2021-01-01', '2021-01-07').json()
+    confirmed = post_hold(client, room.pk, '2021-01-08', '2021-01-09').json()
+
+    assert confirm(queue) == 2
+
+    rejected = get_hold(client, rejected['id']).json()
+    assert rejected['status'] == 'rejected'
+    assert rejected['errors'] == {'non_field_errors': ['OVERLAPPING_DATES']}
+    assert rejected['booking_id'] is None
+    assert get_hold(client, confirmed['id']).json()['status'] == 'confirmed'
+    assert Booking.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_hold_of_missing_room_rejected(client, queue):
+    hold = post_hold(client, 100, '2021-01-01', '2021-01-07').json()
+
+    confirm(queue)
+
+    hold = get_hold(client, hold['id']).json()
+    assert hold['status'] == 'rejected'
+    assert hold['errors'] == {'room_id': ['Invalid pk "100" - object does not exist.']}
+
+
+@pytest.mark.django_db
+def test_dates_free_after_confirmation(client, queue, room):
+    post_hold(client, room.pk, '2021-01-01', '2021-01-07')
+    confirm(queue)
+
+    # The booking is in the database now, so the hold fails when confirmed
+    hold = post_hold(client, room.pk, '2021-01-01', '2021-01-07').json()
+    confirm(queue)
+
+    assert get_hold(client, hold['id']).json()['status'] == 'rejected'
+
+
+@pytest.mark.django_db
+def test_confirmed_in_batches(client, settings, queue, room):
+    settings.HOLD_BATCH_SIZE = 2
+    for day in range(1, 6):
+        post_hold(client, room.pk, f'2021-01-0{day}', f'2021-01-0{day}')
+
+    with CaptureQueriesContext(connection) as queries:
+        assert confirm(queue) == 2
+    assert sum('INSERT INTO "api_booking"' in query['sql'] for query in queries) == 1
+
+    assert confirm(queue) == 2
+    assert confirm(queue) == 1
+    assert confirm(queue) == 0
+    assert Booking.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_hold_expires(client, settings, queue, room):
+    settings.HOLD_TTL = 0.05
+    hold = post_hold(client, room.pk, '2021-01-01', '2021-01-07').json()
+    time.sleep(0.1)
+
+    assert get_hold(client, hold['id']).json()['status'] == 'expired'
+    # The dates are free again and the expired hold isn't confirmed
+    assert post_hold(client, room.pk, '2021-01-01', '2021-01-07').status_code == 202
+    assert confirm(queue) == 1
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_result_forgotten(client, settings, queue, room):
+    settings.HOLD_RESULT_TTL = 0.05
+    hold = post_hold(client, room.pk, '2021-01-01', '2021-01-07').json()
+    confirm(queue)
+    assert get_hold(client, hold['id']).status_code == 200
+    time.sleep(0.1)
+
+    assert get_hold(client, hold['id']).status_code == 404
+    assert not queue.holds and not queue.rooms
+
+
+@pytest.mark.django_db
+def test_put_back_on_failure(client, queue, room, monkeypatch):
+    hold = post_hold(client, room.pk, '2021-01-01', '2021-01-07').json()
+
+    def fail(items, using):
+        raise OperationalError
+
+    with monkeypatch.context() as patch, pytest.raises(OperationalError):
+        patch.setattr(holds, 'create_bookings', fail)
+        confirm(queue)
+
+    assert get_hold(client, hold['id']).json()['status'] == 'pending'
+    assert confirm(queue) == 1
+    assert get_hold(client, hold['id']).json()['status'] == 'confirmed'
+
+
+@pytest.mark.django_db
+def test_failing_hold_rejected_alone(client, queue, room):
+    confirmed = post_hold(client, room.pk, '2021-01-01', '2021-01-07').json()
+    # Queued behind the serializer's back, the id overflows the query
+    failing = queue.hold(10 ** 19, datetime.date(2021, 1, 1), datetime.date(2021, 1, 7))
+    after = post_hold(client, room.pk, '2021-01-08', '2021-01-09').json()
+
+    assert confirm(queue) == 3
+
+    assert get_hold(client, confirmed['id']).json()['status'] == 'confirmed'
+    assert get_hold(client, after['id']).json()['status'] == 'confirmed'
+    assert get_hold(client, failing.id).json()['errors'] == {'non_field_errors': ['CONFIRMATION_FAILED']}
+    assert Booking.objects.count() == 2
+
+
+@pytest.mark.parametrize('data, errors', [
+    ({'room_id': 1, 'begin_date': '2021-01-07', 'end_date': '2021-01-01'}, {
+        'non_field_errors': ['begin_date must be less than or equal to end_date']
+    }),
+    ({'room_id': 0, 'begin_date': '2021-01-01', 'end_date': '2021-01-07'}, {
+        'room_id': ['Ensure this value is greater than or equal to 1.']
+    }),
+    ({'room_id': 2 ** 63, 'begin_date': '2021-01-01', 'end_date': '2021-01-07'}, {
+        'room_id': [f'Ensure this value is less than or equal to {2 ** 63 - 1}.']
+    }),
+    ({'room_id': 1, 'begin_date': 'wrong', 'end_date': '2021-01-07'}, {
+        'begin_date': ['Date has wrong format. Use one of these formats instead: YYYY-MM-DD.']
+    }),
+])
+def test_invalid_hold(client, data, errors):
+    response = client.post(reverse('hold-list'), data=data)
+
+    assert response.status_code == 400
+    assert response.json() == errors
+
+
+def test_unknown_hold(client):
+    assert get_hold(client, 'unknown').status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_confirmer(client, settings, queue, room):
+    settings.HOLD_CONFIRMER = True
+    hold = post_hold(client, room.pk, '2021-01-01', '2021-01-07').json()
+
+    for _ in range(100):
+        if get_hold(client, hold['id']).json()['status'] != 'pending':
+            break
+        time.sleep(0.05)
+
+    assert get_hold(client, hold['id']).json()['status'] == 'confirmed'
+    assert Booking.objects.filter(room=room).count() == 1
@@ -1,9 +1,13 @@
+import datetime
+
 import pytest
 
 from rest_framework.reverse import reverse
 
 from api.models import Booking, Room
 
+pytestmark = pytest.mark.usefixtures('list_serialization')
+
 
 @pytest.fixture
 def bookings_inputs():
@@ -70,7 +74,7 @@ def test_get_bookings_several_rooms_success(client, rooms_input, bookings_inputs
 
         assert response.status_code == 200
 
-        actual = [booking['id'] for booking in response.json()]
+        actual = [booking['id'] for booking in response.json()['results']]
         expected = [
             booking.id for booking in sorted(bookings, key=lambda b: b.begin_date)
         ]
@@ -88,3 +92,89 @@ def test_get_bookings_room_not_found(client, room_input):
     })
 
     assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_get_bookings_pages(client, room_input):
+    room = Room.objects.create(**room_input)
+    bookings = [
+        Booking.objects.create(
+            room=room,
+            begin_date=datetime.date(2021, 1, day),
+            end_date=datetime.date(2021, 1, day)
+        ) for day in (5, 3, 1, 4, 2)
+    ]
+
+    response = client.get(reverse('booking-list'), data={
+        'room': room.id,
+        'ordering': 'begin_date',
+        'page_size': 3
+    })
+
+    assert response.status_code == 200
+
+    first_page = response.json()
+    second_page = client.get(first_page['next']).json()
+
+    actual = [booking['id'] for booking in first_page['results'] + second_page['results']]
+    expected = [
+        booking.id for booking in sorted(bookings, key=lambda b: b.begin_date)
+    ]
+
+    assert actual == expected
+    assert second_page['next'] is None
+
+
+@pytest.mark.django_db
+def test_get_bookings_without_pagination(client, room_input, booking_input):
+    room = Room.objects.create(**room_input)
+    booking = Booking.objects.create(**{**booking_input, 'room_id': room.id})
+
+    response = client.get(reverse('booking-list'), data={
+        'room': room.id,
+        'paginate': 'false'
+    })
+
+    assert response.status_code == 200
+    assert response.json() == [{
+        'id': booking.id,
+        'begin_date': booking_input['begin_date'],
+        'end_date': booking_input['end_date'],
+        'room_id': room.id
+    }]
+
+
+@pytest.mark.django_db
+def test_get_bookings_stream(client, rooms_input, bookings_inputs):
+    rooms = [Room.objects.create(**data) for data in rooms_input]
+    for room, bookings_input in zip(rooms, bookings_inputs):
+        for data in bookings_input:
+            Booking.objects.create(**{**data, 'room_id': room.id})
+
+    response = client.get(reverse('booking-list'), data={
+        'room': rooms[0].id,
+        'ordering': 'begin_date',
+        'stream': 'true'
+    })
+
+    assert response.status_code == 200
+
+    expected = client.get(reverse('booking-list'), data={
+        'room': rooms[0].id,
+        'ordering': 'begin_date',
+        'paginate': 'false'
+    }, HTTP_ACCEPT='application/json')
+
+    assert b''.join(response.streaming_content) == expected.content
+
+
+@pytest.mark.django_db
+def test_get_bookings_stream_room_not_found(client, room_input):
+    room = Room.objects.create(**room_input)
+
+    response = client.get(reverse('booking-list'), data={
+        'room': room.id + 1,
+        'stream': 'true'
+    })
+
+    assert response.status_code == 400
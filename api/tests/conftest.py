@@ -2,7 +2,32 @@ import pytest
 
 from rest_framework.test import APIClient
 
+from api import versions
+from api.mixins import StreamingListModelMixin
+
 
 @pytest.fixture
 def client():
     return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def shared_versions_in_transaction(request, monkeypatch):
+    """
+    Bump the counters of whole lists at once in tests run inside a transaction.
+
+    The transaction of such a test never commits, so counters bumped after
+    the commit would never change. Tests with transaction=True commit and
+    bump them the way a server does.
+    """
+    marker = request.node.get_closest_marker('django_db')
+    if marker is None or not marker.kwargs.get('transaction', False):
+        monkeypatch.setattr(versions, 'after_commit', lambda func, using: func())
+
+
+@pytest.fixture(params=['values', 'serializer'])
+def list_serialization(request, monkeypatch):
+    """Run list tests against both the fast values path and the plain serializers."""
+    monkeypatch.setattr(StreamingListModelMixin, 'values_serialization', request.param == 'values')
+
+    return request.param
@@ -0,0 +1,47 @@
+import pytest
+
+from rest_framework.reverse import reverse
+
+from api.models import Room
+
+
+@pytest.mark.django_db
+def test_room_bulk_create_success(client, room_input):
+    input_data = [
+        room_input,
+        {'description': 'Single room', 'price': '70.50'},
+    ]
+
+    response = client.post(reverse('room-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 201
+
+    data = response.json()
+    assert [item['description'] for item in data] == [item['description'] for item in input_data]
+
+    for item, input_item in zip(data, input_data):
+        room = Room.objects.get(pk=item['id'])
+        assert room.description == input_item['description']
+        assert room.price == float(input_item['price'])
+        assert item['created_at'] == room.created_at.isoformat()
+
+
+@pytest.mark.django_db
+def test_room_bulk_create_invalid_items(client, room_input):
+    input_data = [
+        room_input,
+        {**room_input, 'price': 0},
+        {'description': 'N' * 4, 'price': 100},
+    ]
+
+    response = client.post(reverse('room-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 400
+
+    errors = response.json()
+    assert len(errors) == len(input_data)
+    assert errors[0] == {}
+    assert list(errors[1]) == ['price']
+    assert list(errors[2]) == ['description']
+
+    assert not Room.objects.exists()
@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+
+
+@pytest.mark.django_db
+def test_room_bulk_delete_success(client, room_input):
+    rooms = [Room.objects.create(**room_input) for _ in range(3)]
+    for room in rooms:
+        for day in range(1, 4):
+            Booking.objects.create(
+                room=room,
+                begin_date=datetime.date(2021, 1, day),
+                end_date=datetime.date(2021, 1, day)
+            )
+
+    ids = [rooms[0].id, rooms[2].id]
+    response = client.delete(reverse('room-bulk'), data={'ids': ids}, format='json')
+
+    assert response.status_code == 200
+    assert sorted(response.json()['ids']) == ids
+
+    assert list(Room.objects.values_list('id', flat=True)) == [rooms[1].id]
+    assert set(Booking.objects.values_list('room_id', flat=True)) == {rooms[1].id}
+
+
+@pytest.mark.django_db
+def test_room_bulk_delete_not_found(client, room_input):
+    room = Room.objects.create(**room_input)
+
+    response = client.delete(reverse('room-bulk'), data={'ids': [room.id, room.id + 1]}, format='json')
+
+    assert response.status_code == 200
+    assert response.json() == {'ids': [room.id]}
+
+    assert not Room.objects.exists()
+
+
+@pytest.mark.parametrize('input_data', [{}, {'ids': 1}, {'ids': ['N']}, {'ids': [0]}, {'ids': [2 ** 63]}])
+@pytest.mark.django_db
+def test_room_bulk_delete_invalid_ids(client, room_input, input_data):
+    Room.objects.create(**room_input)
+
+    response = client.delete(reverse('room-bulk'), data=input_data, format='json')
+
+    assert response.status_code == 400
+
+    assert Room.objects.exists()
@@ -0,0 +1,198 @@
+import datetime
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+
+pytestmark = pytest.mark.usefixtures('list_serialization')
+
+# The summaries cover bookings ending today or later
+YEAR = timezone.localdate().year + 1
+
+
+def counters(room):
+    room.refresh_from_db()
+    return room.upcoming_bookings, room.next_begin_date, room.last_end_date
+
+
+def date(value):
+    return datetime.date.fromisoformat(value)
+
+
+@pytest.fixture
+def rooms(room_input):
+    return [Room.objects.create(**room_input) for _ in range(3)]
+
+
+def post_booking(client, room, begin_date, end_date):
+    response = client.post(reverse('booking-list'), data={
+        'begin_date': begin_date,
+        'end_date': end_date,
+        'room_id': room.pk
+    })
+    assert response.status_code == 201
+
+    return response.json()['id']
+
+
+@pytest.mark.django_db
+def test_counters_create_and_delete(client, rooms):
+    room = rooms[0]
+    assert counters(room) == (0, None, None)
+
+    first = post_booking(client, room, f'{YEAR}-02-01', f'{YEAR}-02-03')
+    assert counters(room) == (1, date(f'{YEAR}-02-01'), date(f'{YEAR}-02-03'))
+
+    second = post_booking(client, room, f'{YEAR}-01-10', f'{YEAR}-01-12')
+    post_booking(client, room, f'{YEAR}-03-01', f'{YEAR}-03-05')
+    assert counters(room) == (3, date(f'{YEAR}-01-10'), date(f'{YEAR}-03-05'))
+    assert counters(rooms[1]) == (0, None, None)
+
+    response = client.delete(reverse('booking-detail', args=[second]))
+    assert response.status_code == 204
+    assert counters(room) == (2, date(f'{YEAR}-02-01'), date(f'{YEAR}-03-05'))
+
+    response = client.delete(reverse('booking-bulk'), data={'ids': [first]}, format='json')
+    assert response.status_code == 200
+    assert counters(room) == (1, date(f'{YEAR}-03-01'), date(f'{YEAR}-03-05'))
+
+
+@pytest.mark.django_db
+def test_counters_bulk_create(client, rooms):
+    response = client.post(reverse('booking-bulk'), data=[
+        {'begin_date': f'{YEAR}-01-01', 'end_date': f'{YEAR}-01-02', 'room_id': rooms[0].pk},
+        {'begin_date': f'{YEAR}-01-05', 'end_date': f'{YEAR}-01-09', 'room_id': rooms[0].pk},
+        {'begin_date': f'{YEAR}-01-03', 'end_date': f'{YEAR}-01-04', 'room_id': rooms[1].pk},
+    ], format='json')
+    assert response.status_code == 201
+
+    assert counters(rooms[0]) == (2, date(f'{YEAR}-01-01'), date(f'{YEAR}-01-09'))
+    assert counters(rooms[1]) == (1, date(f'{YEAR}-01-03'), date(f'{YEAR}-01-04'))
+    assert counters(rooms[2]) == (0, None, None)
+
+
+@pytest.mark.django_db
+def test_counters_past_bookings(client, rooms):
+    today = timezone.localdate()
+    post_booking(client, rooms[0], '2019-01-01', '2019-01-07')
+    post_booking(client, rooms[0], today.isoformat(), today.isoformat())
+    assert counters(rooms[0]) == (1, today, today)
+
+    response = client.post(reverse('booking-bulk'), data=[
+        {'begin_date': '2019-01-01', 'end_date': '2019-01-07', 'room_id': rooms[1].pk},
+    ], format='json')
+    assert response.status_code == 201
+    assert counters(rooms[1]) == (0, None, None)
+
+
+@pytest.mark.django_db
+def test_counters_edit(rooms):
+    booking = Booking.objects.create(room=rooms[0], begin_date=date(f'{YEAR}-01-01'), end_date=date(f'{YEAR}-01-02'))
+
+    booking.room = rooms[1]
+    booking.end_date = date(f'{YEAR}-01-04')
+    booking.save()
+
+    assert counters(rooms[0]) == (0, None, None)
+    assert counters(rooms[1]) == (1, date(f'{YEAR}-01-01'), date(f'{YEAR}-01-04'))
+
+
+@pytest.mark.django_db
+def test_counters_archive(rooms):
+    today = timezone.localdate()
+    Booking.objects.create(room=rooms[0], begin_date=today - datetime.timedelta(days=5), end_date=today - datetime.timedelta(days=3))
+    Booking.objects.create(room=rooms[0], begin_date=today, end_date=today + datetime.timedelta(days=2))
+
+    call_command('archive_bookings', stdout=StringIO())
+
+    assert counters(rooms[0]) == (1, today, today + datetime.timedelta(days=2))
+
+
+@pytest.mark.django_db
+def test_get_rooms_summary(client, rooms):
+    post_booking(client, rooms[0], f'{YEAR}-01-01', f'{YEAR}-01-02')
+
+    response = client.get(reverse('room-list'))
+    assert 'upcoming_bookings' not in response.json()['results'][0]
+
+    response = client.get(reverse('room-list'), data={'summary': 'true'})
+    assert [
+        (room['id'], room['upcoming_bookings'], room['next_begin_date'], room['last_end_date'])
+        for room in response.json()['results']
+    ] == [
+        (rooms[0].pk, 1, f'{YEAR}-01-01', f'{YEAR}-01-02'),
+        (rooms[1].pk, 0, None, None),
+        (rooms[2].pk, 0, None, None),
+    ]
+
+
+@pytest.mark.django_db
+def test_get_rooms_summary_etag(client, rooms):
+    etag = client.get(reverse('room-list'), data={'summary': 'true'})['ETag']
+
+    post_booking(client, rooms[0], f'{YEAR}-01-01', f'{YEAR}-01-02')
+
+    response = client.get(reverse('room-list'), data={'summary': 'true'}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['results'][0]['upcoming_bookings'] == 1
+
+
+@pytest.mark.parametrize('ordering', [
+    'next_begin_date', '-next_begin_date', 'last_end_date,-upcoming_bookings', '-upcoming_bookings,next_begin_date'
+])
+@pytest.mark.django_db
+def test_get_rooms_pages_by_counters(client, room_input, ordering):
+    rooms = [Room.objects.create(**room_input) for _ in range(7)]
+    for i, room in enumerate(rooms[:4]):
+        for j in range(i % 2 + 1):
+            day = datetime.date(YEAR, 1, 1) + datetime.timedelta(days=(i % 3) * 10 + j * 2)
+            Booking.objects.create(room=room, begin_date=day, end_date=day)
+
+    actual = []
+    url = reverse('room-list') + f'?ordering={ordering}&page_size=2'
+    while url is not None:
+        data = client.get(url).json()
+        actual += [room['id'] for room in data['results']]
+        url = data['next']
+
+    # NULLs sort as if greater than any date
+    fields = ordering.split(',')
+    tiebreaker = '-id' if fields[-1].startswith('-') else 'id'
+    expected = [
+        room.id for room in Room.objects.order_by(*(
+            F(field[1:]).desc(nulls_first=True) if field.startswith('-') else F(field).asc(nulls_last=True)
+            for field in fields
+        ), tiebreaker)
+    ]
+
+    assert actual == expected
+
+
+@pytest.mark.django_db
+def test_reconcile_room_counters(rooms):
+    Booking.objects.create(room=rooms[0], begin_date=date(f'{YEAR}-01-01'), end_date=date(f'{YEAR}-01-02'))
+    Booking.objects.create(room=rooms[1], begin_date=date(f'{YEAR}-01-01'), end_date=date(f'{YEAR}-01-02'))
+    # Changes made behind the back of the API
+    Room.objects.filter(pk=rooms[0].pk).update(upcoming_bookings=5)
+    Booking.objects.filter(room=rooms[1])._raw_delete('default')
+
+    out = StringIO()
+    call_command('reconcile_room_counters', '--dry-run', '--batch-size', '2', '--verbosity', '2', stdout=out)
+    assert out.getvalue() == f'Drifted rooms: {rooms[0].pk}, {rooms[1].pk}\nChecked 3 rooms, 2 drifted\n'
+    assert counters(rooms[0])[0] == 5
+
+    out = StringIO()
+    call_command('reconcile_room_counters', stdout=out)
+    assert out.getvalue() == 'Checked 3 rooms, 2 drifted, fixed\n'
+    assert counters(rooms[0]) == (1, date(f'{YEAR}-01-01'), date(f'{YEAR}-01-02'))
+    assert counters(rooms[1]) == (0, None, None)
+
+    out = StringIO()
+    call_command('reconcile_room_counters', stdout=out)
+    assert out.getvalue() == 'Checked 3 rooms, 0 drifted\n'
@@ -0,0 +1,94 @@
+import datetime
+
+import pytest
+
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+
+pytestmark = pytest.mark.usefixtures('list_serialization')
+
+
+@pytest.fixture
+def rooms():
+    rooms = [
+        Room.objects.create(description=f'Room #{i}', price=price)
+        for i, price in enumerate((100, 200, 150, 100), 1)
+    ]
+
+    # Room #4 has no bookings at all
+    for room, dates in zip(rooms, [
+        [('2021-01-01', '2021-01-07'), ('2021-01-15', '2021-01-20')],
+        [('2020-12-01', '2021-01-10')],
+        [('2021-01-08', '2021-01-08')],
+    ]):
+        for begin_date, end_date in dates:
+            Booking.objects.create(
+                room=room,
+                begin_date=datetime.date.fromisoformat(begin_date),
+                end_date=datetime.date.fromisoformat(end_date)
+            )
+
+    return rooms
+
+
+@pytest.mark.parametrize('dates, expected', [
+    ({'begin_date': '2021-01-08', 'end_date': '2021-01-14'}, [1, 4]),
+    ({'begin_date': '2021-01-09', 'end_date': '2021-01-14'}, [1, 3, 4]),
+    ({'begin_date': '2021-01-11', 'end_date': '2021-01-14'}, [1, 2, 3, 4]),
+    ({'begin_date': '2021-01-11', 'end_date': '2021-01-15'}, [2, 3, 4]),
+    ({'begin_date': '2021-01-21', 'end_date': '2021-01-21'}, [1, 2, 3, 4]),
+    ({'begin_date': '2020-12-01', 'end_date': '2021-12-31'}, [4]),
+])
+@pytest.mark.django_db
+def test_get_available_rooms(client, rooms, dates, expected):
+    response = client.get(reverse('room-available'), data={**dates, 'ordering': 'created_at'})
+
+    assert response.status_code == 200
+
+    actual = [room['id'] for room in response.json()['results']]
+
+    assert actual == [rooms[i - 1].id for i in expected]
+
+
+@pytest.mark.django_db
+def test_get_available_rooms_price_max(client, rooms):
+    response = client.get(reverse('room-available'), data={
+        'begin_date': '2021-01-21',
+        'end_date': '2021-01-21',
+        'price_max': 150,
+        'ordering': '-price'
+    })
+
+    assert response.status_code == 200
+
+    actual = [room['id'] for room in response.json()['results']]
+
+    assert actual == [rooms[2].id, rooms[3].id, rooms[0].id]
+
+
+@pytest.mark.django_db
+def test_get_available_rooms_pages(client, rooms):
+    url = reverse('room-available') + '?begin_date=2021-01-21&end_date=2021-01-21&ordering=price&page_size=3'
+
+    first_page = client.get(url).json()
+    second_page = client.get(first_page['next']).json()
+
+    actual = [room['id'] for room in first_page['results'] + second_page['results']]
+
+    assert actual == [rooms[0].id, rooms[3].id, rooms[2].id, rooms[1].id]
+    assert second_page['next'] is None
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'begin_date': '2021-01-01'},
+    {'begin_date': '2021-01-07', 'end_date': '2021-01-01'},
+    {'begin_date': '2021-02-30', 'end_date': '2021-03-01'},
+    {'begin_date': '2021-01-01', 'end_date': '2021-01-07', 'price_max': 'N'},
+])
+@pytest.mark.django_db
+def test_get_available_rooms_invalid_params(client, rooms, params):
+    response = client.get(reverse('room-available'), data=params)
+
+    assert response.status_code == 400
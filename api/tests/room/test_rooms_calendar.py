@@ -0,0 +1,119 @@
+import datetime
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+
+
+@pytest.fixture
+def rooms(room_input):
+    rooms = [Room.objects.create(**room_input) for _ in range(3)]
+
+    for room, dates in zip(rooms, (
+        # Adjacent bookings, one of them reaching into the range from before it
+        (('2020-12-30', '2021-01-02'), ('2021-01-03', '2021-01-03'), ('2021-01-06', '2021-01-12')),
+        (('2021-01-04', '2021-01-04'), ('2021-02-01', '2021-02-03')),
+        (),
+    )):
+        for begin_date, end_date in dates:
+            Booking.objects.create(room=room, begin_date=begin_date, end_date=end_date)
+
+    return rooms
+
+
+def get_calendar(client, rooms, params=None, **extra):
+    return client.get(reverse('room-calendar'), data={
+        'rooms': ','.join(str(room) for room in rooms),
+        'from': '2021-01-01',
+        'to': '2021-01-08',
+        **(params or {})
+    }, **extra)
+
+
+@pytest.mark.django_db
+def test_get_rooms_calendar_bits(client, rooms):
+    response = get_calendar(client, [room.pk for room in rooms] + [rooms[-1].pk + 1])
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'from': '2021-01-01',
+        'to': '2021-01-08',
+        'encoding': 'bits',
+        'rooms': {
+            str(rooms[0].pk): '11100111',
+            str(rooms[1].pk): '00010000',
+            str(rooms[2].pk): '00000000',
+        }
+    }
+
+
+@pytest.mark.django_db
+def test_get_rooms_calendar_ranges(client, rooms):
+    response = get_calendar(client, [room.pk for room in rooms], {'encoding': 'ranges'})
+
+    assert response.status_code == 200
+    assert response.json()['rooms'] == {
+        str(rooms[0].pk): [['2021-01-01', '2021-01-03'], ['2021-01-06', '2021-01-08']],
+        str(rooms[1].pk): [['2021-01-04', '2021-01-04']],
+        str(rooms[2].pk): [],
+    }
+
+
+@pytest.mark.django_db
+def test_get_rooms_calendar_archived(client, room_input):
+    room = Room.objects.create(**room_input)
+    today = timezone.localdate()
+    for begin, end in ((-6, -5), (-2, 1)):
+        Booking.objects.create(
+            room=room, begin_date=today + datetime.timedelta(days=begin), end_date=today + datetime.timedelta(days=end)
+        )
+    call_command('archive_bookings', stdout=StringIO())
+
+    response = client.get(reverse('room-calendar'), data={
+        'rooms': room.pk,
+        'from': (today - datetime.timedelta(days=7)).isoformat(),
+        'to': (today + datetime.timedelta(days=2)).isoformat()
+    })
+
+    assert response.json()['rooms'] == {str(room.pk): '0110011110'}
+
+
+@pytest.mark.django_db
+def test_get_rooms_calendar_etag(client, rooms):
+    etag = get_calendar(client, [rooms[1].pk])['ETag']
+
+    Booking.objects.create(room=rooms[0], begin_date='2021-01-04', end_date='2021-01-04')
+    response = get_calendar(client, [rooms[1].pk], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    Booking.objects.create(room=rooms[1], begin_date='2021-01-05', end_date='2021-01-05')
+    response = get_calendar(client, [rooms[1].pk], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['rooms'] == {str(rooms[1].pk): '00011000'}
+
+
+@pytest.mark.parametrize('params', [
+    {'rooms': '1,a'},
+    {'rooms': '1,1000000000000000000000000000000'},
+    {'rooms': '0'},
+    {'rooms': ','.join(map(str, range(1, 1002)))},
+    {'from': '2021-01-09'},
+    {'to': '2024-01-08'},
+    {'encoding': 'rle'},
+    {'to': ''},
+])
+@pytest.mark.django_db
+def test_get_rooms_calendar_invalid_params(client, params):
+    response = client.get(reverse('room-calendar'), data={
+        'rooms': '1,2',
+        'from': '2021-01-01',
+        'to': '2021-01-08',
+        **params
+    })
+
+    assert response.status_code == 400
@@ -5,6 +5,9 @@ import pytest
 from rest_framework.reverse import reverse
 
 from api.models import Room
+from api.views import RoomView
+
+pytestmark = pytest.mark.usefixtures('list_serialization')
 
 
 @pytest.fixture
@@ -20,7 +23,7 @@ def test_get_rooms_empty_response(client):
     response = client.get(reverse('room-list'))
 
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {'next': None, 'results': []}
 
 
 @pytest.mark.django_db
@@ -34,7 +37,7 @@ def test_get_rooms_price_asc(client, rooms_input):
 
     assert response.status_code == 200
 
-    actual = [room['id'] for room in response.json()]
+    actual = [room['id'] for room in response.json()['results']]
     expected = [
         room.id for room in Room.objects.order_by('price')
     ]
@@ -53,7 +56,7 @@ def test_get_rooms_price_desc(client, rooms_input):
 
     assert response.status_code == 200
 
-    actual = [room['id'] for room in response.json()]
+    actual = [room['id'] for room in response.json()['results']]
     expected = [
         room.id for room in Room.objects.order_by('-price')
     ]
@@ -75,7 +78,7 @@ def test_get_rooms_date_asc(client, rooms_input):
 
     assert response.status_code == 200
 
-    actual = [room['id'] for room in response.json()]
+    actual = [room['id'] for room in response.json()['results']]
     expected = [
         room.id for room in Room.objects.order_by('created_at')
     ]
@@ -97,7 +100,7 @@ def test_get_rooms_date_desc(client, rooms_input):
 
     assert response.status_code == 200
 
-    actual = [room['id'] for room in response.json()]
+    actual = [room['id'] for room in response.json()['results']]
     expected = [
         room.id for room in Room.objects.order_by('-created_at')
     ]
@@ -119,7 +122,7 @@ def test_get_rooms_price_asc_date_asc(client, rooms_input):
 
     assert response.status_code == 200
 
-    actual = [room['id'] for room in response.json()]
+    actual = [room['id'] for room in response.json()['results']]
     expected = [
         room.id for room in Room.objects.order_by('price', 'created_at')
     ]
@@ -141,9 +144,119 @@ def test_get_rooms_price_desc_date_desc(client, rooms_input):
 
     assert response.status_code == 200
 
-    actual = [room['id'] for room in response.json()]
+    actual = [room['id'] for room in response.json()['results']]
     expected = [
         room.id for room in Room.objects.order_by('-price', '-created_at')
     ]
 
     assert actual == expected
+
+
+@pytest.mark.parametrize('ordering', ['price', '-price', 'price,-created_at', '-created_at,price'])
+@pytest.mark.django_db
+def test_get_rooms_pages(client, rooms_input, ordering):
+    rooms = [Room.objects.create(**data) for data in rooms_input * 3]
+
+    for i, room in enumerate(rooms, 1):
+        room.created_at = datetime.date(2021, 1, i % 3 + 1)
+        room.save()
+
+    actual = []
+    url = reverse('room-list') + f'?ordering={ordering}&page_size=2'
+    while url is not None:
+        response = client.get(url)
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert len(data['results']) <= 2
+        actual += [room['id'] for room in data['results']]
+        url = data['next']
+
+    fields = ordering.split(',')
+    tiebreaker = '-id' if fields[-1].startswith('-') else 'id'
+    expected = [
+        room.id for room in Room.objects.order_by(*fields, tiebreaker)
+    ]
+
+    assert len(actual) == len(rooms)
+    assert actual == expected
+
+
+@pytest.mark.django_db
+def test_get_rooms_without_pagination(client, rooms_input):
+    for data in rooms_input:
+        Room.objects.create(**data)
+
+    response = client.get(reverse('room-list'), data={
+        'ordering': 'price',
+        'paginate': 'false'
+    })
+
+    assert response.status_code == 200
+
+    actual = [room['id'] for room in response.json()]
+    expected = [
+        room.id for room in Room.objects.order_by('price', 'id')
+    ]
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize('cursor', [
+    'N',
+    'W1tdLFtdXQ==',
+    # [["price","pk"],["N","1"]]
+    'W1sicHJpY2UiLCJwayJdLFsiTiIsIjEiXV0=',
+    # [["price","id"],["N","1"]]
+    'W1sicHJpY2UiLCJpZCJdLFsiTiIsIjEiXV0=',
+    # [["price","id"],["1","N"]]
+    'W1sicHJpY2UiLCJpZCJdLFsiMSIsIk4iXV0=',
+    # [["price","id"],["1","1000000000000000000000000000000"]]
+    'W1sicHJpY2UiLCJpZCJdLFsiMSIsIjEwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAiXV0=',
+    # [["price","id"],[["1"],{}]]
+    'W1sicHJpY2UiLCJpZCJdLFtbIjEiXSx7fV1d',
+])
+@pytest.mark.django_db
+def test_get_rooms_invalid_cursor(client, rooms_input, cursor):
+    for data in rooms_input:
+        Room.objects.create(**data)
+
+    response = client.get(reverse('room-list'), data={
+        'ordering': 'price',
+        'cursor': cursor
+    })
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1000])
+@pytest.mark.django_db
+def test_get_rooms_stream(client, rooms_input, monkeypatch, chunk_size):
+    monkeypatch.setattr(RoomView, 'stream_chunk_size', chunk_size)
+
+    for data in rooms_input:
+        Room.objects.create(**data)
+
+    response = client.get(reverse('room-list'), data={
+        'ordering': '-price',
+        'stream': 'true'
+    })
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json'
+
+    expected = client.get(reverse('room-list'), data={
+        'ordering': '-price',
+        'paginate': 'false'
+    }, HTTP_ACCEPT='application/json')
+
+    assert b''.join(response.streaming_content) == expected.content
+
+
+@pytest.mark.django_db
+def test_get_rooms_stream_empty_response(client):
+    response = client.get(reverse('room-list'), data={'stream': 'true'})
+
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content) == b'[]'
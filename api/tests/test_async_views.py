@@ -0,0 +1,133 @@
+import asyncio
+import importlib
+import threading
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches, resolve
+from rest_framework.reverse import reverse
+
+import api.urls
+import config.urls
+import config.urls_api
+from api.models import Booking, Room
+from api.views import RoomView
+
+
+def reload_urls():
+    importlib.reload(api.urls)
+    importlib.reload(config.urls_api)
+    importlib.reload(config.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.ASYNC_VIEWS = True
+    # The way config/settings_docker_asgi.py has it
+    settings.MIDDLEWARE = [
+        middleware for middleware in settings.MIDDLEWARE if middleware != 'whitenoise.middleware.WhiteNoiseMiddleware'
+    ]
+    # Views are built along with the URLconf
+    reload_urls()
+
+    yield
+
+    settings.ASYNC_VIEWS = False
+    reload_urls()
+
+
+@pytest.fixture
+def async_client():
+    client = AsyncClient()
+
+    def request(method, path, data=None, **kwargs):
+        if method in ('get', 'delete') and data:
+            # The async test client of Django 3.2 drops query strings passed as data
+            path, data = f'{path}?{urlencode(data)}', None
+
+        async def send():
+            return await getattr(client, method)(path, data, **kwargs)
+
+        return async_to_sync(send)()
+
+    return request
+
+
+def test_views_are_sync_by_default():
+    assert not asyncio.iscoroutinefunction(resolve(reverse('room-list')).func)
+
+
+@pytest.mark.usefixtures('async_views')
+def test_async_views_are_coroutines():
+    for name in ('room-list', 'booking-list', 'room-bulk'):
+        assert asyncio.iscoroutinefunction(resolve(reverse(name)).func)
+
+    assert resolve(reverse('room-list')).func.cls is RoomView
+
+
+@pytest.mark.usefixtures('async_views')
+@pytest.mark.django_db(transaction=True)
+def test_async_views_requests(async_client):
+    # The test client of Django 3.2 can't read multipart bodies back over ASGI
+    response = async_client('post', reverse('room-list'), data={'description': 'Double room', 'price': 100},
+                            content_type='application/json')
+    assert response.status_code == 201
+    room_id = response.json()['id']
+
+    booking = {'begin_date': '2021-01-01', 'end_date': '2021-01-07', 'room_id': room_id}
+    response = async_client('post', reverse('booking-list'), data=booking, content_type='application/json')
+    assert response.status_code == 201
+    booking_id = response.json()['id']
+
+    response = async_client('post', reverse('booking-list'), data=booking, content_type='application/json')
+    assert response.status_code == 400
+    assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+
+    response = async_client('get', reverse('booking-list'), data={'room': room_id})
+    assert response.status_code == 200
+    assert [item['id'] for item in response.json()['results']] == [booking_id]
+
+    response = async_client('get', reverse('room-list'), data={'stream': 'true'})
+    assert response.status_code == 200
+    assert [item['id'] for item in response.json()] == [room_id]
+    assert 'ETag' in response
+
+    response = async_client('delete', reverse('booking-detail', args=[booking_id]))
+    assert response.status_code == 204
+    assert not Booking.objects.exists()
+
+    response = async_client('delete', reverse('room-detail', args=[room_id]))
+    assert response.status_code == 204
+    assert not Room.objects.exists()
+
+
+@pytest.mark.usefixtures('async_views')
+@pytest.mark.django_db(transaction=True)
+def test_async_views_run_concurrently(monkeypatch):
+    threads = set()
+    list_view = RoomView.list
+
+    def slow_list(self, request, *args, **kwargs):
+        threads.add(threading.get_ident())
+        # A slow database round trip
+        time.sleep(0.2)
+        return list_view(self, request, *args, **kwargs)
+
+    monkeypatch.setattr(RoomView, 'list', slow_list)
+
+    async def get_rooms():
+        client = AsyncClient()
+        return await asyncio.gather(*(client.get(f"{reverse('room-list')}?page_size={i}") for i in range(1, 5)))
+
+    started = time.perf_counter()
+    responses = async_to_sync(get_rooms)()
+    elapsed = time.perf_counter() - started
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert len(threads) == 4
+    assert elapsed < 4 * 0.2
@@ -0,0 +1,232 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from api import changes, counters
+from api.archive import archive_bookings
+from api.models import Booking, Change, Room
+
+from .booking.test_booking_concurrency import post_concurrently
+
+
+@pytest.fixture
+def room():
+    return Room.objects.create(description='Double room', price=100)
+
+
+def get_changes(client, **params):
+    response = client.get(reverse('change-list'), data=params)
+    assert response.status_code == 200
+
+    return response.json()
+
+
+def entries(since=0):
+    return [
+        (model, action, object_id)
+        for model, action, object_id in Change.objects.filter(seq__gt=since).order_by('seq')
+        .values_list('model', 'action', 'object_id')
+    ]
+
+
+def last_seq():
+    return Change.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+
+
+@pytest.mark.django_db
+def test_changes_of_requests(client):
+    room = client.post(reverse('room-list'), data={'description': 'Double room', 'price': 100}).json()
+    booking = client.post(reverse('booking-list'), data={
+        'begin_date': '2021-01-01', 'end_date': '2021-01-07', 'room_id': room['id']
+    }).json()
+    client.delete(reverse('booking-detail', args=(booking['id'],)))
+
+    data = get_changes(client)
+
+    assert data['more'] is False
+    assert data['last'] == data['results'][-1]['seq']
+    assert [change['seq'] for change in data['results']] == [1, 2, 3]
+    assert data['results'] == [
+        {'seq': 1, 'model': 'room', 'action': 'created', 'object_id': room['id'], 'data': room},
+        {'seq': 2, 'model': 'booking', 'action': 'created', 'object_id': booking['id'], 'data': booking},
+        {'seq': 3, 'model': 'booking', 'action': 'deleted', 'object_id': booking['id'], 'data': None},
+    ]
+
+
+@pytest.mark.django_db
+def test_room_deleted_with_bookings(client, room):
+    bookings = [
+        Booking.objects.create(room=room, begin_date=datetime.date(2021, 1, day), end_date=datetime.date(2021, 1, day))
+        for day in (1, 2)
+    ]
+    since = last_seq()
+
+    client.delete(reverse('room-detail', args=(room.pk,)))
+
+    assert entries(since) == [
+        ('booking', 'deleted', bookings[0].pk),
+        ('booking', 'deleted', bookings[1].pk),
+        ('room', 'deleted', room.pk),
+    ]
+
+
+@pytest.mark.django_db
+def test_changes_of_bulk_requests(client, room):
+    since = last_seq()
+    created = client.post(reverse('booking-bulk'), data=[
+        {'begin_date': '2021-01-01', 'end_date': '2021-01-01', 'room_id': room.pk},
+        {'begin_date': '2021-01-02', 'end_date': '2021-01-02', 'room_id': room.pk},
+    ], format='json').json()
+    client.delete(reverse('booking-bulk'), data={'ids': [created[0]['id']]}, format='json')
+    rooms = client.post(reverse('room-bulk'), data=[{'description': 'Single room', 'price': 50}], format='json').json()
+
+    assert entries(since) == [
+        ('booking', 'created', created[0]['id']),
+        ('booking', 'created', created[1]['id']),
+        ('booking', 'deleted', created[0]['id']),
+        ('room', 'created', rooms[0]['id']),
+    ]
+    assert Change.objects.get(model='booking', action='created', object_id=created[1]['id']).data == created[1]
+
+
+@pytest.mark.django_db
+def test_changes_of_edits_and_archiving(room):
+    today = timezone.localdate()
+    booking = Booking.objects.create(
+        room=room, begin_date=today - datetime.timedelta(days=10), end_date=today - datetime.timedelta(days=5)
+    )
+    since = last_seq()
+
+    booking.end_date = today - datetime.timedelta(days=4)
+    booking.save()
+    room.description = 'Renovated room'
+    room.save()
+    archive_bookings(today)
+
+    assert entries(since) == [
+        ('booking', 'updated', booking.pk),
+        ('room', 'updated', room.pk),
+        ('booking', 'archived', booking.pk),
+    ]
+    assert Change.objects.get(model='room', action='updated').data['description'] == 'Renovated room'
+
+
+@pytest.mark.django_db
+def test_failed_write_leaves_no_changes(client, room, monkeypatch):
+    Booking.objects.create(room=room, begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 7))
+    since = last_seq()
+
+    response = client.post(reverse('booking-list'), data={
+        'begin_date': '2021-01-05', 'end_date': '2021-01-06', 'room_id': room.pk
+    })
+    assert response.status_code == 400
+
+    def fail(room_ids, using):
+        raise RuntimeError
+
+    # The bookings are inserted, but their transaction fails after that
+    with monkeypatch.context() as patch, pytest.raises(RuntimeError):
+        patch.setattr(counters, 'refresh', fail)
+        client.post(reverse('booking-bulk'), data=[
+            {'begin_date': '2021-02-01', 'end_date': '2021-02-01', 'room_id': room.pk},
+        ], format='json')
+
+    assert entries(since) == []
+    assert Booking.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_changes_in_batches(client):
+    Room.objects.bulk_create(Room(description=f'Room #{i}', price=100) for i in range(5))
+    changes.record(changes.ROOM, changes.DELETED, range(1, 6))
+
+    first = get_changes(client, limit=2)
+    assert [change['seq'] for change in first['results']] == [1, 2]
+    assert (first['last'], first['more']) == (2, True)
+
+    second = get_changes(client, since=first['last'], limit=2)
+    assert [change['seq'] for change in second['results']] == [3, 4]
+
+    third = get_changes(client, since=second['last'], limit=2)
+    assert [change['seq'] for change in third['results']] == [5]
+    assert (third['last'], third['more']) == (5, False)
+
+    # Nothing new, the cursor stays where it is
+    assert get_changes(client, since=5) == {'last': 5, 'more': False, 'results': []}
+
+
+@pytest.mark.parametrize('params', [
+    {'since': -1}, {'since': 'a'}, {'since': 10 ** 30}, {'limit': 0}, {'limit': 10_001}, {'wait': 21}
+])
+def test_changes_invalid_params(client, params):
+    assert client.get(reverse('change-list'), data=params).status_code == 400
+
+
+@pytest.mark.django_db
+def test_long_poll_times_out(client):
+    start = time.monotonic()
+    data = get_changes(client, since=0, wait=0.2)
+
+    assert data == {'last': 0, 'more': False, 'results': []}
+    assert time.monotonic() - start >= 0.2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_long_poll_woken_by_change(client):
+    def create_room():
+        time.sleep(0.2)
+        try:
+            Room.objects.create(description='Double room', price=100)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=create_room)
+    thread.start()
+    start = time.monotonic()
+    data = get_changes(client, since=0, wait=10)
+    thread.join()
+
+    assert [(change['model'], change['action']) for change in data['results']] == [('room', 'created')]
+    # Woken by the commit rather than by polling
+    assert time.monotonic() - start < changes.POLL_INTERVAL + 0.2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_seqs_follow_commits():
+    rooms = [Room.objects.create(description='Double room', price=100) for _ in range(4)]
+
+    post_concurrently([{
+        'begin_date': datetime.date(2021, 1, day).isoformat(),
+        'end_date': datetime.date(2021, 1, day).isoformat(),
+        'room_id': room.pk
+    } for room in rooms for day in range(1, 6)])
+
+    assert list(Change.objects.order_by('seq').values_list('seq', flat=True)) == list(range(1, 25))
+    assert Change.objects.filter(model='booking').count() == 20
+
+
+@pytest.mark.django_db(transaction=True)
+def test_seqs_given_after_commit(room):
+    with transaction.atomic():
+        changes.record(changes.ROOM, changes.UPDATED, (room.pk,))
+        assert Change.objects.filter(seq__isnull=True).count() == 1
+
+    assert entries(last_seq() - 1) == [('room', 'updated', room.pk)]
+    assert not Change.objects.filter(seq__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_reader_numbers_left_entries(client, room):
+    since = last_seq()
+    # Left by a process which died between its commit and numbering them
+    Change.objects.bulk_create(Change(model='room', action='updated', object_id=room.pk) for _ in range(2))
+
+    data = get_changes(client, since=since)
+
+    assert [change['seq'] for change in data['results']] == [since + 1, since + 2]
@@ -0,0 +1,161 @@
+import gzip
+import json
+import zlib
+
+import brotli
+import pytest
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from rest_framework.reverse import reverse
+
+from api.models import Room
+from config import compression
+from config.compression import CompressionMiddleware, choose_encoding
+
+
+@pytest.fixture
+def rooms():
+    return [Room.objects.create(description=f'Room #{i} with a view of the sea', price=100 + i) for i in range(200)]
+
+
+def decompress(response):
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    if response.get('Content-Encoding') == 'br':
+        return brotli.decompress(content)
+    if response.get('Content-Encoding') == 'gzip':
+        return gzip.decompress(content)
+
+    return content
+
+
+def process(response, accept_encoding='gzip'):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    return CompressionMiddleware(lambda request: response).process_response(request, response)
+
+
+@pytest.mark.parametrize('header, encoding', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip', 'gzip'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('gzip;q=0.8, br;q=0.9', 'br'),
+    ('*', 'br'),
+    ('br;q=0, *;q=0.1', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+    ('identity', None),
+    ('deflate', None),
+    ('', None),
+])
+def test_choose_encoding(header, encoding):
+    assert choose_encoding(header) == encoding
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, 'COMPRESSORS', {'gzip': compression.GzipCompressor})
+
+    assert choose_encoding('br, gzip') == 'gzip'
+    assert choose_encoding('br') is None
+
+
+@pytest.mark.parametrize('accept_encoding', ['gzip', 'br'])
+@pytest.mark.django_db
+def test_list_compressed(client, rooms, accept_encoding):
+    response = client.get(reverse('room-list'), HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == accept_encoding
+    assert 'Accept-Encoding' in response['Vary']
+    assert int(response['Content-Length']) == len(response.content)
+    assert len(json.loads(decompress(response))['results']) == 100
+
+
+@pytest.mark.django_db
+def test_list_not_accepted(client, rooms):
+    response = client.get(reverse('room-list'), HTTP_ACCEPT_ENCODING='identity')
+
+    assert response.status_code == 200
+    assert not response.has_header('Content-Encoding')
+    assert 'Accept-Encoding' in response['Vary']
+
+
+@pytest.mark.django_db
+def test_short_response_left_alone(client):
+    response = client.get(reverse('room-list'), HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response.status_code == 200
+    assert not response.has_header('Content-Encoding')
+    assert json.loads(response.content) == {'next': None, 'results': []}
+
+
+@pytest.mark.parametrize('accept_encoding', ['gzip', 'br'])
+@pytest.mark.django_db
+def test_stream_compressed(client, rooms, accept_encoding):
+    response = client.get(reverse('room-list'), data={'stream': 'true'}, HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Encoding'] == accept_encoding
+    assert not response.has_header('Content-Length')
+    assert len(json.loads(decompress(response))) == 200
+
+
+def test_stream_compressed_chunk_by_chunk():
+    chunks = [json.dumps({'id': i, 'description': 'x' * 500}).encode() for i in range(10)]
+    response = process(StreamingHttpResponse(iter(chunks)))
+
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    compressed = iter(response.streaming_content)
+    # Every chunk can be decompressed as soon as it arrives
+    for chunk in chunks:
+        assert decompressor.decompress(next(compressed)) == chunk
+    decompressor.decompress(next(compressed))
+    assert decompressor.eof
+    assert next(compressed, None) is None
+
+
+def test_short_stream_left_alone():
+    response = process(StreamingHttpResponse(iter([b'[', b'{"id": 1}', b']'])))
+
+    assert not response.has_header('Content-Encoding')
+    assert b''.join(response.streaming_content) == b'[{"id": 1}]'
+
+
+def test_incompressible_left_alone():
+    content = brotli.compress(bytes(range(256)) * 64)
+    response = process(HttpResponse(content), accept_encoding='gzip')
+
+    assert not response.has_header('Content-Encoding')
+    assert response.content == content
+
+
+def test_already_encoded_left_alone():
+    response = HttpResponse(b'x' * 2048)
+    response['Content-Encoding'] = 'identity'
+
+    assert process(response)['Content-Encoding'] == 'identity'
+    assert response.content == b'x' * 2048
+
+
+def test_threshold(settings):
+    settings.COMPRESSION_MIN_SIZE = 100
+
+    assert process(HttpResponse(b'x' * 99)).content == b'x' * 99
+    assert process(HttpResponse(b'x' * 100))['Content-Encoding'] == 'gzip'
+
+
+@pytest.mark.django_db
+def test_etag_weakened(client, rooms):
+    url = reverse('room-list')
+    plain = client.get(url)
+    response = client.get(url, HTTP_ACCEPT_ENCODING='br')
+
+    assert response['Content-Encoding'] == 'br'
+    assert response['ETag'] == 'W/' + plain['ETag']
+
+    # Either of the tags still matches, and 304 responses are not encoded
+    for etag in (plain['ETag'], response['ETag']):
+        not_modified = client.get(url, HTTP_ACCEPT_ENCODING='br', HTTP_IF_NONE_MATCH=etag)
+
+        assert not_modified.status_code == 304
+        assert not not_modified.has_header('Content-Encoding')
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+
+from config import database_url
+from config.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_database_url():
+    database = database_url.parse('postgresql://user:p%40ss@db:5433/name?conn_max_age=60&sslmode=require')
+
+    assert database == {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': 'name',
+        'USER': 'user',
+        'PASSWORD': 'p@ss',
+        'HOST': 'db',
+        'PORT': '5433',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {'sslmode': 'require'},
+    }
+
+
+def test_database_url_pool():
+    database = database_url.parse('postgres://user:password@db/name?pool=true&pool_size=4&health_check_interval=5')
+
+    assert database['ENGINE'] == 'config.postgresql_pool'
+    assert database['CONN_MAX_AGE'] == 0
+    assert database['OPTIONS'] == {}
+    assert database['POOL'] == {'SIZE': 4, 'TIMEOUT': 30, 'HEALTH_CHECKS': True, 'CHECK_INTERVAL': 5}
+
+
+@pytest.mark.parametrize('url', [
+    'mysql://user:password@db/name',
+    'postgresql://user:password@db/name?pool_size=4',
+    'postgresql://user:password@db/name?pool=true&pool_size=many',
+    'postgresql://user:password@db:port/name',
+])
+def test_database_url_invalid(url):
+    with pytest.raises(ImproperlyConfigured):
+        database_url.parse(url)
+
+
+def test_pool_reuses_connections():
+    pool = ConnectionPool(FakeConnection, size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is first
+    assert pool.stats()['created'] == 1
+    assert pool.stats()['in_use'] == 1
+
+
+def test_pool_bounds_connections():
+    pool = ConnectionPool(FakeConnection, size=2)
+    lock = threading.Lock()
+    in_use = 0
+    peak = 0
+
+    def request():
+        nonlocal in_use, peak
+        connection = pool.acquire()
+        with lock:
+            in_use += 1
+            peak = max(peak, in_use)
+        time.sleep(0.02)
+        with lock:
+            in_use -= 1
+        pool.release(connection)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert peak == 2
+    assert stats['created'] == 2
+    assert stats['checkouts'] == 8
+    assert stats['waits'] > 0
+    assert stats['idle'] == 2
+
+
+def test_pool_timeout():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    assert pool.stats()['waits'] == 1
+
+
+def test_pool_health_checks():
+    pool = ConnectionPool(FakeConnection, size=1, check=lambda connection: not connection.broken, check_interval=0)
+
+    broken = pool.acquire()
+    broken.broken = True
+    pool.release(broken)
+
+    connection = pool.acquire()
+
+    assert connection is not broken
+    assert broken.closed
+    assert pool.stats()['discarded'] == 1
+    assert pool.stats()['open'] == 1
+
+
+def test_pool_failed_connect():
+    def connect():
+        raise OSError('Connection refused')
+
+    pool = ConnectionPool(connect, size=1, timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            pool.acquire()
+
+    assert pool.stats()['open'] == 0
+
+
+def test_pool_close():
+    pool = ConnectionPool(FakeConnection, size=2)
+    idle, in_use = pool.acquire(), pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    assert idle.closed and not in_use.closed
+
+    pool.release(in_use)
+    assert in_use.closed
+    assert pool.stats()['open'] == 0
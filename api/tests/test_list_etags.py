@@ -0,0 +1,198 @@
+import datetime
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+from api import versions
+from api.locks import room_lock
+from api.models import Booking, Room
+
+
+@pytest.fixture
+def rooms():
+    return [Room.objects.create(description=f'Room #{i}', price=100) for i in range(1, 3)]
+
+
+def get(client, url, etag=None, **params):
+    if etag is None:
+        return client.get(url, data=params)
+
+    return client.get(url, data=params, HTTP_IF_NONE_MATCH=etag)
+
+
+def assert_not_modified(client, url, etag, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = get(client, url, etag, **params)
+
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    # Only the version counters are read
+    assert len(queries) == 1
+    assert '"api_room"' not in queries[0]['sql'] and '"api_booking"' not in queries[0]['sql']
+
+
+def post_booking(client, room, begin_date, end_date):
+    return client.post(reverse('booking-list'), data={
+        'begin_date': begin_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'room_id': room.pk
+    })
+
+
+@pytest.mark.django_db
+def test_rooms_etag(client, rooms):
+    url = reverse('room-list')
+
+    response = get(client, url)
+    etag = response['ETag']
+
+    assert response.status_code == 200
+    assert etag.startswith('"')
+    assert 'no-cache' in response['Cache-Control']
+    assert get(client, url)['ETag'] == etag
+
+    assert_not_modified(client, url, etag)
+
+    response = get(client, url, etag='"other"')
+    assert response.status_code == 200
+    assert response['ETag'] == etag
+
+
+@pytest.mark.django_db
+def test_rooms_etag_depends_on_query(client, rooms):
+    url = reverse('room-list')
+
+    etags = {
+        get(client, url)['ETag'],
+        get(client, url, ordering='price')['ETag'],
+        get(client, url, page_size=1)['ETag'],
+        get(client, url, stream='true')['ETag'],
+    }
+
+    assert len(etags) == 4
+
+
+@pytest.mark.django_db
+def test_rooms_etag_changes(client, rooms):
+    url = reverse('room-list')
+    etag = get(client, url)['ETag']
+
+    # Bookings are not a part of the room list
+    post_booking(client, rooms[0], datetime.date(2021, 1, 1), datetime.date(2021, 1, 7))
+    assert_not_modified(client, url, etag)
+
+    steps = (
+        lambda: client.post(url, data={'description': 'Single room', 'price': 70}),
+        lambda: client.post(reverse('room-bulk'), data=[{'description': 'Single room', 'price': 70}], format='json'),
+        lambda: Room.objects.filter(pk=rooms[0].pk).first().save(),
+        lambda: client.delete(reverse('room-detail', args=[rooms[0].pk])),
+        lambda: client.delete(reverse('room-bulk'), data={'ids': [rooms[1].pk]}, format='json'),
+    )
+    for step in steps:
+        step()
+
+        response = get(client, url, etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        etag = response['ETag']
+
+
+@pytest.mark.django_db
+def test_bookings_etag_per_room(client, rooms):
+    url = reverse('booking-list')
+    first = get(client, url, room=rooms[0].pk)['ETag']
+    second = get(client, url, room=rooms[1].pk)['ETag']
+    every = get(client, url)['ETag']
+
+    response = post_booking(client, rooms[1], datetime.date(2021, 1, 1), datetime.date(2021, 1, 7))
+    assert response.status_code == 201
+
+    assert_not_modified(client, url, first, room=rooms[0].pk)
+    assert get(client, url, second, room=rooms[1].pk).status_code == 200
+    assert get(client, url, every).status_code == 200
+
+
+@pytest.mark.django_db
+def test_bookings_etag_changes(client, rooms):
+    url = reverse('booking-list')
+    booking = Booking.objects.create(room=rooms[0], begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 1))
+    etag = get(client, url, room=rooms[0].pk)['ETag']
+
+    # Rejected bookings change nothing
+    response = post_booking(client, rooms[0], datetime.date(2021, 1, 1), datetime.date(2021, 1, 1))
+    assert response.status_code == 400
+    assert_not_modified(client, url, etag, room=rooms[0].pk)
+
+    def move_booking():
+        booking.room = rooms[1]
+        booking.save()
+
+    steps = (
+        lambda: post_booking(client, rooms[0], datetime.date(2021, 2, 1), datetime.date(2021, 2, 1)),
+        lambda: client.post(reverse('booking-bulk'), data=[{
+            'begin_date': '2021-03-01', 'end_date': '2021-03-01', 'room_id': rooms[0].pk
+        }], format='json'),
+        lambda: client.delete(reverse('booking-bulk'), data={
+            'ids': list(Booking.objects.filter(begin_date='2021-03-01').values_list('pk', flat=True))
+        }, format='json'),
+        lambda: client.delete(reverse('booking-detail', args=[
+            Booking.objects.get(begin_date='2021-02-01').pk
+        ])),
+        # Moved to another room in the admin
+        move_booking,
+    )
+    for step in steps:
+        step()
+
+        response = get(client, url, etag, room=rooms[0].pk)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        etag = response['ETag']
+
+    client.delete(reverse('room-detail', args=[rooms[0].pk]))
+
+    response = get(client, url, etag, room=rooms[0].pk)
+    assert response.status_code == 400
+    assert 'ETag' not in response
+
+
+@pytest.mark.django_db
+def test_available_rooms_etag(client, rooms):
+    url = reverse('room-available')
+    params = {'begin_date': '2021-01-01', 'end_date': '2021-01-07'}
+    etag = get(client, url, **params)['ETag']
+
+    assert_not_modified(client, url, etag, **params)
+
+    post_booking(client, rooms[0], datetime.date(2021, 1, 1), datetime.date(2021, 1, 1))
+
+    response = get(client, url, etag, **params)
+    assert response.status_code == 200
+    assert [room['id'] for room in response.json()['results']] == [rooms[1].pk]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_booking_list_version_bumped_after_commit(client, rooms):
+    keys = (versions.BOOKINGS, versions.bookings_of(rooms[0].pk))
+    before = versions.get(keys)
+
+    with room_lock(rooms[0].pk):
+        Booking.objects.create(room=rooms[0], begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 7))
+
+        # The room's counter moves with its bookings, the row of the whole
+        # list is left alone until the commit, so it is not locked meanwhile
+        during = versions.get(keys)
+        assert during[0] == before[0]
+        assert during[1] != before[1]
+
+    after = versions.get(keys)
+    assert after[0] != before[0]
+    assert after[1] == during[1]
+
+    url = reverse('booking-list')
+    etag = get(client, url)['ETag']
+    post_booking(client, rooms[1], datetime.date(2021, 1, 1), datetime.date(2021, 1, 7))
+    assert get(client, url, etag).status_code == 200
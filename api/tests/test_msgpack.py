@@ -0,0 +1,176 @@
+import datetime
+from decimal import Decimal
+
+import msgpack
+import pytest
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+
+from api.compact import EPOCH_ORDINAL, compact_value
+from api.models import Booking, Room
+from api.renderers import MessagePackRenderer
+from api.serializers import BookingSerializer, RoomSerializer
+
+MEDIA_TYPE = 'application/msgpack'
+
+
+def days(date):
+    return date.toordinal() - EPOCH_ORDINAL
+
+
+@pytest.fixture
+def rooms():
+    # Instances are not refreshed, so the price of the first room stays an int
+    rooms = [
+        Room.objects.create(description=description, price=price)
+        for description, price in [
+            ('Double room', 100),
+            ('Single room', Decimal('1.5')),
+            ('Люкс с видом на море', Decimal('9999999.99')),
+            ('Line\u2028separator "quoted"', Decimal('0.01')),
+        ]
+    ]
+
+    for i, room in enumerate(rooms):
+        Booking.objects.create(
+            room=room,
+            begin_date=datetime.date(1969, 12, 31) + datetime.timedelta(days=i),
+            end_date=datetime.date(2021, 12, 31)
+        )
+
+    return rooms
+
+
+def unpack(response):
+    assert response['Content-Type'] == MEDIA_TYPE
+    return msgpack.unpackb(response.content)
+
+
+def post(client, url, data):
+    return client.post(url, data=msgpack.packb(data), content_type=MEDIA_TYPE, HTTP_ACCEPT=MEDIA_TYPE)
+
+
+@pytest.mark.parametrize('serializer_class, queryset', [
+    (RoomSerializer, Room.objects.order_by('id')),
+    (BookingSerializer, Booking.objects.order_by('id')),
+])
+@pytest.mark.django_db
+def test_compact_representation_round_trip(rooms, serializer_class, queryset):
+    instances = rooms if serializer_class is RoomSerializer else list(queryset)
+
+    compact = serializer_class(instances, many=True, context={'compact_types': True}).data
+    values = serializer_class.represent_values(serializer_class.values_queryset(queryset), compact=True)
+    assert MessagePackRenderer().render(values) == MessagePackRenderer().render(compact)
+
+    # Turning compact values back gives what the JSON representation holds
+    expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+    fields = serializer_class().fields
+
+    def restore(field, value):
+        restored = compact_value(field, value)
+        return value if restored is value else field.to_representation(restored)
+
+    restored = [
+        {name: restore(fields[name], value) for name, value in item.items()}
+        for item in msgpack.unpackb(MessagePackRenderer().render(compact))
+    ]
+    assert JSONRenderer().render(restored) == expected
+
+
+@pytest.mark.django_db
+def test_get_rooms_msgpack(client, rooms):
+    response = client.get(reverse('room-list'), HTTP_ACCEPT=MEDIA_TYPE)
+
+    assert response.status_code == 200
+    assert unpack(response) == {
+        'next': None,
+        'results': [
+            {
+                'id': room.pk,
+                'description': room.description,
+                'price': price,
+                'created_at': days(datetime.date.today())
+            } for room, price in zip(rooms, (10000, 150, 999999999, 1))
+        ]
+    }
+
+
+@pytest.mark.django_db
+def test_get_bookings_msgpack(client, rooms):
+    response = client.get(reverse('booking-list'), data={'room': rooms[1].pk}, HTTP_ACCEPT=MEDIA_TYPE)
+
+    assert unpack(response)['results'] == [{
+        'id': Booking.objects.get(room=rooms[1]).pk,
+        'begin_date': 0,
+        'end_date': days(datetime.date(2021, 12, 31)),
+        'room_id': rooms[1].pk
+    }]
+
+
+@pytest.mark.django_db
+def test_get_changes_msgpack(client, rooms):
+    rooms_data = unpack(client.get(reverse('room-list'), HTTP_ACCEPT=MEDIA_TYPE))['results']
+    bookings_data = unpack(client.get(reverse('booking-list'), HTTP_ACCEPT=MEDIA_TYPE))['results']
+
+    results = unpack(client.get(reverse('change-list'), HTTP_ACCEPT=MEDIA_TYPE))['results']
+
+    # The objects in the log look the way their own endpoints show them
+    assert [change['data'] for change in results if change['model'] == 'room'] == rooms_data
+    assert [change['data'] for change in results if change['model'] == 'booking'] == bookings_data
+    assert results[0]['data']['price'] == 10000
+
+
+@pytest.mark.django_db
+def test_create_room_msgpack(client):
+    response = post(client, reverse('room-list'), {'description': 'Double room', 'price': 12345})
+
+    assert response.status_code == 201
+    room = Room.objects.get()
+    assert room.price == Decimal('123.45')
+    assert unpack(response)['price'] == 12345
+
+
+@pytest.mark.django_db
+def test_create_booking_msgpack(client, rooms):
+    data = {'begin_date': days(datetime.date(2022, 1, 1)), 'end_date': days(datetime.date(2022, 1, 3)), 'room_id': rooms[0].pk}
+
+    response = post(client, reverse('booking-list'), data)
+    assert response.status_code == 201
+    assert unpack(response) == {'id': Booking.objects.latest('id').pk, **data}
+    assert Booking.objects.filter(begin_date=datetime.date(2022, 1, 1), end_date=datetime.date(2022, 1, 3)).exists()
+
+    response = post(client, reverse('booking-list'), data)
+    assert response.status_code == 400
+    assert unpack(response) == {'non_field_errors': ['OVERLAPPING_DATES']}
+
+    # ISO dates are still accepted
+    response = post(client, reverse('booking-bulk'), [
+        {'begin_date': '2022-02-01', 'end_date': days(datetime.date(2022, 2, 2)), 'room_id': rooms[0].pk},
+    ])
+    assert response.status_code == 201
+    assert unpack(response)[0]['begin_date'] == days(datetime.date(2022, 2, 1))
+
+
+@pytest.mark.django_db
+def test_get_rooms_calendar_msgpack(client, rooms):
+    response = client.get(reverse('room-calendar'), data={
+        'rooms': rooms[0].pk,
+        'from': '2021-12-30',
+        'to': '2022-01-01',
+        'encoding': 'ranges'
+    }, HTTP_ACCEPT=MEDIA_TYPE)
+
+    assert unpack(response) == {
+        'from': days(datetime.date(2021, 12, 30)),
+        'to': days(datetime.date(2022, 1, 1)),
+        'encoding': 'ranges',
+        'rooms': {str(rooms[0].pk): [[days(datetime.date(2021, 12, 30)), days(datetime.date(2021, 12, 31))]]}
+    }
+
+
+@pytest.mark.django_db
+def test_invalid_msgpack(client, rooms):
+    response = client.post(reverse('booking-list'), data=b'\xc1', content_type=MEDIA_TYPE)
+
+    assert response.status_code == 400
@@ -0,0 +1,135 @@
+import datetime
+import random
+
+import pytest
+
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+from api.occupancy import occupancy
+
+
+@pytest.fixture(autouse=True)
+def occupancy_cache(settings):
+    settings.OCCUPANCY_CACHE = 'occupancy'
+    caches['occupancy'].clear()
+    occupancy.reset_stats()
+
+    yield
+
+    caches['occupancy'].clear()
+
+
+@pytest.fixture
+def rooms():
+    return [Room.objects.create(description='Double room', price=100) for _ in range(3)]
+
+
+def day(offset):
+    return timezone.localdate() + datetime.timedelta(days=offset)
+
+
+def cached_bitmap(room):
+    start, _ = occupancy.horizon()
+    return caches['occupancy'].get(occupancy.key(room.pk, start))
+
+
+def assert_matches_database(rooms):
+    start, end = occupancy.horizon()
+    for room in rooms:
+        bitmap = cached_bitmap(room)
+        if bitmap is not None:
+            assert bitmap == occupancy.load(room.pk, start, end)
+
+
+def post_booking(client, room, begin, end):
+    return client.post(reverse('booking-list'), data={
+        'begin_date': day(begin).isoformat(),
+        'end_date': day(end).isoformat(),
+        'room_id': room.pk
+    })
+
+
+@pytest.mark.django_db
+def test_occupancy_overlap_checks(client, rooms):
+    assert post_booking(client, rooms[0], 1, 7).status_code == 201
+    assert post_booking(client, rooms[0], 7, 10).status_code == 400
+    assert post_booking(client, rooms[0], -3, 1).status_code == 400
+    assert post_booking(client, rooms[0], 8, 10).status_code == 201
+    assert post_booking(client, rooms[1], 1, 7).status_code == 201
+
+    stats = occupancy.stats()
+    assert stats['misses'] == 2
+    assert stats['hits'] == 3
+    assert Booking.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_occupancy_outside_of_horizon(client, rooms):
+    start, end = occupancy.horizon()
+    Booking.objects.create(room=rooms[0], begin_date=end, end_date=end + datetime.timedelta(days=10))
+
+    assert post_booking(client, rooms[0], (end - day(0)).days + 5, (end - day(0)).days + 5).status_code == 400
+    assert post_booking(client, rooms[0], (end - day(0)).days - 1, (end - day(0)).days - 1).status_code == 201
+
+    assert occupancy.stats()['hits'] + occupancy.stats()['misses'] == 1
+
+
+@pytest.mark.django_db
+def test_occupancy_matches_database(client, rooms):
+    rng = random.Random(0)
+    extra_rooms = []
+
+    for _ in range(300):
+        room = rng.choice(rooms)
+        begin = rng.randint(-60, 400)
+        end = begin + rng.randint(0, 10)
+        operation = rng.random()
+
+        if operation < 0.5:
+            post_booking(client, room, begin, end)
+        elif operation < 0.6:
+            client.post(reverse('booking-bulk'), data=[
+                {'begin_date': day(begin + i * 20).isoformat(), 'end_date': day(end + i * 20).isoformat(), 'room_id': room.pk}
+                for i in range(3)
+            ], format='json')
+        elif operation < 0.8:
+            booking = Booking.objects.filter(room=room).order_by('?').first()
+            if booking is not None:
+                client.delete(reverse('booking-detail', args=[booking.pk]))
+        elif operation < 0.85:
+            ids = list(Booking.objects.filter(room=room).values_list('pk', flat=True)[:3])
+            client.delete(reverse('booking-bulk'), data={'ids': ids}, format='json')
+        elif operation < 0.9:
+            booking = Booking.objects.filter(room=room).order_by('?').first()
+            if booking is not None:
+                # Changes made outside of the API, e.g. in the admin
+                booking.end_date = booking.begin_date
+                booking.save()
+        elif operation < 0.95:
+            extra = Room.objects.create(description='Double room', price=100)
+            post_booking(client, extra, begin, end)
+            extra_rooms.append(extra)
+        elif extra_rooms:
+            client.delete(reverse('room-detail', args=[extra_rooms.pop().pk]))
+
+        assert_matches_database(rooms + extra_rooms)
+
+    assert occupancy.stats()['hits'] > 0
+
+
+@pytest.mark.django_db
+def test_occupancy_failed_bulk_create(client, rooms):
+    assert post_booking(client, rooms[0], 1, 1).status_code == 201
+    assert cached_bitmap(rooms[0]) is not None
+
+    response = client.post(reverse('booking-bulk'), data=[
+        {'begin_date': day(5).isoformat(), 'end_date': day(5).isoformat(), 'room_id': rooms[0].pk},
+        {'begin_date': day(1).isoformat(), 'end_date': day(1).isoformat(), 'room_id': rooms[0].pk},
+    ], format='json')
+
+    assert response.status_code == 400
+    assert_matches_database(rooms)
+    assert post_booking(client, rooms[0], 5, 5).status_code == 201
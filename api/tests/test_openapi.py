@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from config import schema
+
+
+@pytest.fixture(autouse=True)
+def schemas():
+    schema._schemas.clear()
+    yield
+    schema._schemas.clear()
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path):
+    settings.OPENAPI_SCHEMA_DIR = tmp_path
+    (tmp_path / 'schema.yaml').write_bytes(b'openapi: 3.0.3\n')
+    (tmp_path / 'schema.json').write_bytes(b'{"openapi": "3.0.3"}')
+
+    return tmp_path
+
+
+def test_served_from_file(client, schema_dir):
+    response = client.get('/openapi/')
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/vnd.oai.openapi; charset=utf-8'
+    assert response.content == b'openapi: 3.0.3\n'
+
+    response = client.get('/openapi/', data={'format': 'json'})
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/vnd.oai.openapi+json'
+    assert response.content == b'{"openapi": "3.0.3"}'
+
+
+def test_file_read_once(client, schema_dir):
+    assert client.get('/openapi/').content == b'openapi: 3.0.3\n'
+    (schema_dir / 'schema.yaml').write_bytes(b'openapi: 3.1.0\n')
+
+    assert client.get('/openapi/').content == b'openapi: 3.0.3\n'
+
+
+def test_not_modified(client, schema_dir):
+    etag = client.get('/openapi/')['ETag']
+    json_etag = client.get('/openapi/', HTTP_ACCEPT='application/vnd.oai.openapi+json')['ETag']
+    assert etag != json_etag
+
+    response = client.get('/openapi/', HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert response.content == b''
+
+
+def test_generated_without_file(client, settings, tmp_path):
+    settings.OPENAPI_SCHEMA_DIR = tmp_path
+
+    response = client.get('/openapi/', data={'format': 'json'})
+
+    assert response.status_code == 200
+    operations = json.loads(response.content)['paths']['/room/']
+    # The annotations of api/schema.py are applied
+    assert operations['get']['summary'] == 'Get a list of rooms'
+    assert operations['post']['summary'] == 'Add a new room'
+    assert response.content == schema.generate(schema.JSON)
+
+
+def test_read_only(client, schema_dir):
+    assert client.post('/openapi/').status_code == 405
+
+
+@pytest.mark.parametrize('url', ['/docs/', '/redoc/'])
+def test_docs(client, url):
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert b'/openapi/' in response.content
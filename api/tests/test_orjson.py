@@ -0,0 +1,99 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+
+from api import parsers, renderers
+from api.models import Room
+from api.parsers import OrjsonParser
+from api.renderers import OrjsonRenderer
+from api.serializers import RoomSerializer
+
+@pytest.fixture(params=['orjson', 'fallback'])
+def accelerated(request, monkeypatch):
+    if request.param == 'fallback':
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+
+    return request.param
+
+
+DATA = [
+    None,
+    [],
+    {'non_field_errors': [ErrorDetail('OVERLAPPING_DATES', code='invalid')]},
+    {'next': 'http://testserver/room/?cursor=W10%3D', 'results': [{'id': 1, 'price': '100.00'}]},
+    ['Люкс с видом на море', 'Line\u2028separator \u2029 "quoted" \\ / \x00 \x1f \x7f \t\n', '\U0001F600'],
+    {1: 'int key', None: 'null key'},
+    {True: 'bool key'},
+    (Decimal('1.50'), Decimal('9999999.99'), Decimal('0')),
+    (datetime.date(2021, 1, 1), datetime.time(12, 30, 15, 120000), datetime.timedelta(days=1, seconds=1)),
+    (datetime.datetime(2021, 1, 1, 12, 30, 15, 120000), datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)),
+    (uuid.UUID(int=1), gettext_lazy('Invalid cursor'), b'bytes', {'set'}),
+    (2 ** 70, -2 ** 63, 2 ** 64 - 1, 0.5, 100.0),
+    {'nested': [[[{'deep': [1, 2, 3]}]]]},
+]
+
+
+@pytest.mark.parametrize('data', DATA)
+def test_render_identical(accelerated, data):
+    assert OrjsonRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('media_type, context', [
+    ('application/json; indent=4', None),
+    ('application/json', {'indent': 2}),
+])
+def test_render_indented(accelerated, media_type, context):
+    data = {'results': [{'id': 1, 'description': 'Double room'}]}
+
+    assert OrjsonRenderer().render(data, media_type, context) == JSONRenderer().render(data, media_type, context)
+
+
+@pytest.mark.django_db
+def test_render_rooms_identical(accelerated):
+    for description, price in [
+        ('Double room', 100),
+        ('Single room', Decimal('1.5')),
+        ('Люкс с видом на море', Decimal('9999999.99')),
+        ('Line\u2028separator "quoted"', Decimal('0.01')),
+    ]:
+        Room.objects.create(description=description, price=price)
+
+    data = RoomSerializer(Room.objects.all(), many=True).data
+
+    assert OrjsonRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_error_response_identical(client, accelerated):
+    room = Room.objects.create(description='Double room', price=100)
+    data = {'begin_date': '2021-01-01', 'end_date': '2021-01-07', 'room_id': room.pk}
+
+    client.post(reverse('booking-list'), data=data, format='json')
+    response = client.post(reverse('booking-list'), data=data, format='json')
+
+    assert response.status_code == 400
+    assert response.content == JSONRenderer().render({'non_field_errors': ['OVERLAPPING_DATES']})
+
+
+@pytest.mark.parametrize('content', [
+    b'{"begin_date":"2021-01-01","ids":[1,2,3],"price":1.5,"nested":{"a":null,"b":true}}',
+    '["Люкс", "\\u2028", "\\ud83d\\ude00"]'.encode(),
+])
+def test_parse_identical(accelerated, content):
+    assert OrjsonParser().parse(io.BytesIO(content)) == JSONParser().parse(io.BytesIO(content))
+
+
+@pytest.mark.parametrize('content', [b'{"a": 1', b'[NaN]', b'\xff', b''])
+def test_parse_invalid(accelerated, content):
+    with pytest.raises(ParseError, match='^JSON parse error - '):
+        OrjsonParser().parse(io.BytesIO(content))
@@ -0,0 +1,121 @@
+import datetime
+import json
+
+import pytest
+
+from django.db import router
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from api.models import Booking, Room
+from api.mixins import ReplicaReadMixin
+
+pytestmark = pytest.mark.django_db(databases=['default', 'replica'])
+
+
+@pytest.fixture(autouse=True)
+def replica(settings):
+    """The replica is a separate database, writes only reach it when a test copies them."""
+    settings.REPLICA_DATABASES = ['replica']
+    settings.REPLICA_PIN_SECONDS = 60
+
+
+def replicate(*objects):
+    for obj in objects:
+        obj.save(using='replica')
+
+
+def room_ids(client, **params):
+    response = client.get(reverse('room-list'), data=params)
+    assert response.status_code == 200
+
+    if response.streaming:
+        results = json.loads(b''.join(response.streaming_content))
+    else:
+        results = response.json()['results']
+    return [room['id'] for room in results]
+
+
+def test_lists_read_from_replica(client):
+    primary = Room.objects.create(description='Double room', price=100)
+
+    assert room_ids(client) == []
+    assert room_ids(client, stream='true') == []
+
+    replicate(primary)
+
+    assert room_ids(client) == [primary.pk]
+    assert room_ids(client, stream='true') == [primary.pk]
+
+
+def test_booking_lists_read_from_replica(client):
+    room = Room.objects.create(description='Double room', price=100)
+    booking = Booking.objects.create(room=room, begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 7))
+    replicate(room)
+
+    response = client.get(reverse('booking-list'), data={'room': room.pk})
+    assert response.json()['results'] == []
+
+    replicate(booking)
+
+    response = client.get(reverse('booking-list'), data={'room': room.pk})
+    assert [item['id'] for item in response.json()['results']] == [booking.pk]
+
+
+def test_read_your_writes(client):
+    response = client.post(reverse('room-list'), data={'description': 'Double room', 'price': 100})
+    assert response.status_code == 201
+    assert ReplicaReadMixin.replica_pin_cookie in response.cookies
+    room_id = response.json()['id']
+
+    # The writer reads the primary, everyone else the replica that hasn't caught up yet
+    assert room_ids(client) == [room_id]
+    assert room_ids(APIClient()) == []
+
+
+def test_pin_expires(client, settings):
+    settings.REPLICA_PIN_SECONDS = 0
+
+    client.post(reverse('room-list'), data={'description': 'Double room', 'price': 100})
+
+    assert room_ids(client) == []
+
+
+def test_failed_writes_do_not_pin(client):
+    response = client.post(reverse('room-list'), data={'description': 'Double room'})
+
+    assert response.status_code == 400
+    assert ReplicaReadMixin.replica_pin_cookie not in response.cookies
+
+
+def test_writes_and_overlap_checks_use_primary(client):
+    # The replica lags behind: it knows neither the room nor its booking
+    room = Room.objects.create(description='Double room', price=100)
+    Booking.objects.create(room=room, begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 7))
+
+    response = client.post(reverse('booking-list'), data={
+        'begin_date': '2021-01-05',
+        'end_date': '2021-01-10',
+        'room_id': room.pk
+    })
+    assert response.status_code == 400
+    assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+
+    response = client.post(reverse('booking-list'), data={
+        'begin_date': '2021-01-08',
+        'end_date': '2021-01-10',
+        'room_id': room.pk
+    })
+    assert response.status_code == 201
+    assert Booking.objects.using('replica').count() == 0
+
+
+def test_instances_from_replica_are_saved_to_primary():
+    room = Room(description='Double room', price=100)
+    replicate(room)
+
+    replica_room = Room.objects.using('replica').get()
+    assert router.db_for_write(Room, instance=replica_room) == 'default'
+
+    replica_room.save()
+    assert Room.objects.using('default').filter(pk=replica_room.pk).exists()
@@ -0,0 +1,180 @@
+import datetime
+
+import pytest
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+
+from api.models import Booking, Room
+from api.responses import response_cache
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings):
+    settings.RESPONSE_CACHE = 'responses'
+    caches['responses'].clear()
+    response_cache.clear()
+    response_cache.reset_stats()
+
+    yield caches['responses']
+
+    caches['responses'].clear()
+    response_cache.clear()
+
+
+@pytest.fixture
+def rooms():
+    return [Room.objects.create(description=f'Room #{i}', price=100 + i) for i in range(1, 4)]
+
+
+def assert_cached(client, url, **params):
+    expected = client.get(url, data=params)
+    hits = response_cache.stats()['hits']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, data=params)
+
+    assert response.status_code == 200
+    assert response.content == expected.content
+    assert response['Content-Type'] == expected['Content-Type']
+    assert response['ETag'] == expected['ETag']
+    assert response_cache.stats()['hits'] == hits + 1
+    # Only the version counters are read
+    assert len(queries) == 1
+
+    return response
+
+
+@pytest.mark.django_db
+def test_response_cache_hit(client, rooms):
+    url = reverse('room-list')
+
+    assert_cached(client, url)
+    assert_cached(client, url, ordering='-price', page_size=2)
+    assert_cached(client, reverse('booking-list'), room=rooms[0].pk)
+
+    stats = response_cache.stats()
+    assert stats['misses'] == 3
+    assert stats['entries'] == 3
+
+
+@pytest.mark.django_db
+def test_response_cache_shared(client, rooms):
+    url = reverse('room-list')
+    expected = client.get(url)
+
+    # Another worker has an empty local cache
+    response_cache.clear()
+
+    response = client.get(url)
+    assert response.content == expected.content
+    assert response_cache.stats()['shared_hits'] == 1
+
+
+@pytest.mark.django_db
+def test_response_cache_not_shared_for_browsable_api(client, rooms):
+    url = reverse('room-list')
+
+    client.get(url, data={'format': 'api'})
+    client.get(url, data={'format': 'api'})
+
+    assert response_cache.stats()['entries'] == 0
+
+
+@pytest.mark.django_db
+def test_response_cache_streamed_lists(client, rooms):
+    url = reverse('room-list')
+
+    b''.join(client.get(url, data={'stream': 'true'}).streaming_content)
+
+    assert response_cache.stats()['entries'] == 0
+
+
+@pytest.mark.django_db
+def test_response_cache_eviction(client, rooms, settings):
+    url = reverse('room-list')
+    size = len(client.get(url, data={'page_size': 1, 'ordering': 'price'}).content)
+    settings.RESPONSE_CACHE_MAX_BYTES = 2 * size
+    settings.RESPONSE_CACHE = None
+
+    for ordering in ('-price', 'created_at', '-created_at'):
+        client.get(url, data={'page_size': 1, 'ordering': ordering})
+
+    stats = response_cache.stats()
+    assert stats['evictions'] > 0
+    assert stats['entries'] < 4
+    assert stats['bytes'] <= settings.RESPONSE_CACHE_MAX_BYTES
+
+    # The least recently used lists go first
+    assert_cached(client, url, page_size=1, ordering='-created_at')
+    misses = response_cache.stats()['misses']
+    client.get(url, data={'page_size': 1, 'ordering': 'price'})
+    assert response_cache.stats()['misses'] == misses + 1
+
+
+@pytest.mark.django_db
+def test_response_cache_admin_changes(client, admin_client, rooms):
+    room_url = reverse('room-list')
+    booking_url = reverse('booking-list')
+    booking = Booking.objects.create(room=rooms[0], begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 7))
+
+    client.get(room_url)
+    client.get(booking_url, data={'room': rooms[0].pk})
+
+    response = admin_client.post(reverse('admin:api_room_change', args=[rooms[0].pk]), data={
+        'description': 'Renamed room',
+        'price': '100',
+    })
+    assert response.status_code == 302
+
+    assert client.get(room_url).json()['results'][0]['description'] == 'Renamed room'
+
+    response = admin_client.post(reverse('admin:api_booking_change', args=[booking.pk]), data={
+        'begin_date': '2021-01-02',
+        'end_date': '2021-01-07',
+        'room': rooms[0].pk,
+    })
+    assert response.status_code == 302
+
+    results = client.get(booking_url, data={'room': rooms[0].pk}).json()['results']
+    assert results[0]['begin_date'] == '2021-01-02'
+
+    response = admin_client.post(reverse('admin:api_booking_delete', args=[booking.pk]), data={'post': 'yes'})
+    assert response.status_code == 302
+
+    assert client.get(booking_url, data={'room': rooms[0].pk}).json()['results'] == []
+    assert response_cache.stats()['hits'] == 0
+
+
+@pytest.mark.django_db
+def test_response_cache_bulk_changes(client, rooms):
+    room_url = reverse('room-list')
+    booking_url = reverse('booking-list')
+
+    def room_ids():
+        return [room['id'] for room in client.get(room_url).json()['results']]
+
+    def booking_ids():
+        return [booking['id'] for booking in client.get(booking_url, data={'room': rooms[0].pk}).json()['results']]
+
+    assert room_ids() == [room.pk for room in rooms]
+    assert booking_ids() == []
+
+    response = client.post(reverse('booking-bulk'), data=[
+        {'begin_date': '2021-01-01', 'end_date': '2021-01-01', 'room_id': rooms[0].pk},
+        {'begin_date': '2021-01-02', 'end_date': '2021-01-02', 'room_id': rooms[0].pk},
+    ], format='json')
+    created = [booking['id'] for booking in response.json()]
+    assert booking_ids() == created
+
+    client.delete(reverse('booking-bulk'), data={'ids': created[:1]}, format='json')
+    assert booking_ids() == created[1:]
+
+    response = client.post(reverse('room-bulk'), data=[{'description': 'Single room', 'price': 70}], format='json')
+    new_room = response.json()[0]['id']
+    assert room_ids() == [room.pk for room in rooms] + [new_room]
+
+    client.delete(reverse('room-bulk'), data={'ids': [rooms[0].pk, new_room]}, format='json')
+    assert room_ids() == [room.pk for room in rooms[1:]]
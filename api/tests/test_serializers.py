@@ -0,0 +1,54 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Booking, Room
+from api.serializers import BookingSerializer, RoomSerializer
+
+
+@pytest.fixture
+def rooms():
+    rooms = [
+        Room.objects.create(description=description, price=price)
+        for description, price in [
+            ('Double room', 100),
+            ('Single room', Decimal('1.5')),
+            ('Люкс с видом на море', Decimal('9999999.99')),
+            ('Line\u2028separator "quoted"', Decimal('0.01')),
+        ]
+    ]
+
+    for i, room in enumerate(rooms):
+        room.created_at = datetime.date(1999 + i, 12, 31)
+        room.save()
+
+    return rooms
+
+
+@pytest.mark.django_db
+def test_room_values_representation(rooms):
+    queryset = Room.objects.order_by('id')
+
+    expected = JSONRenderer().render(RoomSerializer(queryset, many=True).data)
+    actual = JSONRenderer().render(RoomSerializer.represent_values(RoomSerializer.values_queryset(queryset)))
+
+    assert actual == expected
+
+
+@pytest.mark.django_db
+def test_booking_values_representation(rooms):
+    for i, room in enumerate(rooms):
+        Booking.objects.create(
+            room=room,
+            begin_date=datetime.date(2021, 1, 1) + datetime.timedelta(days=i),
+            end_date=datetime.date(2021, 12, 31)
+        )
+    queryset = Booking.objects.order_by('id')
+
+    expected = JSONRenderer().render(BookingSerializer(queryset, many=True).data)
+    actual = JSONRenderer().render(BookingSerializer.represent_values(BookingSerializer.values_queryset(queryset)))
+
+    assert actual == expected
@@ -0,0 +1,84 @@
+import datetime
+import os
+import subprocess
+import sys
+
+import pytest
+
+from django.conf import settings
+from django.test import override_settings
+from rest_framework.reverse import reverse
+
+import config.settings_api as settings_api
+from api.models import Room
+
+
+@pytest.fixture
+def api_profile():
+    with override_settings(
+        MIDDLEWARE=settings_api.MIDDLEWARE,
+        ROOT_URLCONF=settings_api.ROOT_URLCONF,
+        REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+    ):
+        yield
+
+
+def test_app_registry():
+    code = '\n'.join((
+        'import sys',
+        'import django',
+        'from django.apps import apps',
+        'from django.core.management import call_command',
+        'from django.urls import Resolver404, resolve',
+        'django.setup()',
+        "call_command('check')",
+        "assert not apps.is_installed('django.contrib.auth')",
+        "resolve('/booking/')",
+        "assert not [name for name in sys.modules if name.startswith('drf_spectacular')]",
+        "for url in ('/admin/', '/docs/', '/redoc/', '/openapi/'):",
+        '    try:',
+        '        resolve(url)',
+        '    except Resolver404:',
+        '        pass',
+        '    else:',
+        '        raise AssertionError(url)',
+    ))
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings_api'},
+        capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.django_db
+def test_booking_create(client, api_profile):
+    room = Room.objects.create(description='Single room', price=100)
+    data = {'room_id': room.pk, 'begin_date': '2021-01-01', 'end_date': '2021-01-02'}
+
+    response = client.post(reverse('booking-list'), data=data)
+    assert response.status_code == 201
+    assert not response.cookies
+
+    response = client.post(reverse('booking-list'), data=data)
+    assert response.status_code == 400
+    assert response.json() == {'non_field_errors': ['OVERLAPPING_DATES']}
+
+
+@pytest.mark.django_db
+def test_list(client, api_profile):
+    room = Room.objects.create(description='Single room', price=100)
+    room.booking_set.create(begin_date=datetime.date(2021, 1, 1), end_date=datetime.date(2021, 1, 2))
+
+    response = client.get(reverse('booking-list'), data={'room': room.pk})
+
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 1
+    assert 'Cookie' not in response['Vary']
+    assert 'X-Frame-Options' not in response
+
+
+def test_docs_not_served(client, api_profile):
+    for url in ('/admin/', '/docs/', '/redoc/', '/openapi/'):
+        assert client.get(url).status_code == 404
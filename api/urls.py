@@ -1,9 +1,11 @@
 from rest_framework.routers import DefaultRouter
 
-from .views import BookingView, RoomView
+from .views import BookingView, ChangeView, HoldView, RoomView
 
 router = DefaultRouter()
 router.register('booking', BookingView)
 router.register('room', RoomView)
+router.register('hold', HoldView, basename='hold')
+router.register('changes', ChangeView)
 
 urlpatterns = router.urls
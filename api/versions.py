@@ -0,0 +1,96 @@
+"""
+Version counters of the data behind the room and booking lists.
+
+A list's ETag is derived from the counters of the data it shows, so a
+conditional request is answered by reading a couple of counter rows
+instead of the list itself. Counters of a room's bookings are bumped in
+the transaction that changes them: a reader that sees the new counter
+sees the new data too.
+
+The counters of whole lists, ROOMS and BOOKINGS, are bumped by writers of
+every room. Bumping them in the writer's transaction would hold their row
+locks until commit and make writers of different rooms wait for each
+other, so they are bumped right after the commit in a short transaction
+of their own. A reader may see the new data with the old counter for
+that long, and gets the new data under the old ETag then; a revalidation
+in between may still be answered with 304 Not Modified.
+
+Bumped counters jump to the current time in nanoseconds when it's ahead,
+so they don't start over and repeat ETags of another database.
+"""
+import functools
+import logging
+import time
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .models import ListVersion
+
+logger = logging.getLogger(__name__)
+
+ROOMS = 'room'
+
+BOOKINGS = 'booking'
+
+# Bumped after the transaction commits, see above
+SHARED = frozenset((ROOMS, BOOKINGS))
+
+
+def bookings_of(room_id):
+    return f'{BOOKINGS}:{room_id}'
+
+
+def bump(keys, using=DEFAULT_DB_ALIAS):
+    keys = set(keys)
+    shared = keys & SHARED
+    if shared:
+        after_commit(functools.partial(bump_shared, shared, using), using=using)
+
+    bump_now(keys - shared, using=using)
+
+
+def after_commit(func, using=DEFAULT_DB_ALIAS):
+    # Outside of a transaction `func` is called at once
+    transaction.on_commit(func, using=using)
+
+
+def bump_shared(keys, using=DEFAULT_DB_ALIAS):
+    try:
+        bump_now(keys, using=using)
+    except Exception:
+        # The data is committed already, so the request goes on
+        logger.exception('Bumping list versions %s failed', sorted(keys))
+
+
+def bump_now(keys, using=DEFAULT_DB_ALIAS):
+    keys = sorted(keys)
+    if not keys:
+        return
+
+    queryset = ListVersion.objects.using(using).filter(key__in=keys)
+
+    with transaction.atomic(using=using, savepoint=False):
+        # Counter rows are locked in the order of their keys to rule out
+        # deadlocks between transactions bumping several of them
+        existing = set(queryset.select_for_update().order_by('key').values_list('key', flat=True))
+        if len(existing) < len(keys):
+            ListVersion.objects.using(using).bulk_create(
+                (ListVersion(key=key) for key in keys if key not in existing),
+                ignore_conflicts=True
+            )
+
+        queryset.update(version=Greatest(F('version') + 1, Value(time.time_ns())))
+
+
+def get(keys, using=None):
+    """
+    Return the counters of the keys in their order, 0 for the ones never bumped.
+
+    Without `using` they are read from the database the router picks, the
+    one the list itself is read from.
+    """
+    versions = dict(ListVersion.objects.using(using).filter(key__in=keys).values_list('key', 'version'))
+
+    return tuple(versions.get(key, 0) for key in keys)
@@ -1,66 +1,36 @@
-from django.db.models.query_utils import Q
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django_filters import rest_framework as django_filters
-from drf_spectacular import types
-from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema, extend_schema_view
-from rest_framework import filters, mixins, serializers, viewsets
-
-from .models import Booking, Room
-from .serializers import BookingSerializer, RoomSerializer
-
-
-@extend_schema_view(
-    list=extend_schema(
-        summary='Get a list of rooms',
-        tags=['room'],
-        auth=[{}],
-        examples=[
-            OpenApiExample(
-                name='A valid output example',
-                value=[
-                    {
-                        'id': 1,
-                        'description': 'Double room',
-                        'price': '100',
-                        'created_at': '2021-01-01'
-                    }
-                ],
-                response_only=True,
-            )
-        ]
-    ),
-    create=extend_schema(
-        summary='Add a new room',
-        tags=['room'],
-        auth=[{}],
-        examples=[
-            OpenApiExample(
-                name='A valid input example',
-                value={
-                    'description': 'Double room',
-                    'price': '100'
-                },
-                request_only=True
-            ),
-            OpenApiExample(
-                name='A valid output example',
-                value={
-                    'id': 1,
-                    'description': 'Double room',
-                    'price': '100',
-                    'created_at': '2021-01-01'
-                },
-                response_only=True,
-            )
-        ]
-    ),
-    destroy=extend_schema(
-        summary='Delete a room and all related bookings',
-        tags=['room'],
-        auth=[{}]
-    )
+from rest_framework import filters, mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from . import changes, counters, versions
+from .bulk import create_bookings, create_rooms, delete_bookings, delete_rooms, prefetch_rooms
+from .calendars import calendar
+from .group_commit import GroupCommitFailed, group_commit
+from .holds import HoldConflict, holds
+from .locks import room_lock
+from .mixins import AsyncViewSetMixin, ConditionalListModelMixin, ReplicaReadMixin, StreamingListModelMixin
+from .occupancy import occupancy
+from .models import ArchivedBooking, Booking, Change, Room
+from .pagination import KeysetPagination
+from .serializers import (
+    BookingSerializer, BulkDeleteSerializer, ChangeFeedSerializer, ChangeSerializer, HoldSerializer,
+    RoomAvailabilitySerializer, RoomCalendarSerializer, RoomSerializer, RoomSummarySerializer
 )
-class RoomView(mixins.CreateModelMixin,
-               mixins.ListModelMixin,
+
+OVERLAPPING_DATES_CONSTRAINT = 'api_booking_no_overlap'
+
+
+class RoomView(AsyncViewSetMixin,
+               mixins.CreateModelMixin,
+               ReplicaReadMixin,
+               ConditionalListModelMixin,
+               StreamingListModelMixin,
                mixins.DestroyModelMixin,
                viewsets.GenericViewSet):
     queryset = Room.objects.all()
@@ -69,70 +39,98 @@ class RoomView(mixins.CreateModelMixin,
 
     filter_backends = (filters.OrderingFilter,)
 
-    ordering_fields = ('created_at', 'price',)
+    ordering_fields = ('created_at', 'price', 'upcoming_bookings', 'next_begin_date', 'last_end_date',)
 
+    pagination_class = KeysetPagination
 
-@extend_schema_view(
-    list=extend_schema(
-        summary='Get a booking list of the specified room',
-        tags=['booking'],
-        auth=[{}],
-        parameters=[
-            OpenApiParameter(
-                name='room',
-                description='A unique integer value identifying the room.',
-                type=types.OpenApiTypes.INT
-            )
-        ],
-        examples=[
-            OpenApiExample(
-                name='A valid output example',
-                value=[
-                    {
-                        'id': 1,
-                        'begin_date': '2021-01-01',
-                        'end_date': '2021-01-07',
-                        'room_id': 1
-                    }
-                ],
-                response_only=True,
-            )
-        ]
-    ),
-    create=extend_schema(
-        summary='Add a new booking',
-        tags=['booking'],
-        auth=[{}],
-        examples=[
-            OpenApiExample(
-                name='A valid input example',
-                value={
-                    'begin_date': '2021-01-01',
-                    'end_date': '2021-01-07',
-                    'room_id': 1
-                },
-                request_only=True
-            ),
-            OpenApiExample(
-                name='A valid output example',
-                value={
-                    'id': 1,
-                    'begin_date': '2021-01-01',
-                    'end_date': '2021-01-07',
-                    'room_id': 1
-                },
-                response_only=True,
-            )
-        ]
-    ),
-    destroy=extend_schema(
-        summary='Delete a booking',
-        tags=['booking'],
-        auth=[{}]
-    )
-)
-class BookingView(mixins.CreateModelMixin,
-                  mixins.ListModelMixin,
+    summary_query_param = 'summary'
+
+    def wants_summary(self):
+        return (
+            self.action in ('list', 'available') and
+            self.request.query_params.get(self.summary_query_param, '').lower() == 'true'
+        )
+
+    def get_serializer_class(self):
+        if self.wants_summary():
+            return RoomSummarySerializer
+
+        return super().get_serializer_class()
+
+    def perform_create(self, serializer):
+        # The room and its entry in the change log are committed together
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_destroy(self, instance):
+        # Bookings go with a single statement instead of one by one
+        delete_rooms((instance.pk,))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.action == 'available':
+            serializer = RoomAvailabilitySerializer(data=self.request.query_params)
+            serializer.is_valid(raise_exception=True)
+
+            params = serializer.validated_data
+            queryset = queryset.available(params['begin_date'], params['end_date'])
+            if 'price_max' in params:
+                queryset = queryset.filter(price__lte=params['price_max'])
+
+        return queryset
+
+    def get_list_version_keys(self):
+        if self.action == 'calendar':
+            return (versions.ROOMS, *map(versions.bookings_of, sorted(self.calendar_params['rooms'])))
+
+        ordering = self.request.query_params.get(filters.OrderingFilter.ordering_param, '')
+        if self.action == 'available' or self.wants_summary() or any(name in ordering for name in counters.FIELDS):
+            # Availability and booking summaries depend on the bookings of every room
+            return versions.ROOMS, versions.BOOKINGS
+
+        return versions.ROOMS,
+
+    @action(detail=False)
+    def available(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+    @action(detail=False)
+    def calendar(self, request):
+        serializer = RoomCalendarSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        self.calendar_params = params = serializer.validated_data
+
+        with self.reading_replica(request):
+            return self.conditional_list(request, lambda: Response(calendar(
+                params['rooms'], params['from'], params['to'], params['encoding'],
+                compact=getattr(request.accepted_renderer, 'compact_types', False)
+            )))
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        rooms = create_rooms(serializer.validated_data)
+
+        return Response(self.get_serializer(rooms, many=True).data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        ids = delete_rooms(serializer.validated_data['ids'])
+
+        return Response({'ids': ids})
+
+
+class BookingView(AsyncViewSetMixin,
+                  mixins.CreateModelMixin,
+                  ReplicaReadMixin,
+                  ConditionalListModelMixin,
+                  StreamingListModelMixin,
                   mixins.DestroyModelMixin,
                   viewsets.GenericViewSet):
     queryset = Booking.objects.all()
@@ -145,18 +143,142 @@ class BookingView(mixins.CreateModelMixin,
 
     ordering_fields = ('begin_date',)
 
+    pagination_class = KeysetPagination
+
+    history_query_param = 'history'
+
+    def get_queryset(self):
+        if self.action == 'list' and self.request.query_params.get(self.history_query_param, '').lower() == 'true':
+            return ArchivedBooking.objects.all()
+
+        return super().get_queryset()
+
+    def get_list_version_keys(self):
+        room = self.request.query_params.get('room', '')
+        if room.isdigit():
+            return versions.bookings_of(int(room)),
+
+        return versions.BOOKINGS,
+
     def perform_create(self, serializer):
+        if settings.BOOKING_GROUP_COMMIT:
+            try:
+                booking = group_commit.create(dict(serializer.validated_data))
+            except GroupCommitFailed:
+                # The batch failed as a whole, so the booking is retried alone
+                pass
+            else:
+                if booking is None:
+                    self.overlapping_dates()
+                serializer.instance = booking
+                return
+
         begin_date = serializer.validated_data['begin_date']
         end_date = serializer.validated_data['end_date']
         room = serializer.validated_data['room']
 
-        ok = Booking.objects.filter(
-            ~Q(Q(begin_date__gt=end_date) | Q(end_date__lt=begin_date)) &
-            Q(room=room)
-        ).count() == 0
-        if ok:
-            return super().perform_create(serializer)
-        
+        try:
+            with room_lock(room.pk):
+                free = occupancy.is_free(room.pk, begin_date, end_date)
+                if free is None:
+                    free = not Booking.objects.overlapping(room, begin_date, end_date).exists()
+                if free and ArchivedBooking.may_overlap(begin_date):
+                    free = not ArchivedBooking.objects.overlapping(room, begin_date, end_date).exists()
+                if not free:
+                    self.overlapping_dates()
+
+                return super().perform_create(serializer)
+        except IntegrityError as e:
+            # On PostgreSQL the exclusion constraint backs up the check above
+            if OVERLAPPING_DATES_CONSTRAINT in str(e):
+                self.overlapping_dates()
+            raise
+
+    def perform_destroy(self, instance):
+        with room_lock(instance.room_id):
+            super().perform_destroy(instance)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        context = self.get_serializer_context()
+        if isinstance(request.data, list):
+            context['rooms'] = prefetch_rooms(request.data)
+
+        serializer = self.get_serializer(data=request.data, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+
+        items = serializer.validated_data
+        bookings, overlapping = create_bookings(items)
+        if overlapping:
+            raise serializers.ValidationError([
+                {'non_field_errors': ['OVERLAPPING_DATES']} if i in overlapping else {}
+                for i in range(len(items))
+            ])
+
+        return Response(self.get_serializer(bookings, many=True).data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        ids = delete_bookings(serializer.validated_data['ids'])
+
+        return Response({'ids': ids})
+
+    def overlapping_dates(self):
         raise serializers.ValidationError({
             'non_field_errors': ['OVERLAPPING_DATES']
         })
+
+
+class HoldView(viewsets.GenericViewSet):
+    serializer_class = HoldSerializer
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        params = serializer.validated_data
+        try:
+            hold = holds.hold(params['room_id'], params['begin_date'], params['end_date'])
+        except HoldConflict:
+            raise serializers.ValidationError({
+                'non_field_errors': ['OVERLAPPING_DATES']
+            })
+
+        return Response(self.get_serializer(hold).data, status=status.HTTP_202_ACCEPTED)
+
+    def retrieve(self, request, pk):
+        hold = holds.get(pk)
+        if hold is None:
+            raise Http404
+
+        return Response(self.get_serializer(hold).data)
+
+
+class ChangeView(AsyncViewSetMixin, ReplicaReadMixin, viewsets.GenericViewSet):
+    """The change log of rooms and bookings, see api/changes.py."""
+    queryset = Change.objects.all()
+
+    serializer_class = ChangeSerializer
+
+    def list(self, request):
+        serializer = ChangeFeedSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        params = serializer.validated_data
+        with self.reading_replica(request):
+            rows = changes.read(
+                ChangeSerializer.values_queryset(self.get_queryset()), params['since'], params['limit'], params['wait']
+            )
+
+        more = len(rows) > params['limit']
+        rows = rows[:params['limit']]
+        compact = getattr(request.accepted_renderer, 'compact_types', False)
+
+        return Response(OrderedDict([
+            ('last', rows[-1]['seq'] if rows else params['since']),
+            ('more', more),
+            ('results', ChangeSerializer.represent_values(rows, compact=compact)),
+        ]))
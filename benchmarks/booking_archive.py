@@ -0,0 +1,87 @@
+"""Latency of POST /booking/ with a long booking history, before and after archiving it.
+
+Seeding ten million rows takes a while; pass a smaller --bookings for a
+quick run.
+
+    python -m benchmarks.booking_archive [--rooms 1000] [--bookings 10000000] [--requests 1000]
+"""
+import argparse
+import datetime
+import random
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--bookings', type=int, default=10_000_000, help='historical bookings seeded in total')
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.db import connection
+    from django.utils import timezone
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.archive import archive_bookings
+    from api.models import Booking, Room
+
+    with test_database():
+        client = APIClient()
+        url = reverse('booking-list')
+        today = timezone.localdate()
+
+        Room.objects.bulk_create(
+            Room(description='Benchmark room', price=100) for _ in range(args.rooms)
+        )
+        rooms = list(Room.objects.values_list('pk', flat=True))
+        per_room = max(args.bookings // len(rooms), 1)
+
+        # Back-to-back stays of 1-3 days ending yesterday
+        def history():
+            for room_id in rooms:
+                end = today - datetime.timedelta(days=1)
+                for i in range(per_room):
+                    begin = end - datetime.timedelta(days=i % 3)
+                    yield Booking(room_id=room_id, begin_date=begin, end_date=end)
+                    end = begin - datetime.timedelta(days=1)
+
+        Booking.objects.bulk_create(history(), batch_size=10_000)
+        seeded = Booking.objects.count()
+
+        def run():
+            rng = random.Random(0)
+            created = []
+
+            def create():
+                begin = today + datetime.timedelta(days=rng.randrange(3650))
+                response = client.post(url, data={
+                    'begin_date': begin.isoformat(),
+                    'end_date': begin.isoformat(),
+                    'room_id': rng.choice(rooms)
+                })
+                if response.status_code == 201:
+                    created.append(response.json()['id'])
+
+            timings = timed(create, repeat=args.requests)
+            Booking.objects.filter(pk__in=created).delete()
+
+            return timings
+
+        rows = [('no', seeded, f'{median_ms(run()):.2f}', '-')]
+
+        archive_timings = timed(lambda: archive_bookings(today))
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM ANALYZE api_booking')
+
+        rows.append(('yes', Booking.objects.count(), f'{median_ms(run()):.2f}', f'{archive_timings[0]:.1f}'))
+
+        print_table(('archived', 'hot bookings', 'create, ms', 'archiving, s'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Throughput of POST /booking/bulk/ against one POST /booking/ per booking.
+
+    python -m benchmarks.booking_bulk [--batch 1000,5000] [--rooms 10]
+"""
+import argparse
+import datetime
+import time
+
+from .utils import print_table, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch', default='1000,5000')
+    parser.add_argument('--rooms', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    with test_database():
+        client = APIClient()
+        rooms = [Room.objects.create(description='Benchmark room', price=100) for _ in range(args.rooms)]
+        rows = []
+
+        for size in map(int, args.batch.split(',')):
+            items = [
+                {
+                    'begin_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i // args.rooms)).isoformat(),
+                    'end_date': (datetime.date(2021, 1, 1) + datetime.timedelta(days=i // args.rooms)).isoformat(),
+                    'room_id': rooms[i % args.rooms].id
+                } for i in range(size)
+            ]
+
+            Booking.objects.all().delete()
+            start = time.perf_counter()
+            for item in items:
+                assert client.post(reverse('booking-list'), data=item, format='json').status_code == 201
+            sequential = time.perf_counter() - start
+
+            Booking.objects.all().delete()
+            start = time.perf_counter()
+            assert client.post(reverse('booking-bulk'), data=items, format='json').status_code == 201
+            bulk = time.perf_counter() - start
+
+            rows.append((size, f'{size / sequential:,.0f}', f'{size / bulk:,.0f}', f'{sequential / bulk:.1f}x'))
+
+        print_table(('batch', 'sequential, bookings/s', 'bulk, bookings/s', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Throughput of concurrent POST /booking/ as writers are added.
+
+Writers either compete for a single room or each book a room of their own.
+Every run also counts double bookings, which must always be zero.
+
+With --latency-ms every query of the writers is delayed by that much,
+standing in for the round trips to a database on another host. Locks
+held by a transaction are held across them, so writers sharing a lock
+stay at the throughput of one writer, while writers of different rooms
+add up until the CPU runs out.
+
+    python -m benchmarks.booking_concurrency [--writers 1,2,4,8,16] [--requests 100] [--latency-ms 0]
+"""
+import argparse
+import contextlib
+import datetime
+import threading
+import time
+
+from .utils import print_table, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', default='1,2,4,8,16')
+    parser.add_argument('--requests', type=int, default=100, help='requests per writer')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every query')
+    args = parser.parse_args()
+
+    setup()
+
+    from django.db import connection
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    def delayed(execute, sql, params, many, context):
+        time.sleep(args.latency_ms / 1000)
+        return execute(sql, params, many, context)
+
+    def run(writers, shared_room):
+        Booking.objects.all().delete()
+        rooms = [Room.objects.create(description='Benchmark room', price=100) for _ in range(writers)]
+        barrier = threading.Barrier(writers + 1)
+
+        def write(i):
+            client = APIClient()
+            room = rooms[0] if shared_room else rooms[i]
+            barrier.wait()
+            try:
+                with connection.execute_wrapper(delayed) if args.latency_ms else contextlib.nullcontext():
+                    for j in range(args.requests):
+                        # Writers of a shared room race for the very same dates
+                        day = datetime.date(2021, 1, 1) + datetime.timedelta(days=j)
+                        client.post(reverse('booking-list'), data={
+                            'begin_date': day.isoformat(),
+                            'end_date': day.isoformat(),
+                            'room_id': room.id
+                        })
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        double_bookings = sum(
+            Booking.objects.exclude(pk=booking.pk).filter(
+                room_id=booking.room_id,
+                begin_date__lte=booking.end_date,
+                end_date__gte=booking.begin_date
+            ).count()
+            for booking in Booking.objects.all()
+        )
+
+        return writers * args.requests / elapsed, Booking.objects.count(), double_bookings
+
+    with test_database():
+        rows = []
+        for writers in map(int, args.writers.split(',')):
+            for shared_room in (True, False):
+                throughput, created, double_bookings = run(writers, shared_room)
+                rows.append((
+                    writers,
+                    'shared' if shared_room else 'per writer',
+                    f'{throughput:.0f}',
+                    created,
+                    double_bookings
+                ))
+
+        print_table(('writers', 'room', 'requests/s', 'bookings', 'double bookings'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Latency of POST /booking/ as the booking history of a room grows.
+
+    python -m benchmarks.booking_create [--max-bookings 1000000] [--requests 50]
+"""
+import argparse
+import datetime
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-bookings', type=int, default=1_000_000)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    with test_database():
+        client = APIClient()
+        room = Room.objects.create(description='Benchmark room', price=100)
+        url = reverse('booking-list')
+
+        history_start = datetime.date(2000, 1, 1)
+        seeded = 0
+        rows = []
+
+        size = 10
+        while size <= args.max_bookings:
+            # Past one-day stays, back to back
+            Booking.objects.bulk_create((
+                Booking(room=room, begin_date=day, end_date=day)
+                for day in (history_start + datetime.timedelta(days=i) for i in range(seeded, size))
+            ), batch_size=10_000)
+            seeded = size
+
+            # New stays go right after the history, so every request probes its tail
+            next_day = history_start + datetime.timedelta(days=seeded)
+
+            def create():
+                nonlocal next_day
+                response = client.post(url, data={
+                    'begin_date': next_day.isoformat(),
+                    'end_date': next_day.isoformat(),
+                    'room_id': room.id
+                })
+                assert response.status_code == 201, response.content
+                next_day += datetime.timedelta(days=1)
+
+            timings = timed(create, repeat=args.requests)
+            Booking.objects.filter(room=room, begin_date__gte=history_start + datetime.timedelta(days=seeded)).delete()
+
+            overlapping = timed(lambda: client.post(url, data={
+                'begin_date': history_start.isoformat(),
+                'end_date': history_start.isoformat(),
+                'room_id': room.id
+            }), repeat=args.requests)
+
+            rows.append((size, f'{median_ms(timings):.2f}', f'{median_ms(overlapping):.2f}'))
+            size *= 10
+
+        print_table(('bookings per room', 'create, ms', 'rejected create, ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
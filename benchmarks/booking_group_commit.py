@@ -0,0 +1,111 @@
+"""Throughput against latency of POST /booking/ with and without group commit.
+
+Every writer books one-day stays one after another, each in a room of its
+own so none of them overlaps, and every writer count runs once with
+group commit off and once per window. With group commit the bookings of
+requests arriving within a window are checked and inserted in one
+transaction, which raises throughput once there are enough writers to
+fill a batch and adds up to a window to the latency of every request.
+
+    python -m benchmarks.booking_group_commit [--writers 1 4 16] [--windows 0.001 0.005] [--requests 100]
+"""
+import argparse
+import datetime
+import statistics
+import threading
+import time
+
+from .utils import print_table, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--windows', type=float, nargs='+', default=[0.001, 0.005], help='seconds')
+    parser.add_argument('--requests', type=int, default=100, help='requests per writer')
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api import group_commit
+    from api.bulk import create_each_booking
+    from api.models import Booking, Room
+
+    batches = []
+
+    def record(items, using):
+        batches.append(len(items))
+        return create_each_booking(items, using=using)
+
+    group_commit.create_each_booking = record
+
+    def run(writers):
+        rooms = [Room.objects.create(description=f'Benchmark room #{i}', price=100) for i in range(writers)]
+        barrier = threading.Barrier(writers + 1)
+        latencies = []
+        failed = []
+
+        def writer_loop(room):
+            client = APIClient()
+            barrier.wait()
+            try:
+                for i in range(args.requests):
+                    day = (datetime.date(2030, 1, 1) + datetime.timedelta(days=i)).isoformat()
+                    start = time.perf_counter()
+                    response = client.post(reverse('booking-list'), data={
+                        'begin_date': day,
+                        'end_date': day,
+                        'room_id': room.pk
+                    })
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 201:
+                        failed.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer_loop, args=(room,)) for room in rooms]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        assert not failed, failed
+        latencies.sort()
+        return (
+            len(latencies) / elapsed,
+            statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000,
+        )
+
+    with test_database():
+        rows = []
+        for writers in args.writers:
+            for window in (None, *args.windows):
+                Booking.objects.all().delete()
+                settings.BOOKING_GROUP_COMMIT = window is not None
+                settings.BOOKING_GROUP_COMMIT_WINDOW = window or 0
+                batches.clear()
+
+                throughput, median, p99 = run(writers)
+                rows.append((
+                    writers,
+                    'off' if window is None else f'{window * 1000:g} ms',
+                    f'{throughput:.0f}',
+                    f'{median:.2f}',
+                    f'{p99:.2f}',
+                    f'{statistics.mean(batches):.1f}' if batches else '-',
+                ))
+
+        print_table(('writers', 'group commit', 'requests/s', 'p50, ms', 'p99, ms', 'batch size'), rows)
+
+
+if __name__ == '__main__':
+    main()
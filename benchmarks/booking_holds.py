@@ -0,0 +1,119 @@
+"""POST /booking/ against POST /hold/ when many clients race for a few popular rooms.
+
+Every client asks for random week-long stays in one of the rooms within a
+short season, so most requests conflict. Direct bookings check overlaps
+and insert in the request; holds are checked against each other in
+memory and the background confirmer of api.holds writes the bookings in
+batches. Settling is the time from the start until every hold has been
+confirmed or rejected.
+
+    python -m benchmarks.booking_holds [--clients 16] [--requests 200] [--rooms 4] [--days 120]
+"""
+import argparse
+import datetime
+import random
+import statistics
+import threading
+import time
+
+from .utils import print_table, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='requests per client')
+    parser.add_argument('--rooms', type=int, default=4)
+    parser.add_argument('--days', type=int, default=120, help='length of the season')
+    args = parser.parse_args()
+
+    setup()
+
+    from django.db import connection
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.holds import PENDING, holds
+    from api.models import Booking, Room
+
+    season = datetime.date(2030, 6, 1)
+
+    def run(url, rooms):
+        barrier = threading.Barrier(args.clients + 1)
+        latencies = []
+        accepted = []
+
+        def client_loop(seed):
+            client = APIClient()
+            rng = random.Random(seed)
+            barrier.wait()
+            try:
+                for _ in range(args.requests):
+                    begin_date = season + datetime.timedelta(days=rng.randrange(args.days - 7))
+                    start = time.perf_counter()
+                    response = client.post(url, data={
+                        'begin_date': begin_date.isoformat(),
+                        'end_date': (begin_date + datetime.timedelta(days=6)).isoformat(),
+                        'room_id': rng.choice(rooms).pk
+                    })
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code in (201, 202):
+                        accepted.append(response.json()['id'])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(args.clients)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        # Holds still being confirmed
+        while any(holds.get(hold_id).status == PENDING for hold_id in accepted if holds.get(hold_id)):
+            time.sleep(0.01)
+        settled = time.perf_counter() - start
+
+        latencies.sort()
+        return (
+            len(latencies) / elapsed,
+            statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000,
+            settled,
+        )
+
+    with test_database():
+        rows = []
+        for name, url in (('POST /booking/', reverse('booking-list')), ('POST /hold/', reverse('hold-list'))):
+            Booking.objects.all().delete()
+            rooms = [Room.objects.create(description=f'Popular room #{i}', price=100) for i in range(args.rooms)]
+
+            throughput, median, p99, settled = run(url, rooms)
+
+            double_bookings = sum(
+                Booking.objects.exclude(pk=booking.pk).filter(
+                    room_id=booking.room_id,
+                    begin_date__lte=booking.end_date,
+                    end_date__gte=booking.begin_date
+                ).count()
+                for booking in Booking.objects.all()
+            )
+            rows.append((
+                name,
+                f'{throughput:.0f}',
+                f'{median:.2f}',
+                f'{p99:.2f}',
+                f'{settled:.2f}',
+                Booking.objects.count(),
+                double_bookings,
+            ))
+
+        print_table(
+            ('request', 'requests/s', 'p50, ms', 'p99, ms', 'settled, s', 'bookings', 'double bookings'), rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Syncing a consumer with GET /changes/ against fetching the whole lists again.
+
+The database holds --rooms rooms and --changes bookings, every booking
+logged as created, the way a consumer that has seen none of them finds
+it. A consumer some number of changes behind reads GET /changes/ in
+batches of --limit from its seq until `more` is false; the alternative is
+fetching GET /room/ and GET /booking/ whole, streamed, and diffing them
+against its copy, which costs the same however far behind it is. The
+diffing itself is left out.
+
+    python -m benchmarks.change_feed [--changes 1000000] [--rooms 1000] [--limit 10000] [--behind 1000 100000]
+"""
+import argparse
+import datetime
+import json
+import time
+
+from .utils import print_table, setup, test_database
+
+CHUNK = 50_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--changes', type=int, default=1_000_000)
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=10_000, help='changes per request')
+    parser.add_argument('--behind', type=int, nargs='+', default=[1000, 100_000], help='besides --changes')
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api import changes
+    from api.models import Booking, Change, ListVersion, Room
+
+    client = APIClient()
+
+    def get(url, **params):
+        response = client.get(url, data=params, HTTP_ACCEPT='application/json')
+        assert response.status_code == 200, response.status_code
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def catch_up(since):
+        requests = size = 0
+        start = time.perf_counter()
+        while True:
+            content = get(reverse('change-list'), since=since, limit=args.limit)
+            requests += 1
+            size += len(content)
+            page = json.loads(content)
+            since = page['last']
+            if not page['more']:
+                break
+
+        return time.perf_counter() - start, requests, size
+
+    def refetch():
+        start = time.perf_counter()
+        size = len(get(reverse('room-list'), stream='true')) + len(get(reverse('booking-list'), stream='true'))
+
+        return time.perf_counter() - start, 2, size
+
+    with test_database():
+        print(f'Filling the database with {args.changes} bookings...')
+        rooms = Room.objects.bulk_create(
+            Room(id=i, description=f'Benchmark room #{i}', price=100) for i in range(1, args.rooms + 1)
+        )
+        start = datetime.date(2000, 1, 1)
+        for offset in range(0, args.changes, CHUNK):
+            ids = range(offset + 1, min(offset + CHUNK, args.changes) + 1)
+            # Every room gets one-day stays on consecutive days
+            bookings = [
+                Booking(
+                    id=pk, room_id=rooms[pk % args.rooms].pk,
+                    begin_date=start + datetime.timedelta(days=pk // args.rooms),
+                    end_date=start + datetime.timedelta(days=pk // args.rooms)
+                )
+                for pk in ids
+            ]
+            Booking.objects.bulk_create(bookings, batch_size=changes.RECORD_BATCH_SIZE)
+            Change.objects.bulk_create((
+                Change(seq=booking.pk, model=changes.BOOKING, action=changes.CREATED, object_id=booking.pk, data={
+                    'id': booking.pk,
+                    'begin_date': booking.begin_date.isoformat(),
+                    'end_date': booking.end_date.isoformat(),
+                    'room_id': booking.room_id,
+                }) for booking in bookings
+            ), batch_size=changes.RECORD_BATCH_SIZE)
+        ListVersion.objects.create(key=changes.SEQUENCE_KEY, version=args.changes)
+
+        rows = []
+        for behind in (*args.behind, args.changes):
+            elapsed, requests, size = catch_up(args.changes - behind)
+            rows.append((f'GET /changes/, {behind} behind', requests, f'{size / 2 ** 20:.1f}', f'{elapsed:.2f}'))
+        elapsed, requests, size = refetch()
+        rows.append(('GET /room/ + GET /booking/', requests, f'{size / 2 ** 20:.1f}', f'{elapsed:.2f}'))
+
+        print_table(('sync', 'requests', 'MiB', 's'), rows)
+
+
+if __name__ == '__main__':
+    main()
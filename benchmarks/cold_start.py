@@ -0,0 +1,112 @@
+"""Cold start of a worker to its first served request, and the latency of GET /openapi/.
+
+A fresh interpreter per run loads the WSGI application of benchmarks.server
+with each settings module and serves GET /booking/?room=N once; the time
+is measured from starting the process to the response. Then, in this
+process, GET /openapi/ is served from the schema file built with the
+image, from memory, as a 304 and, for comparison, by generating the schema
+on every request the way SpectacularAPIView does.
+
+    python -m benchmarks.cold_start [--runs 5] [--repeat 20]
+"""
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .utils import median_ms, print_table, setup, timed
+
+FIRST_REQUEST_CODE = '''
+import io
+import sys
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.server import application
+
+environ = {'PATH_INFO': '/booking/', 'QUERY_STRING': sys.argv[1]}
+setup_testing_defaults(environ)
+environ['wsgi.errors'] = io.StringIO()
+statuses = []
+body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+assert statuses == ['200 OK'], statuses
+'''
+
+
+def cold_start(settings_module, query, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-W', 'ignore', '-c', FIRST_REQUEST_CODE, query],
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}, check=True
+        )
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    database = tempfile.NamedTemporaryFile(suffix='.sqlite3')
+    os.environ['BENCHMARK_DATABASE'] = database.name
+
+    setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+
+    from config import schema
+
+    settings.DATABASES['default']['NAME'] = database.name
+    connection.close()
+    call_command('migrate', verbosity=0)
+
+    from api.models import Booking, Room
+
+    room = Room.objects.create(description='Benchmark room', price=100)
+    Booking.objects.bulk_create(
+        Booking(room=room, begin_date=day, end_date=day)
+        for day in (datetime.date(2021, 1, 1) + datetime.timedelta(days=i) for i in range(50))
+    )
+    connection.close()
+
+    # An empty interpreter, for reference
+    interpreter = timed(lambda: subprocess.run([sys.executable, '-c', 'pass'], check=True), repeat=args.runs)
+    rows = [('python -c pass', f'{median_ms(interpreter):.0f}')]
+    for settings_module in ('config.settings', 'config.settings_api'):
+        rows.append((settings_module, f'{median_ms(cold_start(settings_module, f"room={room.pk}", args.runs)):.0f}'))
+    print_table(('settings', 'start to first response, ms'), rows)
+
+    with tempfile.TemporaryDirectory() as schema_dir:
+        settings.ALLOWED_HOSTS = ['*']
+        settings.OPENAPI_SCHEMA_DIR = schema_dir = type(settings.BASE_DIR)(schema_dir)
+        call_command('spectacular', file=str(schema_dir / 'schema.yaml'))
+
+        client = Client()
+        schema._schemas.clear()
+        first = timed(lambda: client.get('/openapi/'))
+        etag = client.get('/openapi/')['ETag']
+
+        def not_modified():
+            assert client.get('/openapi/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        print()
+        print_table(('GET /openapi/', 'ms'), [
+            ('generated per request', f'{median_ms(timed(lambda: schema.generate(schema.YAML), args.repeat)):.2f}'),
+            ('first, from the file', f'{median_ms(first):.2f}'),
+            ('from memory', f'{median_ms(timed(lambda: client.get("/openapi/"), args.repeat)):.2f}'),
+            ('304', f'{median_ms(timed(not_modified, args.repeat)):.2f}'),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Bandwidth saved by CompressionMiddleware and the CPU time it costs per response.
+
+Responses are fetched once without compression, then run through the
+middleware with every coding, so the timings cover compressing alone.
+Streamed lists keep their chunks and are compressed chunk by chunk.
+
+    python -m benchmarks.compression [--rooms 10000] [--repeat 20]
+"""
+import argparse
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.http import HttpResponse, StreamingHttpResponse
+    from django.test import RequestFactory
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Room
+    from config.compression import COMPRESSORS, CompressionMiddleware
+
+    middleware = CompressionMiddleware(lambda request: None)
+
+    def compress(response, encoding):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding)
+        response = middleware.process_response(request, response)
+        if response.streaming:
+            return b''.join(response.streaming_content)
+
+        return response.content
+
+    with test_database():
+        Room.objects.bulk_create((
+            Room(description=f'Room #{i} with a view of the sea', price=100 + i % 1000) for i in range(args.rooms)
+        ), batch_size=10_000)
+
+        client = APIClient()
+        url = reverse('room-list')
+        responses = (
+            ('page of 100, json', client.get(url)),
+            ('page of 1000, json', client.get(url, data={'page_size': 1000})),
+            ('page of 1000, msgpack', client.get(url, data={'page_size': 1000}, HTTP_ACCEPT='application/msgpack')),
+            (f'stream of {args.rooms}, json', client.get(url, data={'stream': 'true'})),
+        )
+
+        rows = []
+        for name, response in responses:
+            if response.streaming:
+                chunks = list(response.streaming_content)
+                size = sum(len(chunk) for chunk in chunks)
+
+                def make_response():
+                    return StreamingHttpResponse(iter(chunks))
+            else:
+                content = response.content
+                size = len(content)
+
+                def make_response():
+                    return HttpResponse(content)
+
+            for encoding in sorted(COMPRESSORS):
+                compressed = len(compress(make_response(), encoding))
+                rows.append((
+                    name,
+                    encoding,
+                    f'{size:,}',
+                    f'{compressed:,}',
+                    f'{100 - 100 * compressed / size:.0f}%',
+                    f'{median_ms(timed(lambda: compress(make_response(), encoding), repeat=args.repeat)):.2f}',
+                ))
+
+        print_table(('response', 'coding', 'bytes', 'compressed', 'saved', 'cpu, ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
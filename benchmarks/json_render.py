@@ -0,0 +1,65 @@
+"""Render and parse time of 10k-row room and booking lists with the stdlib json and orjson backends.
+
+    python -m benchmarks.json_render [--rows 10000] [--repeat 10]
+"""
+import argparse
+import datetime
+import io
+from decimal import Decimal
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.models import Booking, Room
+    from api.parsers import OrjsonParser
+    from api.renderers import OrjsonRenderer, orjson
+    from api.serializers import BookingSerializer, RoomSerializer
+
+    if orjson is None:
+        print('orjson is not installed, OrjsonRenderer falls back to JSONRenderer')
+
+    with test_database():
+        Room.objects.bulk_create(
+            Room(description=f'Room #{i}', price=Decimal(10_000 + i % 100_000) / 100) for i in range(args.rows)
+        )
+        room = Room.objects.first()
+        Booking.objects.bulk_create(
+            Booking(room=room, begin_date=day, end_date=day)
+            for day in (datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(args.rows))
+        )
+
+        rows = []
+        for serializer_class, queryset in ((RoomSerializer, Room.objects.all()), (BookingSerializer, Booking.objects.all())):
+            data = {'next': None, 'results': serializer_class.represent_values(serializer_class.values_queryset(queryset))}
+            content = JSONRenderer().render(data)
+            assert OrjsonRenderer().render(data) == content
+
+            for name, renderer, json_parser in (
+                ('json', JSONRenderer(), JSONParser()),
+                ('orjson', OrjsonRenderer(), OrjsonParser()),
+            ):
+                render = timed(lambda: renderer.render(data), repeat=args.repeat)
+                parse = timed(lambda: json_parser.parse(io.BytesIO(content)), repeat=args.repeat)
+                rows.append((
+                    serializer_class.__name__,
+                    name,
+                    f'{median_ms(render):.1f}',
+                    f'{median_ms(parse):.1f}',
+                ))
+
+        print_table(('serializer', 'backend', 'render, ms', 'parse, ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Request rate of polling GET /room/ and GET /booking/?room=N, with and without ETags.
+
+A conditional request carrying the ETag of the previous response is
+answered with 304 Not Modified from the version counters alone.
+
+    python -m benchmarks.list_etag [--rooms 10000] [--bookings 1000] [--page-size 100] [--seconds 2]
+"""
+import argparse
+import datetime
+
+from .utils import print_table, rate, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=10_000)
+    parser.add_argument('--bookings', type=int, default=1000, help='bookings of the polled room')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=2)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    with test_database():
+        Room.objects.bulk_create((
+            Room(description=f'Room #{i}', price=100 + i % 1000) for i in range(args.rooms)
+        ), batch_size=10_000)
+        room = Room.objects.order_by('pk').first()
+        Booking.objects.bulk_create((
+            Booking(room=room, begin_date=day, end_date=day)
+            for day in (datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(args.bookings))
+        ), batch_size=10_000)
+
+        # Full responses are rendered every time, see benchmarks.response_cache for cached ones
+        settings.RESPONSE_CACHE_MAX_BYTES = 0
+
+        client = APIClient()
+        lists = (
+            ('GET /room/', reverse('room-list'), {'ordering': 'price'}),
+            ('GET /booking/?room=N', reverse('booking-list'), {'room': room.pk}),
+        )
+        rows = []
+
+        for name, url, params in lists:
+            params = {**params, 'page_size': args.page_size}
+
+            response = client.get(url, data=params)
+            assert response.status_code == 200
+            etag = response['ETag']
+
+            def conditional():
+                response = client.get(url, data=params, HTTP_IF_NONE_MATCH=etag)
+                assert response.status_code == 304
+
+            full = rate(lambda: client.get(url, data=params), args.seconds)
+            not_modified = rate(conditional, args.seconds)
+
+            rows.append((name, f'{full:.0f}', f'{not_modified:.0f}', f'{not_modified / full:.1f}x'))
+
+        print_table(('list', '200, req/s', '304, req/s', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Payload size and encode/decode time of room and booking lists as JSON and as MessagePack.
+
+Encoding covers representing the rows and rendering them. Decoding covers
+parsing the payload and turning dates and prices into date and Decimal
+objects, the work a client does with the list.
+
+    python -m benchmarks.list_formats [--rows 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+import json
+from decimal import Decimal
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    import msgpack
+    from rest_framework.renderers import JSONRenderer
+
+    from api.compact import EPOCH_ORDINAL
+    from api.models import Booking, Room
+    from api.renderers import MessagePackRenderer
+    from api.serializers import BookingSerializer, RoomSerializer
+
+    def decode_json(content, dates, decimals):
+        items = json.loads(content)
+        for item in items:
+            for name in dates:
+                item[name] = datetime.date.fromisoformat(item[name])
+            for name in decimals:
+                item[name] = Decimal(item[name])
+
+    def decode_msgpack(content, dates, decimals):
+        items = msgpack.unpackb(content)
+        for item in items:
+            for name in dates:
+                item[name] = datetime.date.fromordinal(item[name] + EPOCH_ORDINAL)
+            for name in decimals:
+                item[name] = Decimal(item[name]).scaleb(-2)
+
+    with test_database():
+        Room.objects.bulk_create(
+            Room(description=f'Room #{i}', price=Decimal(10_000 + i % 100_000) / 100) for i in range(args.rows)
+        )
+        room = Room.objects.first()
+        Booking.objects.bulk_create(
+            Booking(room=room, begin_date=day, end_date=day)
+            for day in (datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(args.rows))
+        )
+
+        lists = (
+            (RoomSerializer, Room.objects.all(), ('created_at',), ('price',)),
+            (BookingSerializer, Booking.objects.all(), ('begin_date', 'end_date'), ()),
+        )
+        formats = (
+            ('json', JSONRenderer(), False, decode_json),
+            ('msgpack', MessagePackRenderer(), True, decode_msgpack),
+        )
+
+        rows = []
+        for serializer_class, queryset, dates, decimals in lists:
+            data = list(serializer_class.values_queryset(queryset))
+            for name, renderer, compact, decode in formats:
+                def encode():
+                    return renderer.render(serializer_class.represent_values(data, compact))
+
+                content = encode()
+                rows.append((
+                    serializer_class.__name__,
+                    name,
+                    f'{len(content):,}',
+                    f'{median_ms(timed(encode, repeat=args.repeat)):.1f}',
+                    f'{median_ms(timed(lambda: decode(content, dates, decimals), repeat=args.repeat)):.1f}',
+                ))
+
+        print_table(('serializer', 'format', 'bytes', 'encode, ms', 'decode, ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Peak worker memory of GET /booking/?room=N for a room with a long booking list.
+
+Each list mode runs in a process of its own, so peak RSS readings don't mix.
+
+    python -m benchmarks.list_memory [--bookings 100000]
+"""
+import argparse
+import datetime
+import gc
+import resource
+import subprocess
+import sys
+import time
+
+from .utils import print_table, setup, test_database
+
+MODES = {
+    'buffered': {'paginate': 'false'},
+    'stream': {'stream': 'true'},
+}
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, bookings):
+    setup()
+
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    with test_database():
+        room = Room.objects.create(description='Benchmark room', price=100)
+        start = datetime.date(2000, 1, 1)
+        for offset in range(0, bookings, 10_000):
+            Booking.objects.bulk_create(
+                Booking(room=room, begin_date=day, end_date=day)
+                for day in (start + datetime.timedelta(days=i) for i in range(offset, min(offset + 10_000, bookings)))
+            )
+        gc.collect()
+
+        client = APIClient()
+        before = peak_rss_mb()
+        started = time.perf_counter()
+
+        response = client.get(reverse('booking-list'), data={
+            'room': room.id,
+            'ordering': 'begin_date',
+            **MODES[mode]
+        }, HTTP_ACCEPT='application/json')
+        if response.streaming:
+            # Stands in for writing the chunks to the socket
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+
+        elapsed = time.perf_counter() - started
+        print(f'{size} {elapsed} {before} {peak_rss_mb()}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bookings', type=int, default=100_000)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        return measure(args.mode, args.bookings)
+
+    rows = []
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.list_memory', '--bookings', str(args.bookings), '--mode', mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        size, elapsed, before, after = map(float, output.split())
+        rows.append((mode, f'{size / 2 ** 20:.1f}', f'{elapsed:.2f}', f'{before:.1f}', f'{after:.1f}', f'{after - before:.1f}'))
+
+    print_table(('mode', 'response, MB', 'time, s', 'peak RSS before, MB', 'peak RSS after, MB', 'growth, MB'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Latency of GET /room/ pages at increasing depth of the catalog.
+
+Compares keyset pages with what an OFFSET-based page at the same depth costs.
+
+    python -m benchmarks.list_pages [--rooms 200000] [--requests 20]
+"""
+import argparse
+import datetime
+import random
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=200_000)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Room
+    from api.pagination import KeysetPagination
+
+    with test_database():
+        rng = random.Random(0)
+        Room.objects.bulk_create((
+            Room(description=f'Room #{i}', price=rng.randint(100, 10_000)) for i in range(args.rooms)
+        ), batch_size=10_000)
+        # created_at is auto_now_add, so spread the catalog over the years afterwards
+        rooms = list(Room.objects.only('pk'))
+        for room in rooms:
+            room.created_at = datetime.date(2000, 1, 1) + datetime.timedelta(days=rng.randint(0, 8000))
+        Room.objects.bulk_update(rooms, ('created_at',), batch_size=10_000)
+
+        client = APIClient()
+        url = reverse('room-list')
+        paginator = KeysetPagination()
+        rows = []
+
+        for ordering in ('price', '-created_at'):
+            fields = [ordering, '-id' if ordering.startswith('-') else 'id']
+            paginator.ordering = fields
+            queryset = Room.objects.order_by(*fields)
+
+            for depth in (0, 0.1, 0.5, 0.9):
+                offset = int(args.rooms * depth)
+                data = {'ordering': ordering}
+                if offset:
+                    last = queryset[offset - 1]
+                    data['cursor'] = paginator.encode_cursor([str(getattr(last, f.lstrip('-'))) for f in fields])
+
+                keyset = timed(lambda: client.get(url, data=data), repeat=args.requests)
+                request = Request(RequestFactory().get(url, data={'ordering': ordering}))
+                page_size = paginator.get_page_size(request)
+                offset_based = timed(lambda: list(queryset[offset:offset + page_size]), repeat=args.requests)
+
+                rows.append((ordering, offset, f'{median_ms(keyset):.2f}', f'{median_ms(offset_based):.2f}'))
+
+        print_table(('ordering', 'rows skipped', 'keyset page, ms', 'OFFSET query only, ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Rows per second of the serializer and values() representation paths for list reads.
+
+    python -m benchmarks.list_serialization [--rows 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+
+from .utils import print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from api.models import Booking, Room
+    from api.serializers import BookingSerializer, RoomSerializer
+
+    with test_database():
+        Room.objects.bulk_create(
+            Room(description=f'Room #{i}', price=100 + i % 1000) for i in range(args.rows)
+        )
+        room = Room.objects.first()
+        Booking.objects.bulk_create(
+            Booking(room=room, begin_date=day, end_date=day)
+            for day in (datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(args.rows))
+        )
+
+        renderer = JSONRenderer()
+        rows = []
+        for serializer_class, queryset in ((RoomSerializer, Room.objects.all()), (BookingSerializer, Booking.objects.all())):
+            paths = {
+                'serializer': lambda: renderer.render(serializer_class(queryset.all(), many=True).data),
+                'values': lambda: renderer.render(
+                    serializer_class.represent_values(serializer_class.values_queryset(queryset.all()))
+                ),
+            }
+            for path, fn in paths.items():
+                best = min(timed(fn, repeat=args.repeat))
+                rows.append((serializer_class.__name__, path, f'{args.rows / best:,.0f}'))
+
+        print_table(('serializer', 'path', 'rows/s (query + render)'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Overlap checks of POST /booking/ with and without the occupancy cache.
+
+Requests pick random rooms and dates, so most of them are rejected once the
+rooms fill up; the cache answers both outcomes without the overlap query.
+
+    python -m benchmarks.occupancy [--rooms 100] [--bookings 200] [--requests 2000]
+"""
+import argparse
+import datetime
+import random
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--bookings', type=int, default=200, help='bookings seeded per room')
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.utils import timezone
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+    from api.occupancy import occupancy
+
+    with test_database():
+        client = APIClient()
+        url = reverse('booking-list')
+        today = timezone.localdate()
+
+        Room.objects.bulk_create(
+            Room(description='Benchmark room', price=100) for _ in range(args.rooms)
+        )
+        rooms = list(Room.objects.values_list('pk', flat=True))
+
+        # Stays of 1-3 days every 5 days, throughout the horizon
+        Booking.objects.bulk_create((
+            Booking(
+                room_id=room_id,
+                begin_date=today + datetime.timedelta(days=i * 5),
+                end_date=today + datetime.timedelta(days=i * 5 + i % 3)
+            )
+            for room_id in rooms for i in range(args.bookings)
+        ), batch_size=10_000)
+        seeded = Booking.objects.count()
+
+        rows = []
+        for cache in (None, 'occupancy'):
+            settings.OCCUPANCY_CACHE = cache
+            if cache is not None:
+                caches[cache].clear()
+            occupancy.reset_stats()
+
+            rng = random.Random(0)
+            statuses = {}
+
+            def create():
+                begin = today + datetime.timedelta(days=rng.randrange(args.bookings * 5))
+                response = client.post(url, data={
+                    'begin_date': begin.isoformat(),
+                    'end_date': (begin + datetime.timedelta(days=rng.randrange(3))).isoformat(),
+                    'room_id': rng.choice(rooms)
+                })
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            timings = timed(create, repeat=args.requests)
+            Booking.objects.filter(pk__gt=seeded).delete()
+
+            stats = occupancy.stats()
+            rows.append((
+                cache or 'off',
+                f'{median_ms(timings):.2f}',
+                statuses.get(201, 0),
+                statuses.get(400, 0),
+                f'{stats["hit_rate"]:.1%}' if cache else '-',
+                f'{stats["check_ms"]:.3f}' if cache else '-',
+                f'{stats["load_ms"]:.3f}' if cache else '-',
+            ))
+
+        settings.OCCUPANCY_CACHE = None
+        print_table(
+            ('cache', 'create, ms', 'created', 'rejected', 'hit rate', 'check, ms', 'load, ms'),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Request rate of GET /room/ and GET /booking/?room=N served from the response cache.
+
+Clients poll a handful of popular pages without ETags; the cache serves
+them rendered until the data changes.
+
+    python -m benchmarks.response_cache [--rooms 10000] [--bookings 1000] [--page-size 100] [--seconds 2]
+"""
+import argparse
+import datetime
+
+from .utils import print_table, rate, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=10_000)
+    parser.add_argument('--bookings', type=int, default=1000, help='bookings of the polled room')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=2)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+    from api.responses import response_cache
+
+    with test_database():
+        Room.objects.bulk_create((
+            Room(description=f'Room #{i}', price=100 + i % 1000) for i in range(args.rooms)
+        ), batch_size=10_000)
+        room = Room.objects.order_by('pk').first()
+        Booking.objects.bulk_create((
+            Booking(room=room, begin_date=day, end_date=day)
+            for day in (datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(args.bookings))
+        ), batch_size=10_000)
+
+        client = APIClient()
+        lists = (
+            ('GET /room/', reverse('room-list'), {'ordering': 'price'}),
+            ('GET /booking/?room=N', reverse('booking-list'), {'room': room.pk}),
+        )
+        max_bytes = settings.RESPONSE_CACHE_MAX_BYTES
+        rows = []
+
+        for name, url, params in lists:
+            params = {**params, 'page_size': args.page_size}
+
+            def get():
+                assert client.get(url, data=params).status_code == 200
+
+            settings.RESPONSE_CACHE_MAX_BYTES = 0
+            uncached = rate(get, args.seconds)
+
+            settings.RESPONSE_CACHE_MAX_BYTES = max_bytes
+            response_cache.clear()
+            response_cache.reset_stats()
+            cached = rate(get, args.seconds)
+
+            stats = response_cache.stats()
+            rows.append((name, f'{uncached:.0f}', f'{cached:.0f}', f'{cached / uncached:.1f}x', f'{stats["hit_rate"]:.1%}'))
+
+        print_table(('list', 'uncached, req/s', 'cached, req/s', 'speedup', 'hit rate'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Latency of GET /room/available/ over a large catalog with a long booking history.
+
+    python -m benchmarks.room_available [--rooms 100000] [--bookings 10000000] [--requests 10]
+"""
+import argparse
+import datetime
+import random
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=100_000)
+    parser.add_argument('--bookings', type=int, default=10_000_000)
+    parser.add_argument('--requests', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    with test_database():
+        rng = random.Random(0)
+        Room.objects.bulk_create((
+            Room(description=f'Room #{i}', price=rng.randint(100, 10_000)) for i in range(args.rooms)
+        ), batch_size=10_000)
+        ids = list(Room.objects.values_list('pk', flat=True))
+
+        # Back to back stays of 1-7 days with gaps of 0-3 days, ending around 2022
+        per_room = args.bookings // args.rooms
+        batch = []
+        for room_id in ids:
+            day = datetime.date(2022, 1, 1) - datetime.timedelta(days=per_room * 7)
+            for _ in range(per_room):
+                day += datetime.timedelta(days=rng.randint(0, 3))
+                end = day + datetime.timedelta(days=rng.randint(0, 6))
+                batch.append(Booking(room_id=room_id, begin_date=day, end_date=end))
+                day = end + datetime.timedelta(days=1)
+            if len(batch) >= 50_000:
+                Booking.objects.bulk_create(batch)
+                batch = []
+        Booking.objects.bulk_create(batch)
+
+        client = APIClient()
+        url = reverse('room-available')
+        rows = []
+        for params in (
+            {'begin_date': '2021-12-01', 'end_date': '2021-12-03', 'ordering': 'price'},
+            {'begin_date': '2021-12-01', 'end_date': '2021-12-03', 'price_max': 1000, 'ordering': 'price'},
+            {'begin_date': '2021-12-01', 'end_date': '2021-12-14', 'ordering': '-created_at'},
+            {'begin_date': '2023-01-01', 'end_date': '2023-01-07', 'ordering': 'price'},
+        ):
+            first = client.get(url, data=params).json()
+            found = len(first['results'])
+            page = timed(lambda: client.get(url, data=params), repeat=args.requests)
+
+            if first['next']:
+                deep = first['next']
+                for _ in range(10):
+                    next_url = client.get(deep).json()['next']
+                    if next_url is None:
+                        break
+                    deep = next_url
+                deep_page = f"{median_ms(timed(lambda: client.get(deep), repeat=args.requests)):.2f}"
+            else:
+                deep_page = '-'
+
+            rows.append((
+                ', '.join(f'{key}={value}' for key, value in params.items()),
+                found,
+                f'{median_ms(page):.2f}',
+                deep_page
+            ))
+
+        print(f'{args.rooms} rooms, {Booking.objects.count()} bookings')
+        print_table(('query', 'first page rooms', 'first page, ms', 'page 11, ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
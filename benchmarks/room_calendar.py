@@ -0,0 +1,85 @@
+"""Occupancy of many rooms over a year: GET /room/calendar/ against a GET /booking/?room=N per room.
+
+The per-room lists are expanded to days the way a client would, so both
+sides end up with the same day-by-day occupancy.
+
+    python -m benchmarks.room_calendar [--rooms 1000] [--days 365] [--repeat 5]
+"""
+import argparse
+import datetime
+
+from .utils import median_ms, print_table, setup, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    with test_database():
+        begin_date = datetime.date(2030, 1, 1)
+        end_date = begin_date + datetime.timedelta(days=args.days - 1)
+
+        Room.objects.bulk_create(
+            Room(description='Benchmark room', price=100) for _ in range(args.rooms)
+        )
+        rooms = list(Room.objects.values_list('pk', flat=True))
+
+        # Stays of 1-3 days every 5 days, throughout the range and a bit before it
+        Booking.objects.bulk_create((
+            Booking(
+                room_id=room_id,
+                begin_date=begin_date + datetime.timedelta(days=i * 5 + room_id % 5),
+                end_date=begin_date + datetime.timedelta(days=i * 5 + room_id % 5 + i % 3)
+            )
+            for room_id in rooms for i in range(-10, args.days // 5)
+        ), batch_size=10_000)
+
+        # Every request is computed, see benchmarks.response_cache for cached ones
+        settings.RESPONSE_CACHE_MAX_BYTES = 0
+
+        client = APIClient()
+        params = {
+            'rooms': ','.join(map(str, rooms)),
+            'from': begin_date.isoformat(),
+            'to': end_date.isoformat(),
+        }
+
+        def per_room():
+            for room_id in rooms:
+                response = client.get(reverse('booking-list'), data={'room': room_id, 'paginate': 'false'})
+                days = ['0'] * args.days
+                for booking in response.json():
+                    begin = max(datetime.date.fromisoformat(booking['begin_date']), begin_date)
+                    end = min(datetime.date.fromisoformat(booking['end_date']), end_date)
+                    for day in range((begin - begin_date).days, (end - begin_date).days + 1):
+                        days[day] = '1'
+
+        rows = []
+        for encoding in ('bits', 'ranges'):
+            def get_calendar():
+                response = client.get(reverse('room-calendar'), data={**params, 'encoding': encoding})
+                assert response.status_code == 200
+
+            size = len(client.get(reverse('room-calendar'), data={**params, 'encoding': encoding}).content)
+            rows.append((f'calendar, {encoding}', 1, f'{median_ms(timed(get_calendar, repeat=args.repeat)):.1f}', size))
+
+        rows.append((
+            'booking list per room', len(rooms), f'{median_ms(timed(per_room, repeat=1)):.1f}', '-'
+        ))
+
+        print_table(('request', 'requests', 'total, ms', 'bytes'), rows)
+
+
+if __name__ == '__main__':
+    main()
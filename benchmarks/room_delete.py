@@ -0,0 +1,63 @@
+"""Time to delete rooms together with their bookings.
+
+Compares one DELETE /room/<id>/ per room, a single ORM delete() going
+through Django's collector and DELETE /room/bulk/.
+
+    python -m benchmarks.room_delete [--rooms 1000] [--bookings 1000]
+"""
+import argparse
+import datetime
+import time
+
+from .utils import print_table, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--bookings', type=int, default=1000, help='bookings per room')
+    args = parser.parse_args()
+
+    setup()
+
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    from api.models import Booking, Room
+
+    def seed():
+        Room.objects.bulk_create(Room(description='Benchmark room', price=100) for _ in range(args.rooms))
+        ids = list(Room.objects.values_list('pk', flat=True))
+        days = [datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(args.bookings)]
+        for room_id in ids:
+            Booking.objects.bulk_create(Booking(room_id=room_id, begin_date=day, end_date=day) for day in days)
+
+        return ids
+
+    def per_room(ids):
+        for room_id in ids:
+            client.delete(reverse('room-detail', args=[room_id]))
+
+    def collector(ids):
+        Room.objects.filter(pk__in=ids).delete()
+
+    def bulk(ids):
+        client.delete(reverse('room-bulk'), data={'ids': ids}, format='json')
+
+    with test_database():
+        client = APIClient()
+        rows = []
+        for name, fn in (('DELETE /room/<id>/', per_room), ('QuerySet.delete()', collector), ('DELETE /room/bulk/', bulk)):
+            ids = seed()
+            start = time.perf_counter()
+            fn(ids)
+            elapsed = time.perf_counter() - start
+
+            assert not Room.objects.exists() and not Booking.objects.exists()
+            rows.append((name, f'{elapsed:.2f}'))
+
+        print_table(('path', f'{args.rooms} rooms x {args.bookings} bookings, s'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Django applications served by benchmarks.server_load and benchmarks.cold_start.
+
+The database is the SQLite file named by BENCHMARK_DATABASE, whatever the
+settings module. Every query is delayed by BENCHMARK_DB_LATENCY_MS, which
+stands in for the round trip to a database server over the network.
+BENCHMARK_SERVER=asgi serves the API views asynchronously, the way
+config/settings_docker_asgi.py does.
+"""
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+from django.conf import settings  # noqa: E402
+
+ASYNC = os.environ.get('BENCHMARK_SERVER') == 'asgi'
+
+# Whatever the settings module, e.g. config.settings_api
+settings.DATABASES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.environ['BENCHMARK_DATABASE']},
+}
+settings.ALLOWED_HOSTS = ['*']
+settings.DEBUG = False
+settings.ASYNC_VIEWS = ASYNC
+if ASYNC:
+    settings.MIDDLEWARE = [
+        middleware for middleware in settings.MIDDLEWARE if middleware != 'whitenoise.middleware.WhiteNoiseMiddleware'
+    ]
+
+LATENCY = float(os.environ.get('BENCHMARK_DB_LATENCY_MS', 0)) / 1000
+
+
+def delay(execute, sql, params, many, context):
+    time.sleep(LATENCY)
+    return execute(sql, params, many, context)
+
+
+def add_latency(sender, connection, **kwargs):
+    connection.execute_wrappers.append(delay)
+
+
+if ASYNC:
+    from config.asgi import application  # noqa: E402
+else:
+    from config.wsgi import application  # noqa: E402
+
+from django.db.backends.signals import connection_created  # noqa: E402
+
+connection_created.connect(add_latency)
@@ -0,0 +1,156 @@
+"""Capacity of a WSGI (gunicorn sync) and an ASGI (gunicorn + uvicorn) deployment under concurrent clients.
+
+Both run the same number of worker processes, so they take about the same
+memory; the resident size of each server is reported next to its numbers.
+Clients poll GET /booking/?room=N over fresh connections while every query
+waits for a simulated database round trip.
+
+    python -m benchmarks.server_load [--workers 2] [--latency-ms 5] [--seconds 5] [--concurrency 1 16 64 256]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from .utils import print_table, setup
+
+SERVERS = {
+    'wsgi': [],
+    'asgi': ['-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def rss_mb(pid):
+    """Resident size of a process and all of its children."""
+    total = 0
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                total += int(line.split()[1]) / 1024
+
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as children:
+            total += sum(rss_mb(int(child)) for child in children.read().split())
+
+    return total
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+
+    return int(response.split(b' ', 2)[1])
+
+
+async def load(port, path, concurrency, seconds, timeout):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(fetch(port, path), timeout)
+            except (OSError, asyncio.TimeoutError):
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64, 256])
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    database = tempfile.NamedTemporaryFile(suffix='.sqlite3')
+    os.environ['BENCHMARK_DATABASE'] = database.name
+
+    setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    settings.DATABASES['default']['NAME'] = database.name
+    connection.close()
+    call_command('migrate', verbosity=0)
+
+    from api.models import Booking, Room
+
+    room = Room.objects.create(description='Benchmark room', price=100)
+    Booking.objects.bulk_create(
+        Booking(room=room, begin_date=day, end_date=day)
+        for day in (datetime.date(2021, 1, 1) + datetime.timedelta(days=i) for i in range(50))
+    )
+    connection.close()
+
+    path = f'/booking/?room={room.pk}'
+    rows = []
+
+    for name, options in SERVERS.items():
+        server = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', '-w', str(args.workers), '-b', f'127.0.0.1:{args.port}',
+                '--log-level', 'warning', '--timeout', '120', *options, 'benchmarks.server:application'
+            ],
+            env={**os.environ, 'BENCHMARK_SERVER': name, 'BENCHMARK_DB_LATENCY_MS': str(args.latency_ms)}
+        )
+        try:
+            for _ in range(100):
+                try:
+                    urllib.request.urlopen(f'http://127.0.0.1:{args.port}{path}').read()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            else:
+                raise RuntimeError(f'The {name} server did not start')
+
+            for concurrency in args.concurrency:
+                latencies, errors, elapsed = asyncio.run(
+                    load(args.port, path, concurrency, args.seconds, args.timeout)
+                )
+                latencies.sort()
+                rows.append((
+                    name,
+                    concurrency,
+                    f'{len(latencies) / elapsed:.0f}',
+                    f'{statistics.median(latencies) * 1000:.0f}' if latencies else '-',
+                    f'{latencies[int(len(latencies) * 0.99)] * 1000:.0f}' if latencies else '-',
+                    errors,
+                    f'{rss_mb(server.pid):.0f}',
+                ))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_table(('server', 'clients', 'req/s', 'p50, ms', 'p99, ms', 'errors', 'rss, MB'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Per-request overhead and worker RSS of config.settings_api against the full stack.
+
+Requests go through the middleware, URLconf and DRF settings of each
+profile in one process, with the test client. RSS is read from a fresh
+process per settings module that loads the WSGI application and the API
+views, the way a worker does before its first request.
+
+    python -m benchmarks.settings_api [--seconds 2]
+"""
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+
+from .utils import print_table, rate, setup, test_database
+
+RSS_CODE = '''
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import resolve
+resolve('/booking/')
+for line in open('/proc/self/status'):
+    if line.startswith('VmRSS:'):
+        print(int(line.split()[1]) // 1024)
+'''
+
+
+def boot_rss(settings_module):
+    """Return the RSS in MiB of a fresh process with the WSGI application of the settings loaded."""
+    result = subprocess.run(
+        [sys.executable, '-c', RSS_CODE],
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module},
+        capture_output=True, text=True, check=True
+    )
+
+    return int(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=2)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.test import override_settings
+    from rest_framework.reverse import reverse
+    from rest_framework.test import APIClient
+
+    import config.settings_api as settings_api
+    from api.models import Booking, Room
+
+    profiles = (
+        ('full', override_settings()),
+        ('api', override_settings(
+            MIDDLEWARE=settings_api.MIDDLEWARE,
+            ROOT_URLCONF=settings_api.ROOT_URLCONF,
+            REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+        )),
+    )
+
+    with test_database():
+        settings.RESPONSE_CACHE_MAX_BYTES = 0
+
+        room, new_room = (Room.objects.create(description=f'Room #{i}', price=100) for i in range(2))
+        Booking.objects.bulk_create(
+            Booking(room=room, begin_date=day, end_date=day)
+            for day in (datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(10))
+        )
+        days = (datetime.date(2100, 1, 1) + datetime.timedelta(days=i) for i in range(10_000_000))
+        client = APIClient()
+        url = reverse('booking-list')
+
+        def get():
+            assert client.get(url, data={'room': room.pk}).status_code == 200
+
+        def not_modified():
+            etag = client.get(url, data={'room': room.pk})['ETag']
+
+            def conditional():
+                assert client.get(url, data={'room': room.pk}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+            return conditional
+
+        def create():
+            day = next(days)
+            response = client.post(url, data={'room_id': new_room.pk, 'begin_date': day, 'end_date': day})
+            assert response.status_code == 201
+
+        requests = (
+            ('GET /booking/?room=N', lambda: get),
+            ('GET /booking/?room=N, 304', not_modified),
+            # Bookings go to another room, so the lists above stay the same
+            ('POST /booking/', lambda: create),
+        )
+
+        rows = []
+        for name, make in requests:
+            rates = []
+            for _, profile in profiles:
+                with profile:
+                    rates.append(rate(make(), args.seconds))
+            rows.append((name, *(f'{value:.0f}' for value in rates), f'{rates[1] / rates[0] - 1:+.0%}'))
+
+        print_table(('request', 'full, req/s', 'api, req/s', 'change'), rows)
+
+    print()
+    print_table(('settings', 'worker RSS at boot, MiB'), [
+        (module, boot_rss(module)) for module in ('config.settings_docker', 'config.settings_api')
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Helpers shared by the benchmark scripts.
+
+Every benchmark runs against a throwaway test database created from the
+active settings module, so it is safe to point it at a real server:
+
+    python -m benchmarks.booking_create
+    DJANGO_SETTINGS_MODULE=config.settings_docker python -m benchmarks.booking_create
+"""
+import contextlib
+import logging
+import os
+import statistics
+import time
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    django.setup()
+
+    # Rejected requests are part of most benchmarks, don't log each of them
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+
+@contextlib.contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def timed(fn, repeat=1):
+    """Call `fn` `repeat` times and return the elapsed time of every call in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def rate(fn, seconds):
+    """Call `fn` over and over for `seconds` and return the calls per second."""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+
+    return count / (time.perf_counter() - start)
+
+
+def median_ms(timings):
+    return statistics.median(timings) * 1000
+
+
+def print_table(headers, rows):
+    rows = [[str(value) for value in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+
+    print('  '.join(str(header).rjust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(value.rjust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,184 @@
+"""
+Response compression negotiated with Accept-Encoding, brotli or gzip.
+
+Like django.middleware.gzip.GZipMiddleware, but responses below the
+COMPRESSION_MIN_SIZE setting are left alone, streamed responses included:
+their first chunks are held back until the threshold is reached. Streamed
+responses are then compressed chunk by chunk, every chunk flushed, so
+clients can start reading a list before it ends.
+
+Static files never reach the middleware: WhiteNoiseMiddleware, listed
+before it, answers them with its own precompressed files, and so does the
+static files handler of config/asgi.py.
+"""
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Dynamic responses are compressed on every request, so speed matters more than ratio
+GZIP_LEVEL = 6
+
+BROTLI_QUALITY = 4
+
+
+class GzipCompressor:
+    def __init__(self):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data):
+        return self.compressor.compress(data) + self.compressor.flush()
+
+    def compress_chunk(self, data):
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self.compressor.process(data) + self.compressor.finish()
+
+    def compress_chunk(self, data):
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+COMPRESSORS = {
+    'gzip': GzipCompressor,
+}
+if brotli is not None:
+    COMPRESSORS['br'] = BrotliCompressor
+
+
+def parse_accept_encoding(header):
+    """Return the quality values of the codings listed in an Accept-Encoding header."""
+    qualities = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+
+    return qualities
+
+
+def choose_encoding(header):
+    """Pick the coding of COMPRESSION_ENCODINGS the client prefers, earlier ones winning ties, or None."""
+    qualities = parse_accept_encoding(header)
+
+    best = None
+    best_quality = 0.0
+    for coding in settings.COMPRESSION_ENCODINGS:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if coding in COMPRESSORS and quality > best_quality:
+            best, best_quality = coding, quality
+
+    return best
+
+
+def compress_sequence(compressor, chunks):
+    for chunk in chunks:
+        data = compressor.compress_chunk(chunk)
+        if data:
+            yield data
+
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if response.status_code in (204, 304) or response.has_header('Content-Encoding'):
+            return response
+
+        min_size = settings.COMPRESSION_MIN_SIZE
+        if response.streaming:
+            head, chunks = self.read_head(response.streaming_content, min_size)
+            if chunks is None:
+                # The whole of the content turned out to be short
+                response.streaming_content = head
+                return response
+        elif len(response.content) < min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            if response.streaming:
+                response.streaming_content = self.chain(head, chunks)
+            return response
+
+        compressor = COMPRESSORS[encoding]()
+        if response.streaming:
+            # The compressed size is unknown until the stream ends
+            response.streaming_content = compress_sequence(compressor, self.chain(head, chunks))
+            del response['Content-Length']
+        else:
+            compressed = compressor.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The ETag of the uncompressed content only stays valid as a weak
+        # one, which If-None-Match still matches
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+
+        # Compressing is CPU-bound and touches nothing shared, so it doesn't
+        # need the single thread thread-sensitive code runs in
+        return await sync_to_async(self.process_response, thread_sensitive=False)(request, response)
+
+    @staticmethod
+    def read_head(content, min_size):
+        """
+        Read chunks of the content until they add up to `min_size`.
+
+        Returns the chunks read and an iterator over the rest, or None instead
+        of the iterator when the content ended first.
+        """
+        chunks = iter(content)
+        head = []
+        size = 0
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size >= min_size:
+                return head, chunks
+
+        return head, None
+
+    @staticmethod
+    def chain(head, chunks):
+        yield from head
+        yield from chunks
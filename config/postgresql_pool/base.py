@@ -0,0 +1,133 @@
+"""
+PostgreSQL backend taking connections from a pool shared by the threads of a worker.
+
+Django keeps a connection per thread and, with CONN_MAX_AGE = 0, closes it
+at the end of every request. Here closing hands the connection back to the
+pool and connecting takes one from it, so requests skip the TCP and
+authentication handshake while the number of connections stays bounded.
+Pool options come from the POOL entry of the database settings, see
+config/database_url.py.
+"""
+import os
+import threading
+
+import psycopg2.extensions
+import psycopg2.extras
+from django.db.backends.postgresql import base, creation
+
+from .pool import ConnectionPool, PoolTimeout
+
+# Pools of this worker process by connection parameters
+_pools = {}
+
+_pools_lock = threading.Lock()
+
+# Sockets of a parent's connections must not be used by a forked child
+os.register_at_fork(after_in_child=_pools.clear)
+
+
+def connect(conn_params):
+    connection = base.Database.connect(**conn_params)
+    # See django.db.backends.postgresql.base.DatabaseWrapper.get_new_connection()
+    psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+
+    return connection
+
+
+def check(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except base.Database.Error:
+        return False
+
+    return True
+
+
+def get_pool(conn_params, options):
+    key = repr(sorted(conn_params.items()))
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                connect=lambda: connect(conn_params),
+                size=options.get('SIZE', 10),
+                timeout=options.get('TIMEOUT', 30),
+                check=check if options.get('HEALTH_CHECKS', True) else None,
+                check_interval=options.get('CHECK_INTERVAL', 30),
+            )
+            pool.database = conn_params.get('database')
+
+    return pool
+
+
+def close_pools(database):
+    with _pools_lock:
+        keys = [key for key, pool in _pools.items() if pool.database == database]
+        pools = [_pools.pop(key) for key in keys]
+
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """Counters of the pools of this worker process by database name."""
+    with _pools_lock:
+        pools = list(_pools.values())
+
+    return {pool.database: pool.stats() for pool in pools}
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the database from being dropped
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(conn_params, self.settings_dict.get('POOL', {}))
+        try:
+            connection = self.pool.acquire()
+        except PoolTimeout as e:
+            raise base.Database.OperationalError(str(e)) from e
+
+        # The same as django.db.backends.postgresql does for a new connection
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+
+        with self.wrap_database_errors:
+            status = self.connection.info.transaction_status if not self.connection.closed else None
+
+            if self.in_atomic_block or status not in (
+                psycopg2.extensions.TRANSACTION_STATUS_IDLE,
+                psycopg2.extensions.TRANSACTION_STATUS_INTRANS,
+                psycopg2.extensions.TRANSACTION_STATUS_INERROR,
+            ):
+                # Left midway through a transaction or broken, the connection goes
+                self.pool.discard(self.connection)
+                return
+
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                self.connection.rollback()
+            self.pool.release(self.connection)
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    A bounded pool of database connections shared by the threads of a process.
+
+    Connections are created on demand up to `size`; past that, callers wait
+    up to `timeout` seconds for one to be released. A connection that has
+    been idle longer than `check_interval` seconds is checked with `check`
+    before it is handed out and replaced if it is broken, e.g. after the
+    database server restarted.
+    """
+
+    def __init__(self, connect, size, timeout=30, check=None, check_interval=30):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.check = check
+        self.check_interval = check_interval
+
+        self.condition = threading.Condition()
+        # Connections released last are handed out first, they are the warmest
+        self.idle = deque()
+        self.total = 0
+        self.closed = False
+
+        self.created = 0
+        self.discarded = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def acquire(self):
+        while True:
+            connection, idle_since = self.checkout()
+            if connection is None:
+                try:
+                    connection = self.connect()
+                except BaseException:
+                    self.forget()
+                    raise
+
+                with self.condition:
+                    self.created += 1
+                return connection
+
+            stale = time.monotonic() - idle_since > self.check_interval
+            if self.check is None or not stale or self.check(connection):
+                return connection
+
+            self.discard(connection)
+
+    def checkout(self):
+        """Take an idle connection, or a free slot for a new one when it comes back as None."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        with self.condition:
+            self.checkouts += 1
+            waited = False
+
+            while not self.idle and self.total >= self.size:
+                waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.condition.wait(remaining):
+                    if not self.idle and self.total >= self.size:
+                        self.record_wait(started)
+                        raise PoolTimeout(f'No database connection was released within {self.timeout}s')
+
+            if waited:
+                self.record_wait(started)
+
+            if self.idle:
+                return self.idle.pop()
+
+            self.total += 1
+            return None, None
+
+    def record_wait(self, started):
+        self.waits += 1
+        self.wait_time += time.monotonic() - started
+
+    def release(self, connection):
+        with self.condition:
+            if not self.closed:
+                self.idle.append((connection, time.monotonic()))
+                self.condition.notify()
+                return
+
+        self.discard(connection)
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        finally:
+            self.forget()
+
+            with self.condition:
+                self.discarded += 1
+
+    def forget(self):
+        with self.condition:
+            self.total -= 1
+            self.condition.notify()
+
+    def close(self):
+        """Close the idle connections, the ones in use are closed when they are released."""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, deque()
+            self.total -= len(idle)
+
+        for connection, _ in idle:
+            connection.close()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'open': self.total,
+                'in_use': self.total - len(self.idle),
+                'idle': len(self.idle),
+                'created': self.created,
+                'discarded': self.discarded,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_ms': self.wait_time * 1000,
+            }
@@ -0,0 +1,116 @@
+"""
+The OpenAPI schema served at openapi/, generated once.
+
+The Dockerfile generates it when the image is built, with the settings of
+the services, into the directory named by the OPENAPI_SCHEMA_DIR setting:
+
+    DJANGO_SETTINGS_MODULE=config.settings_docker python manage.py spectacular --file openapi/schema.yaml
+    DJANGO_SETTINGS_MODULE=config.settings_docker python manage.py spectacular --format openapi-json \
+        --file openapi/schema.json
+
+Without the files, e.g. in development, a worker generates the schema on
+its first request for it. Either way the schema is kept in memory and
+served with a strong ETag, so clients revalidate it with a 304.
+
+drf_spectacular is only imported to generate the schema and by the docs/
+and redoc/ views on their first request.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.views.decorators.http import require_safe
+
+YAML = 'yaml'
+
+JSON = 'json'
+
+# File names and media types
+FORMATS = {
+    YAML: ('schema.yaml', 'application/vnd.oai.openapi; charset=utf-8'),
+    JSON: ('schema.json', 'application/vnd.oai.openapi+json'),
+}
+
+_schemas = {}
+
+_lock = threading.Lock()
+
+
+def generate(schema_format):
+    """Render the schema the way `manage.py spectacular` does."""
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    renderer = OpenApiJsonRenderer() if schema_format == JSON else OpenApiYamlRenderer()
+
+    return renderer.render(schema, renderer_context={})
+
+
+def load(schema_format):
+    file_name = FORMATS[schema_format][0]
+    if settings.OPENAPI_SCHEMA_DIR is not None:
+        try:
+            return (settings.OPENAPI_SCHEMA_DIR / file_name).read_bytes()
+        except FileNotFoundError:
+            pass
+
+    return generate(schema_format)
+
+
+def get_schema(schema_format):
+    """Return the rendered schema in the format and its ETag."""
+    try:
+        return _schemas[schema_format]
+    except KeyError:
+        pass
+
+    with _lock:
+        if schema_format not in _schemas:
+            content = load(schema_format)
+            _schemas[schema_format] = content, quote_etag(hashlib.blake2b(content, digest_size=16).hexdigest())
+
+    return _schemas[schema_format]
+
+
+def requested_format(request):
+    if request.GET.get('format') in ('json', 'openapi-json'):
+        return JSON
+    if 'json' in request.META.get('HTTP_ACCEPT', ''):
+        return JSON
+
+    return YAML
+
+
+@require_safe
+def schema_view(request):
+    schema_format = requested_format(request)
+    content, etag = get_schema(schema_format)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type=FORMATS[schema_format][1])
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Accept',))
+
+    return response
+
+
+def lazy_view(name, **initkwargs):
+    """Return a view building the view class `name` of drf_spectacular.views on its first request."""
+    view = None
+
+    def lazy(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from drf_spectacular import views
+
+            view = getattr(views, name).as_view(**initkwargs)
+
+        return view(request, *args, **kwargs)
+
+    return lazy
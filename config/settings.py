@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,6 +77,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Serve the API views as coroutines running the work in a pool of threads,
+# for ASGI servers, see config/asgi.py
+ASYNC_VIEWS = False
+
+ASYNC_VIEW_THREADS = 32
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
@@ -84,9 +91,84 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # The in-memory test database locks whole tables between connections,
+        # so concurrent requests writing room summaries would fail on it
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# Read replicas of the default database serving room and booking lists. After
+# a write, the client reads from the primary for REPLICA_PIN_SECONDS.
+REPLICA_DATABASES = []
+
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'occupancy': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'occupancy',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+        },
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+    },
 }
 
+# Cache holding per-room occupancy bitmaps for booking overlap checks, None
+# turns them off. Running several workers needs a cache shared between them.
+OCCUPANCY_CACHE = None
+
+# Rendered room and booking lists are kept in an in-process LRU of this size
+# and, when set, in the named cache shared between workers.
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+RESPONSE_CACHE = None
+
+# Holds on booking dates, see api/holds.py. Pending holds are confirmed in
+# batches of HOLD_BATCH_SIZE by a thread of the worker waking up every
+# HOLD_CONFIRM_INTERVAL seconds; HOLD_CONFIRMER = False leaves them to
+# api.holds.confirm().
+HOLD_TTL = 30
+
+HOLD_RESULT_TTL = 5 * 60
+
+HOLD_BATCH_SIZE = 500
+
+HOLD_CONFIRM_INTERVAL = 0.02
+
+HOLD_CONFIRMER = True
+
+# Bookings of concurrent POST /booking/ requests are inserted together, see
+# api/group_commit.py
+BOOKING_GROUP_COMMIT = False
+
+BOOKING_GROUP_COMMIT_WINDOW = 0.002
+
+BOOKING_GROUP_COMMIT_MAX_SIZE = 100
+
+
+# Compression of responses, see config/compression.py. Responses shorter
+# than COMPRESSION_MIN_SIZE bytes are sent as they are. Of the codings the
+# client accepts, the one listed first here wins ties; br needs Brotli.
+
+COMPRESSION_MIN_SIZE = 1024
+
+COMPRESSION_ENCODINGS = ['br', 'gzip']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -135,10 +217,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Drop-in replacements of JSONRenderer and JSONParser using orjson when it is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.OrjsonRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.OrjsonParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'api.parsers.MessagePackParser',
+    ],
 }
 
+# Schema files generated when the image is built, see config/schema.py
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Booking service',
     'DESCRIPTION': 'A service for managing hotel rooms and bookings',
     'VERSION': '0.1.0',
+    # Loads the annotations of the views, see api/schema.py
+    'DEFAULT_GENERATOR_CLASS': 'api.schema.SchemaGenerator',
 }
@@ -0,0 +1,46 @@
+from .settings_docker import *
+
+# The API views don't authenticate anyone, so the API workers run without
+# the apps and middleware behind sessions, users, CSRF and messages, and
+# without admin/, docs/ and redoc/, served by a config.settings_docker
+# process instead. Migrations of the apps left out are run by that process.
+
+INSTALLED_APPS = [
+    'django_filters',
+    'rest_framework',
+
+    'api',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'config.compression.CompressionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'config.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    # The default AnonymousUser would need django.contrib.auth
+    'UNAUTHENTICATED_USER': None,
+    # The schema is generated elsewhere, see config/schema.py; the router
+    # would import the AutoSchema of drf_spectacular otherwise
+    'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.inspectors.ViewInspector',
+}
@@ -1,20 +1,30 @@
+import os
+
+from . import database_url
 from .settings import *
 
 DEBUG = False
 
 ALLOWED_HOSTS = ['*']
 
+# See config/database_url.py for the options
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',
-        'USER': 'postgres',
-        'PASSWORD': 'postgres',
-        'HOST': 'db',
-        'PORT': '5432',
-    }
+    'default': database_url.parse(os.environ.get('DATABASE_URL', 'postgresql://postgres:postgres@db:5432/postgres')),
 }
 
-REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
-    'rest_framework.renderers.JSONRenderer',
-]
+# Comma-separated URLs of read replicas
+REPLICA_DATABASES = []
+for i, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    DATABASES[f'replica{i}'] = {
+        **database_url.parse(url),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica{i}')
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.OrjsonRenderer',
+        'api.renderers.MessagePackRenderer',
+    ],
+}
@@ -0,0 +1,8 @@
+from .settings_docker import *
+
+ASYNC_VIEWS = True
+
+# See config/asgi.py
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE if middleware != 'whitenoise.middleware.WhiteNoiseMiddleware'
+]
@@ -0,0 +1,8 @@
+from .settings import *
+
+# Stands in for a read replica in api/tests/test_replicas.py, it isn't read
+# unless a test lists it in REPLICA_DATABASES
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': BASE_DIR / 'db_replica.sqlite3',
+}
@@ -15,12 +15,15 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+
+from .schema import lazy_view, schema_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include('api.urls')),
-    path('openapi/', SpectacularAPIView.as_view(authentication_classes=[]), name='schema'),
-    path('docs/', SpectacularSwaggerView.as_view(url_name='schema', authentication_classes=[]), name='swagger-ui'),
-    path('redoc/', SpectacularRedocView.as_view(url_name='schema', authentication_classes=[]), name='redoc'),
+    path('', include('config.urls_api')),
+    path('openapi/', schema_view, name='schema'),
+    path(
+        'docs/', lazy_view('SpectacularSwaggerView', url_name='schema', authentication_classes=[]), name='swagger-ui'
+    ),
+    path('redoc/', lazy_view('SpectacularRedocView', url_name='schema', authentication_classes=[]), name='redoc'),
 ]
@@ -0,0 +1,6 @@
+"""URLs served by the API workers of config.settings_api, see config/urls.py for the rest."""
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('api.urls')),
+]
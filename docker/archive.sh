@@ -0,0 +1,9 @@
+#!/bin/sh
+
+# Archives the bookings that ended in the past at start and then right after
+# every midnight, UTC as TIME_ZONE of the settings, so they drop out of the
+# room booking summaries, see api/counters.py
+while true; do
+    python manage.py archive_bookings
+    sleep $((86400 - $(date +%s) % 86400 + 60))
+done
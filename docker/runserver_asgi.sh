@@ -0,0 +1,4 @@
+#!/bin/sh
+
+python manage.py migrate
+gunicorn -b 0.0.0.0:80 -k uvicorn.workers.UvicornWorker config.asgi:application